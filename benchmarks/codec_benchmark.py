@@ -0,0 +1,108 @@
+"""Load / save timings of a hub file with route_stats encoded by
+dataclass_json against tycoon.utils.codec.
+
+    python benchmarks/codec_benchmark.py --routes 10000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from tycoon.utils import codec
+from tycoon.utils.data import RouteStat, RouteStats, ScheduledAircraftConfig, WaveStat
+
+
+def _route_stats(rnd: random.Random) -> RouteStats:
+    return RouteStats(
+        economy=RouteStat(rnd.randint(100, 3000), rnd.randint(0, 5000), 0),
+        business=RouteStat(rnd.randint(300, 6000), rnd.randint(0, 800), 0),
+        first=RouteStat(rnd.randint(700, 9000), rnd.randint(0, 300), 0),
+        cargo=RouteStat(rnd.randint(50, 900), rnd.randint(0, 200), 0),
+        category=rnd.randint(1, 10),
+        distance=rnd.randint(6000, 15000),
+        scheduled_flights=[
+            ScheduledAircraftConfig("A380", "(400/60/20)", rnd.random() * 1e5)
+            for _ in range(rnd.randint(0, 6))
+        ],
+        wave_stats={
+            wave: WaveStat(
+                wave,
+                rnd.randint(0, 500),
+                rnd.randint(0, 80),
+                rnd.randint(0, 20),
+                rnd.randint(0, 10),
+                rnd.random() * 1e6,
+                rnd.random() * 10,
+                rnd.random() * 1e7,
+                rnd.randint(1, 100),
+                "",
+            )
+            for wave in range(1, rnd.randint(2, 30))
+        },
+    )
+
+
+def _timed(name: str, fn, results: list):
+    start = time.perf_counter()
+    value = fn()
+    results.append((name, time.perf_counter() - start))
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--routes", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    stats = [_route_stats(rnd) for _ in range(args.routes)]
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        data_file = os.path.join(folder, "hub_routes_df.csv")
+
+        encoded = _timed(
+            "dataclass_json to_json", lambda: [s.to_json() for s in stats], results
+        )
+        fast = _timed("codec dumps", lambda: [codec.dumps(s) for s in stats], results)
+        assert encoded == fast
+        packed = _timed("codec pack", lambda: [codec.pack(s) for s in stats], results)
+
+        pd.DataFrame({"route_stats": encoded}).to_csv(data_file)
+        column = pd.read_csv(data_file, index_col=0)["route_stats"]
+
+        decoded = _timed(
+            "dataclass_json from_json",
+            lambda: [RouteStats.from_json(v) for v in column],
+            results,
+        )
+        fast = _timed(
+            "codec loads",
+            lambda: [codec.loads(RouteStats, v) for v in column],
+            results,
+        )
+        assert decoded == fast
+        unpacked = _timed(
+            "codec unpack",
+            lambda: [codec.unpack(RouteStats, v) for v in packed],
+            results,
+        )
+        assert decoded == unpacked
+
+    print(f"{args.routes} routes, json {sum(map(len, encoded)) / 1e6:.1f} MB,", end=" ")
+    print(f"packed {sum(map(len, packed)) / 1e6:.1f} MB")
+    baseline = dict(results)
+    for name, seconds in results:
+        reference = baseline[
+            "dataclass_json to_json"
+            if name in ("dataclass_json to_json", "codec dumps", "codec pack")
+            else "dataclass_json from_json"
+        ]
+        print(f"{name:<26} {seconds * 1000:9.1f} ms  {reference / seconds:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Profit, turnover less the daily cost of the aircraft, of a hub's routes
+picked together by tycoon.utils.hub_optimizer on a limited fleet, against
+every route taking its nth best config in route order until the fleet runs
+out.
+
+    python benchmarks/hub_optimizer_benchmark.py --routes 500 --aircraft 1500
+"""
+import argparse
+import random
+import time
+
+from tycoon.utils import aircraft_specs, hub_optimizer, seat_optimizer
+from tycoon.utils.data import RouteStat, RouteStats
+
+
+def _route_stats(rnd: random.Random) -> RouteStats:
+    demand = [rnd.randint(0, 3000), rnd.randint(0, 600), rnd.randint(0, 200)]
+    demand.append(rnd.randint(0, 300))
+    prices = [rnd.randint(500, 3000), rnd.randint(1500, 8000)]
+    prices += [rnd.randint(4000, 15000), rnd.randint(200, 1500)]
+    return RouteStats(
+        *[RouteStat(price, count, count // 2) for price, count in zip(prices, demand)]
+    )
+
+
+def _nth_best(stats, spec, aircraft, nth_best_config):
+    """Turnover and aircraft of the nth best config of each route, in
+    order, while the fleet lasts"""
+    turnover, used = 0.0, 0
+    for rs in stats:
+        wave_stats = seat_optimizer.solve(*seat_optimizer.demand_and_prices(rs), spec)
+        if not wave_stats:
+            continue
+        config = seat_optimizer.nth_best(wave_stats, nth_best_config)
+        if used + config.no > aircraft:
+            break
+        turnover += config.total_turnover
+        used += config.no
+    return turnover, used
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--routes", type=int, default=500)
+    parser.add_argument("--aircraft", type=int, default=1500)
+    parser.add_argument("--nth_best_config", type=int, default=2)
+    parser.add_argument(
+        "--amortisation_days", type=int, default=hub_optimizer.AMORTISATION_DAYS
+    )
+    parser.add_argument("--aircraft_make", default="Airbus")
+    parser.add_argument("--aircraft_model", default="A380-800")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    spec = aircraft_specs.AIRCRAFT_SPECS[
+        (args.aircraft_make.lower(), args.aircraft_model.lower())
+    ]
+    cost = hub_optimizer.aircraft_cost(spec, args.amortisation_days)
+    rnd = random.Random(args.seed)
+    stats = [_route_stats(rnd) for _ in range(args.routes)]
+
+    start = time.perf_counter()
+    turnover, used = _nth_best(stats, spec, args.aircraft, args.nth_best_config)
+    nth_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    plan = hub_optimizer.optimize(stats, spec, args.aircraft, cost=cost)
+    plan_seconds = time.perf_counter() - start
+
+    print(
+        f"{args.routes} routes, fleet of {args.aircraft} {spec.model}, "
+        f"{cost:,.0f} a day per aircraft"
+    )
+    print(f"{'':<26} {'':15} {'turnover':>18} {'profit':>18}")
+    print(
+        f"{'nth best in route order':<26} {used:6d} aircraft {turnover:18,.0f}"
+        f" {turnover - used * cost:18,.0f} {nth_seconds * 1000:9.1f} ms"
+    )
+    print(
+        f"{'hub optimizer':<26} {plan.aircraft:6d} aircraft {plan.turnover:18,.0f}"
+        f" {plan.profit:18,.0f} {plan_seconds * 1000:9.1f} ms"
+    )
+    print(f"{'LP bound':<26} {'':15} {'':18} {plan.bound:18,.0f} {plan.gap:9.3%} gap")
+
+
+if __name__ == "__main__":
+    main()
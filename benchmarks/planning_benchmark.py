@@ -0,0 +1,76 @@
+"""Weekly round trips of a hub's waves packed onto aircraft weeks by
+tycoon.utils.planning, against one route per aircraft the way the
+planning page fills them today.
+
+    python benchmarks/planning_benchmark.py --aircraft 2000 --routes 500
+"""
+import argparse
+import random
+import time
+
+from tycoon.utils import planning
+from tycoon.utils.route_finder import format_duration
+
+
+def _dedicated(demand, durations):
+    """Aircraft and utilization when every aircraft only flies one route"""
+    aircraft, used = 0, 0
+    for destination, count in demand.items():
+        slots = planning.round_trip_slots(durations[destination])
+        per_aircraft = planning.WEEK_SLOTS // slots
+        aircraft += -(-count // per_aircraft)
+        used += count * slots
+    return aircraft, used / (aircraft * planning.WEEK_SLOTS)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--aircraft", type=int, default=2000)
+    parser.add_argument("--routes", type=int, default=500)
+    parser.add_argument("--min_duration", type=float, default=2)
+    parser.add_argument("--max_duration", type=float, default=16)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    durations = {
+        f"R{i:04d}": format_duration(rnd.uniform(args.min_duration, args.max_duration))
+        for i in range(args.routes)
+    }
+    # Spread about one fleet's worth of waves over the routes
+    shares = [rnd.random() for _ in durations]
+    demand = {
+        destination: planning.weekly_round_trips(
+            max(1, int(share / sum(shares) * args.aircraft)), duration
+        )
+        for (destination, duration), share in zip(durations.items(), shares)
+    }
+    trips = sum(demand.values())
+
+    start = time.perf_counter()
+    plan = planning.pack(demand, durations)
+    packed = time.perf_counter() - start
+    start = time.perf_counter()
+    capped = planning.pack(demand, durations, args.aircraft)
+    capped_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    frame = plan.to_frame()
+    framed = time.perf_counter() - start
+    aircraft, utilization = _dedicated(demand, durations)
+
+    print(f"{args.routes} routes, {trips} weekly round trips, fleet of {args.aircraft}")
+    print(f"{'one route per aircraft':<26} {aircraft:6d} aircraft {utilization:8.1%}")
+    print(
+        f"{'packed':<26} {plan.aircraft:6d} aircraft {plan.utilization:8.1%}"
+        f" {packed * 1000:9.1f} ms"
+    )
+    print(
+        f"{'packed on the fleet':<26} {capped.aircraft:6d} aircraft "
+        f"{capped.utilization:8.1%} {capped_seconds * 1000:9.1f} ms, "
+        f"{sum(capped.unplaced.values())} trips unplaced"
+    )
+    print(f"{'slot plan frame':<26} {len(frame):6d} rows {framed * 1000:21.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
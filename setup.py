@@ -27,7 +27,8 @@ setup(
     description="A CLI client to play airline manager tycoon https://tycoon.airlines-manager.com",
     version="0.0.1",
     packages=find_packages(exclude=("tests",)),
-    scripts=("bin/tycoon-cli",),
+    package_data={"tycoon": ["data/*.csv"]},
+    scripts=("bin/tycoon-cli", "bin/tycoon-fixtures", "bin/tycoon-sim"),
     install_requires=REQUIREMENTS,
     classifiers=[
         "Development Status :: 2 - Pre-Alpha",
@@ -0,0 +1,50 @@
+import pandas as pd
+
+from tycoon.utils import codec, columnar
+from tycoon.utils.data import RouteStat, RouteStats, ScheduledAircraftConfig, WaveStat
+
+
+def _wave(no: int, economy: int) -> WaveStat:
+    return WaveStat(no, economy, 40, 10, 0, 1000.5, 0.25, 8000.0, 12, "A380")
+
+
+def _route_stats() -> RouteStats:
+    return RouteStats(
+        economy=RouteStat(900, 1500, 200),
+        business=RouteStat(2700, 300, None),
+        category=9,
+        distance=8200,
+        scheduled_flights=[
+            ScheduledAircraftConfig("A380", "Y500 J40 F10", 120000.0),
+            ScheduledAircraftConfig("B747", "Y400 J30", None),
+        ],
+        wave_stats={1: _wave(1, 500), 2: _wave(2, 250), 3: _wave(3, 160)},
+    )
+
+
+def test_tables_round_trip():
+    stats = {"JFK": _route_stats(), "LHR": RouteStats(category=5, distance=300)}
+
+    assert columnar.from_tables(columnar.to_tables(stats.items())) == stats
+
+
+def test_route_tables_follow_route_changes():
+    rs = _route_stats()
+    df = pd.DataFrame({"route_stats": [codec.dumps(rs), None]}, index=pd.Index([0, 1]))
+    route_tables = columnar.RouteTables().sync(df)
+
+    assert route_tables.wave_stats(0) == rs.wave_stats
+    assert route_tables.wave_stats(1) == {}
+    tables = route_tables.tables()
+    # unchanged routes keep the cached tables
+    assert route_tables.sync(df).tables() is tables
+
+    rs.wave_stats = {1: _wave(1, 600)}
+    df.loc[1, "route_stats"] = codec.dumps(rs)
+    route_tables.update(1, df.loc[1, "route_stats"])
+    assert list(route_tables.tables()["routes"][columnar.KEY]) == [0, 1]
+    assert route_tables.wave_stats(1) == rs.wave_stats
+
+    route_tables.sync(df.drop(index=0))
+    assert route_tables.wave_stats(0) == {}
+    assert columnar.from_tables(route_tables.tables()) == {1: rs}
@@ -0,0 +1,54 @@
+import itertools
+
+import numpy as np
+
+from tycoon.utils import hub_optimizer
+from tycoon.utils.aircraft_specs import AIRCRAFT_SPECS
+from tycoon.utils.data import RouteStat, RouteStats
+
+A380 = AIRCRAFT_SPECS[("airbus", "a380-800")]
+
+
+def _route_stats(economy, business, first):
+    return RouteStats(
+        RouteStat(1000, economy, economy),
+        RouteStat(2500, business, business),
+        RouteStat(6000, first, first),
+        RouteStat(300, 0, 0),
+    )
+
+
+ROUTES = [_route_stats(6000, 800, 200), _route_stats(2500, 300, 60)]
+
+
+def test_aircraft_cost_stops_waves_that_dont_pay_for_themselves():
+    free = hub_optimizer.optimize(ROUTES, A380)
+    cost = hub_optimizer.aircraft_cost(A380, 180)
+    costed = hub_optimizer.optimize(ROUTES, A380, cost=cost)
+
+    assert 0 < costed.aircraft < free.aircraft
+    assert costed.profit == costed.turnover - costed.aircraft * cost
+    assert costed.profit >= free.turnover - free.aircraft * cost
+
+
+def test_limited_fleet_matches_brute_force():
+    cost = hub_optimizer.aircraft_cost(A380)
+    _, profit = hub_optimizer.candidates(ROUTES, A380, cost=cost)
+    plan = hub_optimizer.optimize(ROUTES, A380, aircraft=5, cost=cost)
+
+    best = max(
+        profit[0, a] + profit[1, b]
+        for a, b in itertools.product(range(profit.shape[1]), repeat=2)
+        if a + b <= 5
+    )
+    assert plan.aircraft <= 5
+    assert np.isclose(plan.profit, best)
+    assert plan.bound >= plan.profit
+
+
+def test_unflown_routes_have_no_config():
+    routes = ROUTES + [_route_stats(0, 0, 0)]
+    plan = hub_optimizer.optimize(routes, A380, cost=hub_optimizer.aircraft_cost(A380))
+
+    assert plan.configs[-1] is None
+    assert plan.aircraft == sum(c.no for c in plan.configs if c)
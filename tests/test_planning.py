@@ -0,0 +1,24 @@
+from tycoon.utils import planning
+
+
+def test_a_wave_is_one_aircraft_week():
+    assert planning.weekly_round_trips(1, "04:00") == 21
+    # A long haul wave can't fly a round trip every day
+    assert planning.weekly_round_trips(2, "20:00") == 8
+
+
+def test_waves_of_one_route_fill_their_aircraft():
+    demand = {"JFK": planning.weekly_round_trips(3, "20:00")}
+    plan = planning.pack(demand, {"JFK": "20:00"})
+
+    assert plan.aircraft == 3
+    assert not plan.unplaced
+
+
+def test_short_trips_fill_long_haul_gaps():
+    durations = {"JFK": "20:00", "LHR": "01:00"}
+    demand = {"JFK": planning.weekly_round_trips(2, "20:00"), "LHR": 8}
+    plan = planning.pack(demand, durations)
+
+    assert plan.aircraft == 2
+    assert sum(plan.used) == 8 * 160 + 8 * 8
@@ -0,0 +1,65 @@
+import numpy as np
+
+from tycoon.utils import seat_optimizer
+from tycoon.utils.aircraft_specs import AIRCRAFT_SPECS
+
+A380 = AIRCRAFT_SPECS[("airbus", "a380-800")]
+PRICES = np.array([1000.0, 2000.0, 4000.0, 300.0])
+
+
+def test_waves_end_when_capacity_covers_demand():
+    demand = np.array([5000.0, 600.0, 200.0, 0.0])
+    space = demand[:3] @ seat_optimizer.SEAT_SPACE
+    result = seat_optimizer.allocate(demand, PRICES, A380)
+
+    waves = result["waves"]
+    assert waves[-1] == np.ceil(space / (seat_optimizer.FLIGHTS_PER_WAVE * A380.seats))
+    # The last wave carries everyone
+    assert result["seats"][-1][:3] @ seat_optimizer.SEAT_SPACE <= A380.seats
+    assert np.all(np.diff(result["total_turnover"]) > 0)
+
+
+def test_small_demand_is_one_wave():
+    demand = np.array([1200.0, 0.0, 0.0, 0.0])
+    wave_stats = seat_optimizer.solve(demand, PRICES, A380, no_negative=True)
+
+    assert list(wave_stats) == [1]
+    assert wave_stats[1].economy == 600
+    assert seat_optimizer.nth_best(wave_stats, 2) is wave_stats[1]
+
+
+def test_empty_seats_earn_nothing():
+    demand = np.array([1200.0, 0.0, 0.0, 0.0])
+    filled = seat_optimizer.allocate(demand, PRICES, A380, no_negative=False)
+    exact = seat_optimizer.allocate(demand, PRICES, A380, no_negative=True)
+
+    assert filled["seats"][0][0] == A380.seats
+    assert exact["seats"][0][0] == 600
+    np.testing.assert_array_equal(filled["total_turnover"], exact["total_turnover"])
+
+
+def test_allocate_fits_the_aircraft():
+    demand = np.array([20000.0, 4000.0, 1500.0, 2000.0])
+    result = seat_optimizer.allocate(demand, PRICES, A380, no_negative=True)
+
+    assert result["waves"][-1] == seat_optimizer.max_waves_for(demand, A380)
+    assert np.all(result["seats"][:, :3] @ seat_optimizer.SEAT_SPACE <= A380.seats)
+    assert np.all(result["seats"][:, 3] <= A380.cargo)
+
+
+def test_circuit_legs_share_the_weakest_config():
+    demand = np.array([[3000.0, 400.0, 100.0, 0.0], [1000.0, 500.0, 50.0, 0.0]])
+    prices = np.array([PRICES, PRICES])
+    result = seat_optimizer.allocate(demand, prices, A380, no_negative=True)
+
+    assert result["waves"][-1] == seat_optimizer.max_waves_for(demand.min(axis=0), A380)
+    # Half the weakest leg's business demand flies each way
+    assert result["seats"][0][1] == 200
+    assert result["turnover_per_wave"][0] == (
+        seat_optimizer.FLIGHTS_PER_WAVE * result["seats"][0] @ prices.sum(axis=0)
+    )
+
+
+def test_solve_skips_routes_without_demand():
+    assert seat_optimizer.solve(np.zeros(4), PRICES, A380) == {}
+    assert seat_optimizer.nth_best({}, 2) is None
@@ -1,7 +1,7 @@
 import argparse
 import logging
-import time
 
+from tycoon.utils import urls, wait
 from tycoon.utils.airline_manager import login
 from tycoon.utils.browser import js_click
 from tycoon.utils.command import Command
@@ -31,11 +31,10 @@ class Aircraft(Command):
             f"Buying {number} of {self.options.aircraft_make} - {self.options.aircraft_model} to HUB {self.options.hub}"
         )
         self.driver.get(
-            f"https://tycoon.airlines-manager.com/aircraft/buy/new/{self.options.aircraft_make.lower()}"
+            urls.tycoon(f"/aircraft/buy/new/{self.options.aircraft_make.lower()}")
         )
-        time.sleep(5)
-        aircraft_list = self.driver.find_elements(
-            By.XPATH, '//div[@class="aircraftList"]/div'
+        aircraft_list = wait.element_count(
+            self.driver, By.XPATH, '//div[@class="aircraftList"]/div', 1
         )
         for aircraft in aircraft_list:
             if aircraft.get_attribute("id") == "noAircraftFound":
@@ -56,13 +55,14 @@ class Aircraft(Command):
                 el.clear()
                 el.send_keys(str(number))
                 el.send_keys(Keys.ENTER)
-                time.sleep(2)
-                aircraft_hub = Select(self.driver.find_element("id", "aircraft_hub"))
+                aircraft_hub = Select(
+                    wait.element_present(self.driver, "id", "aircraft_hub")
+                )
                 for option in aircraft_hub.options:
                     if self.options.hub.lower() in option.text.lower():
                         option.click()
 
-                time.sleep(2)
+                wait.ajax_idle(self.driver)
                 self.driver.find_element(
                     By.XPATH,
                     '//*[@id="buyAircraft_bucket"]/form/div[1]/div[1]/div[2]/span[1]/img',
@@ -75,6 +75,7 @@ class Aircraft(Command):
                 el.send_keys(Keys.BACKSPACE * 1)
                 el.send_keys(number)
                 el.send_keys(Keys.ENTER)
+                page = self.driver.find_element(By.TAG_NAME, "html")
                 js_click(
                     self.driver,
                     self.driver.find_element(
@@ -82,18 +83,20 @@ class Aircraft(Command):
                         '//*[@id="resumeBoxForJs"]/div[2]/form/div[2]/input',
                     ),
                 )
-                time.sleep(5)
+                wait.page_reloaded(self.driver, page)
                 logging.info(
                     f"Bought {number} of {self.options.aircraft_model} to HUB {self.options.hub}"
                 )
-                rc = self.driver.find_element(By.XPATH, '//*[@id="ressource3"]').text
+                rc = wait.element_present(
+                    self.driver, By.XPATH, '//*[@id="ressource3"]'
+                ).text
                 logging.info(f"Remaining cash == ${rc}")
                 return
 
         raise Exception("Error finding the aircraft to buy")
 
     def run(self):
-        login(self.driver)
+        login(self.driver, self.options.tmp_folder)
         if self.options.number >= BATCH_SIZE:
             for i in range(0, int(self.options.number / BATCH_SIZE)):
                 logging.info(f"Buying in batch of {BATCH_SIZE}, batch {i}...")
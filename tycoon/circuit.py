@@ -7,14 +7,20 @@ import pandas as pd
 import numpy as np
 from tycoon.utils.airline_manager import (
     buy_aircraft,
-    buy_route,
-    find_hub_id,
-    get_all_routes,
     login,
-    route_stats,
 )
 
+from tycoon.utils import (
+    aircraft_specs,
+    cache,
+    circuit_finder,
+    codec,
+    columnar,
+    route_finder,
+    seat_optimizer,
+)
 from tycoon.utils.command import Command
+from tycoon.utils.journal import Journal, journal_path, load_or_import
 from tycoon.utils.data import CircuitInfo, RouteStats, WaveStat
 from tycoon.utils.noway import (
     find_circuit,
@@ -40,6 +46,37 @@ class Circuit(Command):
             "circuit", help="Build a new circuit route network"
         )
         super().options(sub_parser)
+        sub_parser.add_argument(
+            "--offline_seat_config",
+            action="store_true",
+            help="""
+                Calculate seat configs locally instead of on noway.info (Default: False)
+            """,
+            default=False,
+        )
+        sub_parser.add_argument(
+            "--offline_circuit",
+            action="store_true",
+            help="""
+                Find new circuits from the bundled airport list instead of noway.info (Default: False)
+            """,
+            default=False,
+        )
+        sub_parser.add_argument(
+            "--count",
+            "-k",
+            type=int,
+            help="No. of non overlapping circuits to find with --offline_circuit (Default: 1)",
+            default=1,
+        )
+        sub_parser.add_argument(
+            "--airports_file",
+            type=str,
+            help="CSV of airports used by --offline_circuit (Default: bundled list)",
+            default=None,
+        )
+        aircraft_specs.add_options(sub_parser)
+        cache.add_options(sub_parser)
         sub_parser.add_argument(
             "--circuit_hours",
             "-c",
@@ -99,6 +136,7 @@ class Circuit(Command):
 
     def _transform_circuit_routes_to_df(self, circuit: CircuitInfo):
         pass
+        first = len(self.df)
         for row in circuit.rows:
             self.df.loc[len(self.df)] = [
                 circuit.id,
@@ -118,30 +156,57 @@ class Circuit(Command):
                 None,
                 None,
             ]
+        # Every leg is journaled before any is bought, so a resumed run
+        # never sees part of a circuit
+        self._save_data(idxs=self.df.index[first:])
         print(self.df)
 
     def _find_a_new_circuit(self, circuit_id: int):
         logging.info(
             f"Finding circuit for hub {self.options.hub} excluding the exiting routes"
         )
-        _routes = list(filter(None, get_all_routes(self.driver, self.options.hub)))
+        _routes = list(filter(None, self.network.routes(self.reader, self.options.hub)))
         existing_routes = ",".join(_routes)
         logging.debug(f"Existing routes: {existing_routes}")
-        circuit = find_circuit(
-            self.driver,
-            self.options.hub,
-            existing_routes,
-            self.options.circuit_hours,
-            self.options.aircraft_make,
-            self.options.aircraft_model,
-            circuit_id,
-            Status.NEW_CIRCUIT.value,
-        )
-        logging.info(f"Found a circuit for {self.options.hub}, Circuit info: {circuit}")
-        self._transform_circuit_routes_to_df(circuit)
+        if self.options.offline_circuit:
+            circuits = circuit_finder.find_circuits(
+                route_finder.AirportIndex.load(self.options.airports_file),
+                self.options.hub,
+                aircraft_specs.spec_from_options(self.options),
+                self.options.circuit_hours,
+                _routes + list(self.df["destination"].dropna()),
+                circuit_id,
+                self.options.count,
+                Status.NEW_CIRCUIT.value,
+            )
+        else:
+            circuits = [
+                find_circuit(
+                    self.driver,
+                    self.options.hub,
+                    existing_routes,
+                    self.options.circuit_hours,
+                    self.options.aircraft_make,
+                    self.options.aircraft_model,
+                    circuit_id,
+                    Status.NEW_CIRCUIT.value,
+                )
+            ]
+        for circuit in circuits:
+            logging.info(
+                f"Found a circuit for {self.options.hub}, Circuit info: {circuit}"
+            )
+            self._transform_circuit_routes_to_df(circuit)
 
-    def _save_data(self, print_stats=False):
+    def _save_data(self, print_stats=False, idxs: List[int] = None):
+        if idxs is not None:
+            self.journal.write_rows(self.df, idxs)
+            logging.debug(f"Journaled rows {idxs} in {self.journal.path}")
+            return
+
+        self.journal.write_all(self.df)
         self.df.to_csv(self.data_file)
+        columnar.store(self.df, self.data_file, self.route_tables)
         logging.info(f"Stored routes in {self.data_file}")
         if print_stats:
             logging.info("***** Stats of stored *****")
@@ -157,20 +222,22 @@ class Circuit(Command):
 
     def _buy_circuit_routes(self):
         for row in self.df[self.df["status"] == Status.NEW_CIRCUIT.value].itertuples():
-            buy_route(
+            self.network.buy_route(
                 self.driver,
                 self.options.hub,
                 row.destination,
                 self.hub_id,
             )
-            self.df.loc[row.Index, "route_stats"] = route_stats(
-                self.driver, self.options.hub, row.destination
-            ).to_json()
+            self.df.loc[row.Index, "route_stats"] = codec.dumps(
+                self.read_route_stats(
+                    self.options.hub, row.destination, self.route_cache
+                )
+            )
             logging.info(
                 f"Updated route_stats for {self.options.hub} - {row.destination}"
             )
             self.df.loc[row.Index, "status"] = Status.DEMAND_FETCHED.value
-            self._save_data()
+            self._save_data(idxs=[row.Index])
 
     def _get_seat_configs(self):
         pending_df = self.df[self.df["status"] == Status.DEMAND_FETCHED.value]
@@ -184,22 +251,33 @@ class Circuit(Command):
             circuit_stats = []
             for circuit_row in self.df[self.df["circuit_id"] == circut_id].itertuples():
                 destinations.append(circuit_row.destination)
-                circuit_stats.append(RouteStats.from_json(circuit_row.route_stats))
+                circuit_stats.append(codec.loads(RouteStats, circuit_row.route_stats))
 
-            wave_stats = find_seat_config_for_multiple_routes(
-                self.driver,
-                self.options.hub,
-                destinations,
-                self.options.aircraft_make,
-                self.options.aircraft_model,
-                circuit_stats,
-                not self.options.allow_negative,
-            )
+            if self.options.offline_seat_config:
+                wave_stats = seat_optimizer.find_seat_config_for_multiple_routes(
+                    self.options.hub,
+                    destinations,
+                    aircraft_specs.spec_from_options(self.options),
+                    circuit_stats,
+                    not self.options.allow_negative,
+                )
+            else:
+                wave_stats = find_seat_config_for_multiple_routes(
+                    self.driver,
+                    self.options.hub,
+                    destinations,
+                    self.options.aircraft_make,
+                    self.options.aircraft_model,
+                    circuit_stats,
+                    not self.options.allow_negative,
+                    self.seat_cache,
+                    self.options.demand_max_waves,
+                )
 
             for circuit_row in self.df[self.df["circuit_id"] == circut_id].itertuples():
-                _rs = RouteStats.from_json(circuit_row.route_stats)
+                _rs = codec.loads(RouteStats, circuit_row.route_stats)
                 _rs.wave_stats = wave_stats
-                self.df.loc[circuit_row.Index, "route_stats"] = _rs.to_json()
+                self.df.loc[circuit_row.Index, "route_stats"] = codec.dumps(_rs)
                 self.df.loc[
                     circuit_row.Index, "status"
                 ] = Status.SEAT_CONFIG_CALCULATED.value
@@ -207,7 +285,7 @@ class Circuit(Command):
             logging.info(
                 f"Updated circuit route_stats for id: {circut_id}, with {wave_stats}"
             )
-            self._save_data()
+            self._save_data(idxs=self.df.index[self.df["circuit_id"] == circut_id])
 
     def _print_circuits(self):
         circut_ids = list(self.df.groupby(["circuit_id"]).groups.keys())
@@ -216,7 +294,7 @@ class Circuit(Command):
             _df = self.df[self.df["circuit_id"] == circut_id]
             logging.info(f"Circuit Flight stats for Circuit ID: {circut_id}")
             print(_df)
-            _rs = RouteStats.from_json(_df.head(1).route_stats.values[0])
+            _rs = codec.loads(RouteStats, _df.head(1).route_stats.values[0])
             print(print_wave_stats(_rs.wave_stats))
 
     def _buy_flights(self):
@@ -229,7 +307,7 @@ class Circuit(Command):
             logging.info(f"Finding Best seat config for circuit {circut_id}")
             circuit_stats: List[RouteStats] = []
             for circuit_row in self.df[self.df["circuit_id"] == circut_id].itertuples():
-                circuit_stats.append(RouteStats.from_json(circuit_row.route_stats))
+                circuit_stats.append(codec.loads(RouteStats, circuit_row.route_stats))
 
             logging.info(f"Destinations in circuit:")
             print(
@@ -257,20 +335,24 @@ class Circuit(Command):
             )
             for circuit_row in self.df[self.df["circuit_id"] == circut_id].itertuples():
                 self.df.loc[circuit_row.Index, "status"] = Status.BOUGHT_FLIGHTS.value
-            self._save_data()
+            self._save_data(idxs=self.df.index[self.df["circuit_id"] == circut_id])
 
     def run(self):
+        self.seat_cache = cache.seat_config_cache(self.options)
+        self.route_cache = cache.route_cache(self.options)
         self.data_file = os.path.join(
             self.options.tmp_folder, f"{self.options.hub}_circuit_df.csv"
         )
-        if os.path.exists(self.data_file):
-            logging.info(f"Found data at {self.data_file}")
-            self.df = pd.read_csv(self.data_file, index_col=0)
+        self.journal = Journal(journal_path(self.data_file))
+        self.df = load_or_import(self.journal, self.data_file, index_col=0)
+        if self.df is not None:
+            logging.info(f"Found data at {self.journal.path}")
         else:
             self.df = self._new_df()
+        self.route_tables = columnar.RouteTables()
 
         self._save_data(True)
-        login(self.driver)
+        login(self.driver, self.options.tmp_folder)
         if self.options.find_new_circuit:
             logging.info("Requested for a new circuit")
             self._find_a_new_circuit(
@@ -278,9 +360,15 @@ class Circuit(Command):
                 if np.isnan(self.df["circuit_id"].max())
                 else self.df["circuit_id"].max() + 1
             )
-        self.hub_id = find_hub_id(self.driver, self.options.hub)
-        self._buy_circuit_routes()
-        self._get_seat_configs()
-        self._buy_flights()
-        self._print_circuits()
-        self._save_data(True)
+        self.hub_id = self.network.hub_id(self.reader, self.options.hub)
+        try:
+            self._buy_circuit_routes()
+            self._get_seat_configs()
+            self._buy_flights()
+            self._print_circuits()
+        finally:
+            self._save_data(True)
+            if self.seat_cache:
+                self.seat_cache.log_stats()
+            if self.route_cache:
+                self.route_cache.log_stats()
@@ -1,22 +1,35 @@
 import argparse
+import functools
 import logging
 import os
-import re
+import threading
+from typing import List, Optional
 from tycoon.utils.airline_manager import (
     assign_flights,
-    buy_route,
-    find_hub_id,
-    get_all_routes,
+    flights_to_schedule,
     login,
     reconfigure_flight_seats,
     remove_wrong_flights,
-    route_stats,
+)
+from tycoon.utils import (
+    aircraft_specs,
+    cache,
+    codec,
+    columnar,
+    hub_optimizer,
+    planning,
+    route_finder,
+    seat_optimizer,
 )
 from tycoon.utils.command import Command
-from tycoon.utils.data import RouteStats
+from tycoon.utils.journal import Journal, journal_path, load_or_import
+from tycoon.utils.data import RouteStats, WaveStat, seat_config_matches
 from tycoon.utils.noway import find_routes_from, find_seat_config, print_wave_stats
+from tycoon.utils.pipeline import Pipeline, Site, Stage
+from tycoon.utils.pool import DriverPool
 import pandas as pd
 from enum import Enum
+from selenium.webdriver.remote.webdriver import WebDriver
 
 
 class Status(Enum):
@@ -27,10 +40,20 @@ class Status(Enum):
     SCHEDULED = 5
     RECONFIGURE = 7
     PERFECT = 8
+    # Left unflown by --hub_optimizer
+    UNPLANNED = 9
     UNKNOWN_ERROR = 20
 
 
-AIRCRAFT_SEAT_REGX = r"\((\d+)\/(\d+)\/(\d+)\)"
+# --pipeline stage that moves a route on from each status
+STAGES = {
+    Status.UNRESOLVED.value: "buy",
+    Status.PRE_EXISTING.value: "demand",
+    Status.DEMAND.value: "seat_config",
+    Status.SEAT_CONFIG.value: "schedule",
+    Status.SCHEDULED.value: "schedule",
+    Status.RECONFIGURE.value: "schedule",
+}
 
 
 class LongHauls(Command):
@@ -90,24 +113,215 @@ class LongHauls(Command):
             """,
             default=False,
         )
+        sub_parser.add_argument(
+            "--workers",
+            "-w",
+            type=int,
+            help="""
+                No. of logged in browser sessions processing routes in parallel (Default: 1)
+            """,
+            default=1,
+        )
+        sub_parser.add_argument(
+            "--offline_seat_config",
+            action="store_true",
+            help="""
+                Calculate seat configs locally instead of on noway.info (Default: False)
+            """,
+            default=False,
+        )
+        sub_parser.add_argument(
+            "--offline_routes",
+            action="store_true",
+            help="""
+                Find routes from the bundled airport list instead of noway.info,
+                durations are distance / cruise speed plus taxi time, shorter
+                than the game's, so ask for a window the aircraft's range
+                reaches (Default: False)
+            """,
+            default=False,
+        )
+        sub_parser.add_argument(
+            "--airports_file",
+            type=str,
+            help="CSV of airports used by --offline_routes (Default: bundled list)",
+            default=None,
+        )
+        sub_parser.add_argument(
+            "--bulk_schedule",
+            action="store_true",
+            help="""
+                Schedule the flights of a route from one filtered planning
+                page, still submitting each flight on its own, instead of
+                reloading and filtering it per flight (Default: False)
+            """,
+            default=False,
+        )
+        sub_parser.add_argument(
+            "--fleet_index",
+            action="store_true",
+            help="""
+                Crawl the fleet once and plan or clear aircraft by id instead
+                of filtering the planning page per flight (Default: False)
+            """,
+            default=False,
+        )
+        sub_parser.add_argument(
+            "--slot_plan",
+            action="store_true",
+            help="""
+                Pack the weekly round trips of every configured route onto
+                aircraft weeks and write the slot plan next to the routes file (Default: False)
+            """,
+            default=False,
+        )
+        sub_parser.add_argument(
+            "--hub_optimizer",
+            action="store_true",
+            help="""
+                Pick the waves and seat split of every route together to
+                maximise the hub's turnover on --fleet_size and --budget
+                aircraft, instead of each route's nth best config (Default: False)
+            """,
+            default=False,
+        )
+        sub_parser.add_argument(
+            "--drop_hub_plan",
+            action="store_true",
+            help="""
+                Forget the waves a previous --hub_optimizer run picked, routes
+                it scheduled are checked against their nth best config again
+                and routes it left unflown are configured (Default: False)
+            """,
+            default=False,
+        )
+        sub_parser.add_argument(
+            "--fleet_size",
+            type=int,
+            help="""
+                Aircraft --hub_optimizer may plan on the configured routes
+                (Default: with --fleet_index the free aircraft of the hub plus
+                those already on the routes, otherwise unlimited)
+            """,
+            default=None,
+        )
+        sub_parser.add_argument(
+            "--budget",
+            type=float,
+            help="Cash --hub_optimizer may spend on more aircraft (Default: None)",
+            default=None,
+        )
+        sub_parser.add_argument(
+            "--amortisation_days",
+            type=int,
+            help=f"""
+                Days --hub_optimizer spreads an aircraft's price over, a wave
+                is only planned when it earns more a day, 0 makes aircraft free
+                (Default: {hub_optimizer.AMORTISATION_DAYS})
+            """,
+            default=hub_optimizer.AMORTISATION_DAYS,
+        )
+        sub_parser.add_argument(
+            "--hub_remaining_demand",
+            action="store_true",
+            help="""
+                Plan the hub on the demand no airline serves yet instead of
+                the full demand (Default: False)
+            """,
+            default=False,
+        )
+        sub_parser.add_argument(
+            "--reconfigure_tabs",
+            type=int,
+            help="Browser tabs used to reconfigure a route's aircraft at once (Default: 4)",
+            default=4,
+        )
+        sub_parser.add_argument(
+            "--pipeline",
+            action="store_true",
+            help="""
+                Process routes in stages so noway.info seat configs run while
+                airline manager schedules other routes, --workers sessions are
+                used for airline manager (Default: False)
+            """,
+            default=False,
+        )
+        sub_parser.add_argument(
+            "--noway_workers",
+            type=int,
+            help="No. of browser sessions for noway.info with --pipeline (Default: 1)",
+            default=1,
+        )
+        sub_parser.add_argument(
+            "--max_in_flight",
+            type=int,
+            help="Max routes between stages at once with --pipeline (Default: 8)",
+            default=8,
+        )
+        aircraft_specs.add_options(sub_parser)
+        cache.add_options(sub_parser)
         super().options(sub_parser)
 
     def _find_routes(self, data_file: str):
-        routes = find_routes_from(
-            self.driver,
-            self.options.hub,
-            self.options.aircraft_make,
-            self.options.aircraft_model,
-            self.options.min_duration,
-            self.options.max_duration,
-        )
+        if self.options.offline_routes:
+            routes = route_finder.find_routes_from(
+                route_finder.AirportIndex.load(self.options.airports_file),
+                self.options.hub,
+                aircraft_specs.spec_from_options(self.options),
+                self.options.min_duration,
+                self.options.max_duration,
+            )
+        else:
+            routes = find_routes_from(
+                self.driver,
+                self.options.hub,
+                self.options.aircraft_make,
+                self.options.aircraft_model,
+                self.options.min_duration,
+                self.options.max_duration,
+            )
         routes_df = pd.DataFrame(routes[1:], columns=routes[0])
         routes_df = routes_df.set_index("id")
         routes_df["status"] = Status.UNRESOLVED.value
         return routes_df
 
-    def _save_data(self, print_stats=False):
-        self.routes_df.to_csv(self.data_file)
+    def _update(self, idx: int, **values):
+        with self._lock:
+            for k, v in values.items():
+                self.routes_df.loc[idx, k] = v
+            if "route_stats" in values:
+                self.route_tables.update(idx, values["route_stats"])
+
+    def _row(self, idx: int) -> pd.Series:
+        with self._lock:
+            return self.routes_df.loc[idx].copy()
+
+    def _picked_config(self, idx: int, hub_config=None) -> Optional[WaveStat]:
+        """The hub plan's pick of the route, otherwise its nth best wave
+        from route_tables without decoding the route"""
+        if not pd.isnull(hub_config):
+            return codec.loads(WaveStat, hub_config)
+        return seat_optimizer.nth_best(
+            self.route_tables.wave_stats(idx), self.options.nth_best_config
+        )
+
+    def _no_config(self, idx: int, row: pd.Series):
+        """Routes without a seat config can't be flown, they are left for
+        the user instead of failing the run"""
+        error = f"No seat config for {self.options.hub} - {row.IATA}"
+        logging.error(error)
+        self._update(idx, error=error, status=Status.UNKNOWN_ERROR.value)
+
+    def _save_data(self, print_stats=False, idxs: List[int] = None):
+        with self._lock:
+            if idxs is not None:
+                self.journal.write_rows(self.routes_df, idxs)
+                logging.debug(f"Journaled routes {idxs} in {self.journal.path}")
+                return
+
+            self.journal.write_all(self.routes_df)
+            self.routes_df.to_csv(self.data_file)
+            tables = columnar.store(self.routes_df, self.data_file, self.route_tables)
         logging.info(f"Stored routes in {self.data_file}")
         if print_stats:
             logging.info("***** Stats of stored *****")
@@ -119,13 +333,117 @@ class LongHauls(Command):
                 ),
                 axis=1,
             )
+            if tables is not None:
+                picked = self._picked_waves(tables)
+                logging.info(
+                    f"Picked configs need {picked['no'].sum()} flights on {len(picked)} routes"
+                )
             logging.info("**********")
+        return tables
+
+    def _picked_waves(self, tables) -> pd.DataFrame:
+        """The picked wave of every route with seat configs, by route id,
+        routes the hub plan leaves unflown have none"""
+        with self._lock:
+            hub_waves = self.routes_df["hub_waves"].dropna()
+            hub_configs = self.routes_df["hub_config"].dropna()
+        picked = columnar.nth_best(tables["waves"], self.options.nth_best_config)
+        picked = picked.drop(columns="position")
+        planned = pd.DataFrame(
+            [codec.to_dict(codec.loads(WaveStat, raw)) for raw in hub_configs],
+            index=pd.Index(hub_configs.index, name=columnar.KEY),
+            columns=picked.columns.drop("wave"),
+        )
+        planned.insert(0, "wave", planned["no"])
+        picked = picked.drop(hub_waves.index, errors="ignore")
+        return pd.concat([picked, planned])
+
+    def _write_slot_plan(self):
+        tables = self._save_data()
+        if tables is None:
+            logging.error("No route_stats tables to plan slots from")
+            return
+        picked = self._picked_waves(tables)
+        with self._lock:
+            routes = self.routes_df.loc[picked.index]
+
+        demand, durations = {}, {}
+        for idx, row in routes.iterrows():
+            demand[row.IATA] = planning.weekly_round_trips(
+                picked.at[idx, "no"], row.duration
+            )
+            durations[row.IATA] = row.duration
+
+        plan = planning.pack(demand, durations)
+        plan_file = os.path.join(
+            self.options.tmp_folder, f"{self.options.hub}_slot_plan.csv"
+        )
+        plan.to_frame().to_csv(plan_file, index=False)
+        logging.info(
+            f"Slot plan of {len(plan.trips)} round trips on {plan.aircraft} aircraft, "
+            f"{plan.utilization:.1%} utilization, stored in {plan_file}"
+        )
+
+    def _plan_hub(self):
+        """Picks the waves of every configured route with hub_optimizer, the
+        pick is kept in hub_config next to the route's own wave_stats"""
+        with self._lock:
+            df = self.routes_df[
+                (self.routes_df["status"] == Status.SEAT_CONFIG.value)
+                & self.routes_df["route_stats"].notnull()
+            ]
+        if df.empty:
+            return
+
+        spec = aircraft_specs.spec_from_options(self.options)
+        stats = [codec.loads(RouteStats, raw) for raw in df["route_stats"]]
+        fleet_size = self.options.fleet_size
+        if fleet_size is None and self.options.fleet_index:
+            fleet_size = self.fleet.free_count(
+                self.driver, self.hub_id, self.options.aircraft_model
+            ) + sum(len(_rs.scheduled_flights) for _rs in stats)
+        plan = hub_optimizer.optimize(
+            stats,
+            spec,
+            hub_optimizer.aircraft_limit(spec, fleet_size, self.options.budget),
+            not self.options.allow_negative,
+            self.options.hub_remaining_demand,
+            hub_optimizer.aircraft_cost(spec, self.options.amortisation_days),
+        )
+        for idx, iata, _rs, config in zip(df.index, df["IATA"], stats, plan.configs):
+            if config is None:
+                if _rs.scheduled_flights:
+                    logging.warning(
+                        f"Hub plan leaves {self.options.hub} - {iata} unflown, "
+                        f"it keeps its {len(_rs.scheduled_flights)} flights"
+                    )
+                self._update(
+                    idx, hub_waves=0, hub_config=None, status=Status.UNPLANNED.value
+                )
+                continue
+            self._update(idx, hub_waves=config.no, hub_config=codec.dumps(config))
+        self._save_data(True)
+
+    def _reset_hub_plan(self):
+        """A previous --hub_optimizer run's plan stays until it is planned
+        again or dropped with --drop_hub_plan, then the routes it left
+        unflown are configured again"""
+        with self._lock:
+            df = self.routes_df
+            if self.options.hub_optimizer or self.options.drop_hub_plan:
+                df.loc[
+                    df["status"] == Status.UNPLANNED.value, "status"
+                ] = Status.SEAT_CONFIG.value
+            if self.options.drop_hub_plan:
+                logging.info("Dropping the hub plan, routes use --nth_best_config")
+                df["hub_waves"] = None
+                df["hub_config"] = None
 
     def _mark_pre_existing(self):
         df = self.routes_df[self.routes_df["status"] == Status.UNRESOLVED.value]
         if not df.empty:
             bought_routes = list(
-                filter(None, get_all_routes(self.driver, self.options.hub))
+                filter(None, self.network.routes(self.reader, self.options.hub))
             )
             if df["IATA"].isin(bought_routes).any():
                 self.routes_df.loc[
@@ -134,107 +452,134 @@ class LongHauls(Command):
 
     def _fetch_demands(self, idx: int, row: pd.Series):
         try:
-            self.routes_df.loc[idx, "route_stats"] = route_stats(
-                self.driver, self.options.hub, row.IATA
-            ).to_json()
-            self.routes_df.loc[idx, "status"] = Status.DEMAND.value
+            _rs = self.read_route_stats(self.options.hub, row.IATA, self.route_cache)
+            self._update(idx, route_stats=codec.dumps(_rs), status=Status.DEMAND.value)
             logging.info(f"Updated route_stats for {self.options.hub} - {row.IATA}")
         except Exception as ex:
             logging.error(f"Route {self.options.hub} - {row.IATA}", ex)
-            self.routes_df.loc[idx, "error"] = ex
-            self.routes_df.loc[idx, "status"] = Status.UNKNOWN_ERROR.value
+            self._update(idx, error=ex, status=Status.UNKNOWN_ERROR.value)
 
     def _find_seat_configs(self, idx: int, row: pd.Series):
-        _rs = RouteStats.from_json(self.routes_df.loc[idx, "route_stats"])
-        self.routes_df.loc[idx, "route_stats"] = find_seat_config(
-            self.driver,
-            self.options.hub,
-            row.IATA,
-            self.options.aircraft_make,
-            self.options.aircraft_model,
-            _rs,
-            not self.options.allow_negative,
-        ).to_json()
-        self.routes_df.loc[idx, "status"] = Status.SEAT_CONFIG.value
+        _rs = codec.loads(RouteStats, self._row(idx).route_stats)
+        try:
+            if self.options.offline_seat_config:
+                _rs = seat_optimizer.find_seat_config(
+                    self.options.hub,
+                    row.IATA,
+                    aircraft_specs.spec_from_options(self.options),
+                    _rs,
+                    not self.options.allow_negative,
+                )
+            else:
+                _rs = find_seat_config(
+                    self.driver,
+                    self.options.hub,
+                    row.IATA,
+                    self.options.aircraft_make,
+                    self.options.aircraft_model,
+                    _rs,
+                    not self.options.allow_negative,
+                    self.seat_cache,
+                    self.options.demand_max_waves,
+                )
+        except Exception as ex:
+            logging.error(f"Route {self.options.hub} - {row.IATA}: {ex}")
+            self._update(idx, error=str(ex), status=Status.UNKNOWN_ERROR.value)
+            return
+        self._update(idx, route_stats=codec.dumps(_rs), status=Status.SEAT_CONFIG.value)
         logging.info(f"Updated seat_configs for {self.options.hub} - {row.IATA}")
 
     def _configured_correct(self, idx: int, row: pd.Series, reset_status=True) -> bool:
         if reset_status:
             self._fetch_stats(idx, row)
-        _rs = RouteStats.from_json(self.routes_df.loc[idx, "route_stats"])
-        picked_config = _rs.wave_stats[
-            list(_rs.wave_stats.keys())[-self.options.nth_best_config]
-        ]
+        _rs = codec.loads(RouteStats, self._row(idx).route_stats)
+        picked_config = self._picked_config(idx, row.hub_config)
+        if picked_config is None:
+            self._no_config(idx, row)
+            return False
         if len(_rs.scheduled_flights) > picked_config.no:
             logging.error(
                 f"More flights configured, current: {len(_rs.scheduled_flights)}, required: {picked_config.no}"
             )
-            remove_wrong_flights(
-                self.driver,
-                self.hub_id,
-                self.options.hub,
-                row.IATA,
-                picked_config,
-                self.options.aircraft_model,
-            )
+            with self._planning_lock:
+                if self.options.fleet_index:
+                    self.fleet.remove_flights(
+                        self.driver,
+                        self.hub_id,
+                        self.options.hub,
+                        row.IATA,
+                        picked_config,
+                    )
+                else:
+                    remove_wrong_flights(
+                        self.driver,
+                        self.hub_id,
+                        self.options.hub,
+                        row.IATA,
+                        picked_config,
+                        self.options.aircraft_model,
+                    )
         elif len(_rs.scheduled_flights) < picked_config.no:
             self._schedule_flights(idx, row)
 
         for sf in _rs.scheduled_flights:
-            seat_config = re.search(AIRCRAFT_SEAT_REGX, sf.seat_config)
-            if (
-                int(seat_config.group(1)) != int(picked_config.economy)
-                or int(seat_config.group(2)) != int(picked_config.business)
-                or int(seat_config.group(3)) != int(picked_config.first)
-            ):
+            if not seat_config_matches(sf.seat_config, picked_config):
                 if reset_status:
-                    self.routes_df.loc[idx, "status"] = Status.RECONFIGURE.value
+                    self._update(idx, status=Status.RECONFIGURE.value)
                     logging.error(
                         f"Seat config not matching {sf.seat_config} to {picked_config}"
                     )
                 return False
 
         if reset_status:
-            self.routes_df.loc[idx, "status"] = Status.PERFECT.value
+            self._update(idx, status=Status.PERFECT.value)
             logging.info(f"All is perfect for {self.options.hub} - {row.IATA}")
         return True
 
     def _reconfigure_flights(self, idx: int, row: pd.Series):
-        _rs = RouteStats.from_json(self.routes_df.loc[idx, "route_stats"])
+        picked_config = self._picked_config(idx, row.hub_config)
+        if picked_config is None:
+            self._no_config(idx, row)
+            return
         logging.info(f"Reconfigure {self.options.hub} - {row.IATA} flights...")
-        reconfigure_flight_seats(
+        changed = reconfigure_flight_seats(
             self.driver,
             self.options.hub,
             row.IATA,
-            _rs.wave_stats[list(_rs.wave_stats.keys())[-self.options.nth_best_config]],
+            picked_config,
+            self.options.reconfigure_tabs,
+        )
+        logging.info(
+            f"Reconfigured {changed} aircraft on {self.options.hub} - {row.IATA}"
         )
-        self.routes_df.loc[idx, "status"] = Status.SCHEDULED.value
+        if changed:
+            # Reconfigured aircraft are renamed after the line
+            self.fleet.invalidate()
+        self._update(idx, status=Status.SCHEDULED.value)
 
     def _fetch_stats(self, idx: int, row: pd.Series):
-        _rs = RouteStats.from_json(self.routes_df.loc[idx, "route_stats"])
-        _new_rs = route_stats(self.driver, self.options.hub, row.IATA)
+        _rs = codec.loads(RouteStats, self._row(idx).route_stats)
+        _new_rs = self.read_route_stats(self.options.hub, row.IATA, self.route_cache)
         logging.debug(_new_rs)
         _rs.economy = _new_rs.economy
         _rs.business = _new_rs.business
         _rs.first = _new_rs.first
         _rs.cargo = _new_rs.cargo
         _rs.scheduled_flights = _new_rs.scheduled_flights
-        self.routes_df.loc[idx, "route_stats"] = _rs.to_json()
+        self._update(idx, route_stats=codec.dumps(_rs))
 
     def _schedule_flights(self, idx: int, row: pd.Series):
-        if pd.isnull(self.routes_df.loc[idx, "route_stats"]) and not pd.isnull(
-            self.routes_df.loc[idx].error
-        ):
-            logging.error(
-                f"Error scheduling flights for {self.routes_df.loc[idx].IATA}, skipping"
-            )
-            self.routes_df.loc[idx, "status"] = Status.UNKNOWN_ERROR.value
+        current = self._row(idx)
+        if pd.isnull(current.route_stats) and not pd.isnull(current.error):
+            logging.error(f"Error scheduling flights for {current.IATA}, skipping")
+            self._update(idx, status=Status.UNKNOWN_ERROR.value)
             return
 
-        _rs = RouteStats.from_json(self.routes_df.loc[idx, "route_stats"])
-        choosen_config = _rs.wave_stats[
-            list(_rs.wave_stats.keys())[-self.options.nth_best_config]
-        ]
+        _rs = codec.loads(RouteStats, current.route_stats)
+        choosen_config = self._picked_config(idx, current.hub_config)
+        if choosen_config is None:
+            self._no_config(idx, current)
+            return
         if len(_rs.scheduled_flights) >= choosen_config.no:
             if (
                 len(set([x.model for x in _rs.scheduled_flights])) != 1
@@ -249,46 +594,131 @@ class LongHauls(Command):
             logging.info(
                 f"Route already has {choosen_config.no} flights configured, skipping."
             )
-            self.routes_df.loc[idx, "status"] = Status.SCHEDULED.value
+            self._update(idx, status=Status.SCHEDULED.value)
             return
 
-        assign_flights(
-            self.driver,
-            self.hub_id,
-            self.options.hub,
-            row.IATA,
-            _rs,
-            self.options.aircraft_model,
-            self.options.nth_best_config,
-        )
-        self.routes_df.loc[idx, "status"] = Status.SCHEDULED.value
+        with self._planning_lock:
+            if self.options.fleet_index:
+                results = self.fleet.schedule_flights(
+                    self.driver,
+                    self.hub_id,
+                    self.options.hub,
+                    {
+                        row.IATA: flights_to_schedule(
+                            self.driver,
+                            self.options.hub,
+                            row.IATA,
+                            _rs,
+                            choosen_config,
+                        )
+                    },
+                    self.options.aircraft_model,
+                )
+            else:
+                results = assign_flights(
+                    self.driver,
+                    self.hub_id,
+                    self.options.hub,
+                    row.IATA,
+                    _rs,
+                    self.options.aircraft_model,
+                    choosen_config,
+                    self.options.bulk_schedule,
+                )
+        failed = [r for r in results if not r.scheduled]
+        if failed:
+            logging.error(
+                f"Scheduled {len(results) - len(failed)} of {len(results)} flights for {self.options.hub} - {row.IATA}"
+            )
+            self._update(idx, error=failed[0].error, status=Status.UNKNOWN_ERROR.value)
+            return
+        self._update(idx, status=Status.SCHEDULED.value)
         logging.info(f"Scheduled flights for {self.options.hub} - {row.IATA}")
 
     def _buy_route(self, idx: int, row: pd.Series):
         try:
-            buy_route(
+            self.network.buy_route(
                 self.driver,
                 self.options.hub,
                 row.IATA,
                 self.hub_id,
             )
-            self.routes_df.loc[idx, "status"] = Status.PRE_EXISTING.value
+            self._update(idx, status=Status.PRE_EXISTING.value)
         except Exception as ex:
             logging.error(f"Route {self.options.hub} - {row.IATA}", ex)
-            self.routes_df.loc[idx, "error"] = ex
-            self.routes_df.loc[idx, "status"] = Status.UNKNOWN_ERROR.value
+            self._update(idx, error=ex, status=Status.UNKNOWN_ERROR.value)
+
+    def _step(self, idx: int, row: pd.Series):
+        logging.info(
+            f"Processing route to {row.IATA} with status {row.status} with {self.fnMap.get(row.status).__name__}"
+        )
+        self.fnMap.get(row.status)(idx, row)
+        self._save_data(idxs=[idx])
+
+    def _process_route(self, idx: int, until: int = None):
+        row = self._row(idx)
+        logging.debug(row)
+        while self.fnMap.get(row.status, None) and row.status != until:
+            self._step(idx, row)
+            row = self._row(idx)
+            logging.debug(row)
+
+    def _process_in_pool(self, driver: WebDriver, idx: int, until: int = None):
+        self.use_driver(driver)
+        self._process_route(idx, until)
+
+    def _step_in_pipeline(self, driver: WebDriver, idx: int):
+        self.use_driver(driver)
+        self._step(idx, self._row(idx))
+
+    def _next_stage(self, idx: int) -> str:
+        return STAGES.get(self._row(idx).status)
+
+    def _run_pipeline(self, pool: DriverPool):
+        if self.options.offline_seat_config:
+            seat_site = Site("local", [None])
+            noway_pool = None
+        else:
+            noway_pool = DriverPool(None, self.options, self.options.noway_workers)
+            seat_site = Site("noway", noway_pool.drivers)
+
+        airline_manager = Site("airline_manager", pool.drivers)
+        try:
+            Pipeline(
+                [
+                    Stage("buy", airline_manager, self._step_in_pipeline),
+                    Stage("demand", airline_manager, self._step_in_pipeline),
+                    Stage("seat_config", seat_site, self._step_in_pipeline),
+                    Stage("schedule", airline_manager, self._step_in_pipeline),
+                ],
+                self._next_stage,
+                self.options.max_in_flight,
+            ).run(list(self.routes_df.index))
+        finally:
+            if noway_pool:
+                noway_pool.close()
 
     def run(self):
+        self._lock = threading.RLock()
+        self._planning_lock = threading.Lock()
+        self.seat_cache = cache.seat_config_cache(self.options)
+        self.route_cache = cache.route_cache(self.options)
         self.data_file = os.path.join(
             self.options.tmp_folder, f"{self.options.hub}_routes_df.csv"
         )
-        if os.path.exists(self.data_file):
-            logging.info(f"Found data at {self.data_file}")
-            self.routes_df = pd.read_csv(self.data_file, index_col=["id"])
+        self.journal = Journal(journal_path(self.data_file))
+        self.routes_df = load_or_import(self.journal, self.data_file, index_col=["id"])
+        if self.routes_df is not None:
+            logging.info(f"Found data at {self.journal.path}")
         else:
             self.routes_df = self._find_routes(self.data_file)
 
-        fnMap = {
+        for column in ["route_stats", "error", "hub_waves", "hub_config"]:
+            if column not in self.routes_df.columns:
+                self.routes_df[column] = None
+        self.route_tables = columnar.RouteTables().sync(self.routes_df)
+
+        self.fnMap = {
             Status.UNRESOLVED.value: self._buy_route,
             Status.PRE_EXISTING.value: self._fetch_demands,
             Status.DEMAND.value: self._find_seat_configs,
@@ -297,9 +727,16 @@ class LongHauls(Command):
             Status.RECONFIGURE.value: self._reconfigure_flights,
         }
 
-        login(self.driver)
+        if self.options.hub_optimizer and self.options.pipeline:
+            raise Exception(
+                "--hub_optimizer needs the seat configs of every route before "
+                "scheduling any, it can't run with --pipeline"
+            )
+
+        login(self.driver, self.options.tmp_folder)
+        pool = DriverPool(self.driver, self.options, self.options.workers)
         try:
-            self.hub_id = find_hub_id(self.driver, self.options.hub)
+            self.hub_id = self.network.hub_id(self.reader, self.options.hub)
             if self.options.analyse and self.options.analyse.lower() == "all":
                 self.routes_df.loc[
                     self.routes_df["status"] == Status.PERFECT.value, "status"
@@ -310,6 +747,7 @@ class LongHauls(Command):
                     "status",
                 ] = Status.SEAT_CONFIG.value
                 self._save_data(True)
+            self._reset_hub_plan()
             if self.options.retry_failed:
                 self.routes_df.loc[
                     self.routes_df["status"] == Status.UNKNOWN_ERROR.value, "status"
@@ -317,19 +755,38 @@ class LongHauls(Command):
                 self._save_data(True)
             self._mark_pre_existing()
             self._save_data(True)
-            for idx in self.routes_df.index:
-                row = self.routes_df.loc[idx]
-                logging.debug(row)
-                while fnMap.get(row.status, None):
-                    logging.info(
-                        f"Processing route to {row.IATA} with status {row.status} with {fnMap.get(row.status).__name__}"
+            if self.options.pipeline:
+                logging.info(f"Processing routes in stages with {len(pool)} workers")
+                pool.setup(lambda driver: login(driver, self.options.tmp_folder))
+                self._run_pipeline(pool)
+            elif len(pool) > 1:
+                logging.info(f"Processing routes with {len(pool)} workers")
+                pool.setup(lambda driver: login(driver, self.options.tmp_folder))
+                if self.options.hub_optimizer:
+                    pool.run(
+                        list(self.routes_df.index),
+                        functools.partial(
+                            self._process_in_pool, until=Status.SEAT_CONFIG.value
+                        ),
                     )
-                    fnMap.get(row.status)(idx, row)
-                    self._save_data()
-                    row = self.routes_df.loc[idx]
-                    logging.debug(row)
+                    self._plan_hub()
+                pool.run(list(self.routes_df.index), self._process_in_pool)
+            else:
+                if self.options.hub_optimizer:
+                    for idx in self.routes_df.index:
+                        self._process_route(idx, Status.SEAT_CONFIG.value)
+                    self._plan_hub()
+                for idx in self.routes_df.index:
+                    self._process_route(idx)
+            if self.options.slot_plan:
+                self._write_slot_plan()
             logging.info("Done, If any mistakes found run again with --analyse")
         except Exception as ex:
             raise ex
         finally:
+            pool.close()
             self._save_data(True)
+            if self.seat_cache:
+                self.seat_cache.log_stats()
+            if self.route_cache:
+                self.route_cache.log_stats()
@@ -4,6 +4,7 @@ import logging
 import time
 import os
 
+from tycoon.utils import codec, urls
 from tycoon.utils.airline_manager import login
 from tycoon.utils.browser import js_click
 from tycoon.utils.command import Command
@@ -170,7 +171,7 @@ class Seat(Command):
             raise Exception(f"Can't find stats at {stats_path}")
 
         with open(stats_path, "r") as f:
-            return RouteStats.from_json(f.read())
+            return codec.loads(RouteStats, f.read())
 
     def config_metadata(self):
         cf_aircraftmake = Select(self.driver.find_element("id", "cf_aircraftmake"))
@@ -186,9 +187,7 @@ class Seat(Command):
         self.change_to_airport_codes()
 
     def find_seat_config(self) -> pd.DataFrame:
-        self.driver.get(
-            "https://destinations.noway.info/en/seatconfigurator/index.html"
-        )
+        self.driver.get(urls.noway("/en/seatconfigurator/index.html"))
         self.clear_previous_configs()
         self.config_metadata()
         for destination in self.options.destinations:
@@ -201,7 +200,7 @@ class Seat(Command):
         return self.seat_configs_df(wave_stats)
 
     def run(self):
-        login(self.driver)
+        login(self.driver, self.options.tmp_folder)
         # for destination in self.options.destinations:
         # extract_route_price_stats(self.driver, self.options.hub, destination)
         # self.find_seat_config()
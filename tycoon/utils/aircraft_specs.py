@@ -0,0 +1,84 @@
+import argparse
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Tuple
+
+
+@dataclass
+class AircraftSpec:
+    make: str
+    model: str
+    seats: int
+    cargo: int
+    range_km: int
+    speed_kmh: int
+    price: float
+
+
+# Approximate in-game figures, override with the --aircraft_* options
+# when an aircraft is missing or the game changes its numbers.
+AIRCRAFT_SPECS: Dict[Tuple[str, str], AircraftSpec] = {
+    (spec.make.lower(), spec.model.lower()): spec
+    for spec in [
+        AircraftSpec("Airbus", "A380-800", 853, 68, 15200, 945, 400_000_000),
+        AircraftSpec("Airbus", "A350-900", 440, 35, 15000, 903, 300_000_000),
+        AircraftSpec("Airbus", "A340-600", 475, 38, 14450, 881, 250_000_000),
+        AircraftSpec("Airbus", "A330-300", 440, 35, 11750, 871, 230_000_000),
+        AircraftSpec("Boeing", "747-8", 605, 48, 14815, 917, 350_000_000),
+        AircraftSpec("Boeing", "747-400", 531, 44, 13450, 913, 260_000_000),
+        AircraftSpec("Boeing", "777-300ER", 550, 44, 14490, 905, 320_000_000),
+        AircraftSpec("Boeing", "787-9", 420, 34, 14140, 903, 270_000_000),
+        AircraftSpec("Ilyushin", "Ił-96-300", 300, 24, 11000, 870, 90_000_000),
+    ]
+}
+
+
+def add_options(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--aircraft_seats",
+        type=int,
+        help="Economy seat equivalents of the aircraft, overrides the bundled spec",
+    )
+    parser.add_argument(
+        "--aircraft_cargo",
+        type=int,
+        help="Cargo capacity of the aircraft, overrides the bundled spec",
+    )
+    parser.add_argument(
+        "--aircraft_range",
+        type=int,
+        help="Range of the aircraft in km, overrides the bundled spec",
+    )
+    parser.add_argument(
+        "--aircraft_speed",
+        type=int,
+        help="Cruise speed of the aircraft in km/h, overrides the bundled spec",
+    )
+    parser.add_argument(
+        "--aircraft_price",
+        type=float,
+        help="Price of the aircraft, overrides the bundled spec",
+    )
+
+
+def get_spec(aircraft_make: str, aircraft_model: str) -> AircraftSpec:
+    spec = AIRCRAFT_SPECS.get((aircraft_make.lower(), aircraft_model.lower()))
+    if not spec:
+        raise Exception(
+            f"No spec for aircraft {aircraft_make} {aircraft_model}, pass --aircraft_seats, --aircraft_cargo, --aircraft_range, --aircraft_speed and --aircraft_price"
+        )
+    return spec
+
+
+def spec_from_options(options: Any) -> AircraftSpec:
+    overrides = {
+        "seats": getattr(options, "aircraft_seats", None),
+        "cargo": getattr(options, "aircraft_cargo", None),
+        "range_km": getattr(options, "aircraft_range", None),
+        "speed_kmh": getattr(options, "aircraft_speed", None),
+        "price": getattr(options, "aircraft_price", None),
+    }
+    overrides = {k: v for k, v in overrides.items() if v is not None}
+    if len(overrides) == 5:
+        return AircraftSpec(options.aircraft_make, options.aircraft_model, **overrides)
+
+    return replace(get_spec(options.aircraft_make, options.aircraft_model), **overrides)
@@ -1,43 +1,76 @@
 import logging
 import os
 import re
-import time
 from retry import retry
-from typing import List, Tuple
+from typing import Any, Dict, List, Tuple
 
-import pandas as pd
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.ui import Select
+from urllib.parse import urljoin
+from tycoon.utils import urls, wait
 from tycoon.utils.browser import js_click
+from tycoon.utils.extract import by_class, complete_rows, extract_rows
+from tycoon.utils.session import clear_session, restore_session, save_session
 from tycoon.utils.data import (
+    FleetAircraft,
     RouteStat,
     RouteStats,
     ScheduledAircraftConfig,
+    ScheduleResult,
     WaveStat,
     non_decimal,
+    seat_config_matches,
 )
 from selenium.common.exceptions import NoSuchElementException
 
+PLANNING_PATH = "/network/planning"
 
-def login(driver: WebDriver):
+
+def _is_logged_in(driver: WebDriver) -> bool:
+    return len(driver.find_elements("id", "loginSubmit")) == 0
+
+
+def login(driver: WebDriver, tmp_folder: str = None):
     if os.getenv("TYCOON_EMAIL", "") == "" or os.getenv("TYCOON_PASSWORD", "") == "":
         raise Exception(
             "Missing env variables TYCOON_EMAIL/TYCOON_PASSWORD, required for login to http://tycoon.airlines-manager.com"
         )
 
-    driver.get("http://tycoon.airlines-manager.com/network/")
+    email = os.getenv("TYCOON_EMAIL")
+    if tmp_folder and restore_session(
+        driver, tmp_folder, email, urls.tycoon("/favicon.ico")
+    ):
+        driver.get(urls.tycoon("/network/"))
+        if _is_logged_in(driver):
+            logging.info("Reusing saved session")
+            save_session(driver, tmp_folder, email)
+            return
+
+        logging.info("Saved session expired, logging in again")
+        driver.delete_all_cookies()
+        clear_session(tmp_folder)
+
+    driver.get(urls.tycoon("/network/"))
     username = driver.find_element("id", "username")
-    username.send_keys(os.getenv("TYCOON_EMAIL"))
+    username.send_keys(email)
     password = driver.find_element("id", "password")
     password.send_keys(os.getenv("TYCOON_PASSWORD"))
     login = driver.find_element("id", "loginSubmit")
+    page = driver.find_element(By.TAG_NAME, "html")
     login.click()
+    wait.page_reloaded(driver, page, wait.DEFAULT_TIMEOUT)
+    if not _is_logged_in(driver):
+        logging.error(f"Login as {email} failed, not saving the session")
+        return
+    if tmp_folder:
+        save_session(driver, tmp_folder, email)
 
 
 def _select_route(driver, route_text: str):
-    driver.get(f"https://tycoon.airlines-manager.com/network/")
+    driver.get(urls.tycoon("/network/"))
     routes = Select(driver.find_element(By.CLASS_NAME, "linePicker"))
     routes.select_by_visible_text(route_text)
 
@@ -78,10 +111,63 @@ def _extract_route_stat(priceList) -> Tuple[str, RouteStat]:
     )
 
 
+FLIGHT_STATS_XPATH = '//div[@class="aircraftListView"]/div'
+FLIGHT_STATS_FIELDS = {
+    "model": "div[1]/span",
+    "seat_config": "div[2]/div/span[4]/b",
+    "result": "div[2]/div/span[6]/b",
+}
+AIRCRAFT_LINK_FIELDS = {
+    "seat_config": FLIGHT_STATS_FIELDS["seat_config"],
+    "link": ".//a[text()='Aircraft details']/@href",
+}
+PRICE_LISTS_XPATH = '//*[@id="marketing_linePricing"]/div[@class="box2"]/div'
+PRICE_LIST_FIELDS = {
+    "title": by_class("title"),
+    "price": f"{by_class('price')}//b",
+    "demand": by_class("demand"),
+    "remaining_demand": by_class("paxLeft"),
+}
+
+
 def _get_flight_stats(driver) -> List[ScheduledAircraftConfig]:
-    flights_list = driver.find_elements(
-        By.XPATH, '//div[@class="aircraftListView"]/div'
-    )
+    rows = extract_rows(driver, FLIGHT_STATS_XPATH, FLIGHT_STATS_FIELDS)
+    if rows is None or not complete_rows(rows):
+        return _get_flight_stats_by_element(driver)
+
+    return [
+        ScheduledAircraftConfig(
+            model=row["model"].split("/")[0].strip(),
+            seat_config=row["seat_config"],
+            result=non_decimal.sub("", row["result"]),
+        )
+        for row in rows
+    ]
+
+
+def _get_route_prices(driver) -> List[Tuple[str, RouteStat]]:
+    rows = extract_rows(driver, PRICE_LISTS_XPATH, PRICE_LIST_FIELDS)
+    if rows is None or not complete_rows(rows):
+        return [
+            _extract_route_stat(priceList)
+            for priceList in driver.find_elements(By.XPATH, PRICE_LISTS_XPATH)
+        ]
+
+    return [
+        (
+            row["title"].replace("class", "").strip().lower(),
+            RouteStat(
+                price=non_decimal.sub("", row["price"]),
+                demand=non_decimal.sub("", row["demand"]),
+                remaining_demand=non_decimal.sub("", row["remaining_demand"]),
+            ),
+        )
+        for row in rows
+    ]
+
+
+def _get_flight_stats_by_element(driver) -> List[ScheduledAircraftConfig]:
+    flights_list = driver.find_elements(By.XPATH, FLIGHT_STATS_XPATH)
     flight_stats = []
     for flight in flights_list:
         flight_stats.append(
@@ -103,24 +189,40 @@ def _get_flight_stats(driver) -> List[ScheduledAircraftConfig]:
 
 
 @retry(delay=5, tries=3)
-def route_stats(driver, hub: str, route: str) -> RouteStats:
-    route_text = f"{hub} - {route}"
-    _select_route(driver, route_text)
+def line_stats(
+    driver, hub: str, route: str, static: Dict[str, Any] = None
+) -> Tuple[RouteStats, Dict[str, Any]]:
+    """Scheduled flights of the route, with its static metadata (category,
+    distance and prices page) looked up only when not already known.
+    """
+    _select_route(driver, f"{hub} - {route}")
     flight_stats = _get_flight_stats(driver)
+    if not static:
+        static = {
+            "category": _get_max_category(driver),
+            "distance": _get_distance(driver),
+            "prices_url": driver.find_element(
+                By.LINK_TEXT, "Route prices"
+            ).get_attribute("href"),
+        }
     route_stats = RouteStats(
-        category=_get_max_category(driver),
-        distance=_get_distance(driver),
+        category=static["category"],
+        distance=static["distance"],
         scheduled_flights=flight_stats,
     )
+    return route_stats, static
 
-    prices = driver.find_element(By.LINK_TEXT, "Route prices")
-    driver.get(prices.get_attribute("href"))
-    priceLists = driver.find_elements(
-        By.XPATH, '//*[@id="marketing_linePricing"]/div[@class="box2"]/div'
-    )
 
-    for priceList in priceLists:
-        route_stats.__setattr__(*_extract_route_stat(priceList))
+@retry(delay=5, tries=3)
+def route_prices(driver, prices_url: str) -> List[Tuple[str, RouteStat]]:
+    driver.get(prices_url)
+    return _get_route_prices(driver)
+
+
+def route_stats(driver, hub: str, route: str) -> RouteStats:
+    route_stats, static = line_stats(driver, hub, route)
+    for name, stat in route_prices(driver, static["prices_url"]):
+        route_stats.__setattr__(name, stat)
 
     return route_stats
 
@@ -133,26 +235,33 @@ def _extract_destination(hub: str, route_element) -> str:
             return match.group(2)
 
 
-def find_hub_id(driver, hub: str) -> int:
-    driver.get("http://tycoon.airlines-manager.com/network/")
-    driver.find_elements(By.XPATH, '//*[@id="lineList"]/div')
+def hub_ids(driver) -> Dict[str, int]:
+    driver.get(urls.tycoon("/network/"))
     hubs = driver.find_elements(
         By.XPATH, '//*[@id="displayRegular"]/div[@class="hubListBox"]/div'
     )
+    ids = {}
     for hub_element in hubs:
         match = re.search("Owned hub ([A-Z]{3}) -", hub_element.text)
-        if match and match.group(1) == hub:
-            hub_id = int(
+        if match:
+            ids[match.group(1)] = int(
                 hub_element.find_element(By.LINK_TEXT, "Hub details")
                 .get_attribute("href")
                 .split("/")[-1],
             )
-            return hub_id
+    return ids
+
+
+def find_hub_id(driver, hub: str) -> int:
+    return hub_ids(driver).get(hub)
 
 
 def get_all_routes(driver, hub: str) -> List[str]:
-    hub_id = find_hub_id(driver, hub)
-    driver.get(f"http://tycoon.airlines-manager.com/network/showhub/{hub_id}/linelist")
+    return line_list(driver, hub, find_hub_id(driver, hub))
+
+
+def line_list(driver, hub: str, hub_id: int) -> List[str]:
+    driver.get(urls.tycoon(f"/network/showhub/{hub_id}/linelist"))
     route_elements = driver.find_elements(By.XPATH, '//*[@id="lineList"]/div')
     destinations = []
     for route_element in route_elements:
@@ -162,52 +271,85 @@ def get_all_routes(driver, hub: str) -> List[str]:
     return destinations
 
 
-def _clear_all_and_enter(inputs):
+def _clear_all_and_enter(driver: WebDriver, inputs):
     for set in inputs:
         set[0].clear()
         set[0].send_keys("0")
-    time.sleep(2)
+    wait.ajax_idle(driver)
     for set in inputs:
         set[0].clear()
         set[0].send_keys(str(set[1]))
-        time.sleep(2)
+        wait.input_value(driver, set[0], set[1])
+        wait.ajax_idle(driver)
 
 
-@retry(delay=2, tries=5)
-def reconfigure_flight_seats(
-    driver: WebDriver,
-    hub: str,
-    destination: str,
-    seat_config: pd.Series,
-):
-    _select_route(driver, f"{hub} - {destination}")
-    aircrafts = driver.find_elements(By.XPATH, '//div[@class="aircraftListView"]/div')
-    aircraft_links = []
-    for aircraft in aircrafts:
-        aircraft_links.append(
-            aircraft.find_element(By.LINK_TEXT, "Aircraft details").get_attribute(
-                "href"
-            )
-        )
+def _enter_seat_config(
+    driver: WebDriver, seat_config: WaveStat, name: str
+) -> WebElement:
+    """Fills in and submits the reconfigure form, returns the page it was
+    submitted from to wait for the reload on"""
+    wait.element_present(driver, "id", "ecoManualInput")
+    _clear_all_and_enter(
+        driver,
+        [
+            (driver.find_element("id", "ecoManualInput"), seat_config.economy),
+            (driver.find_element("id", "busManualInput"), seat_config.business),
+            (driver.find_element("id", "firstManualInput"), seat_config.first),
+            (driver.find_element("id", "cargoManualInput"), seat_config.cargo),
+            (driver.find_element("id", "aircraft_name"), name),
+        ],
+    )
+    page = driver.find_element(By.TAG_NAME, "html")
+    driver.find_element(
+        By.XPATH, '//input[@value="Confirm the reconfiguration"]'
+    ).submit()
+    return page
 
-    for i, aircraft_link in enumerate(aircraft_links):
-        logging.debug(f"Reconfiguring seat on Aircraft {i+1}")
-        driver.get(aircraft_link + "/reconfigure")
-        _clear_all_and_enter(
-            [
-                (driver.find_element("id", "ecoManualInput"), seat_config["economy"]),
-                (driver.find_element("id", "busManualInput"), seat_config["business"]),
-                (driver.find_element("id", "firstManualInput"), seat_config["first"]),
-                (driver.find_element("id", "cargoManualInput"), seat_config["cargo"]),
-                (
-                    driver.find_element("id", "aircraft_name"),
-                    f"{hub}-{destination}-{i}",
-                ),
-            ]
-        )
-        driver.find_element(
-            By.XPATH, '//input[@value="Confirm the reconfiguration"]'
-        ).submit()
+
+def _reconfigure_in_tabs(
+    driver: WebDriver, jobs: List[Tuple[str, str]], seat_config: WaveStat, tabs: int
+):
+    """Opens a batch of reconfigure pages in new tabs so they load together,
+    fills in each one, then waits for every submit to reload its tab before
+    closing it, a tab closed earlier can abort the POST"""
+    main = driver.current_window_handle
+    for start in range(0, len(jobs), tabs):
+        batch = jobs[start : start + tabs]
+        handles, pages = [], {}
+        for link, _ in batch:
+            before = set(driver.window_handles)
+            driver.execute_script("window.open(arguments[0], '_blank');", link)
+            handles.append((set(driver.window_handles) - before).pop())
+        try:
+            for handle, (_, name) in zip(handles, batch):
+                driver.switch_to.window(handle)
+                pages[handle] = _enter_seat_config(driver, seat_config, name)
+        finally:
+            for handle in handles:
+                driver.switch_to.window(handle)
+                if handle in pages:
+                    wait.page_reloaded(driver, pages[handle], wait.DEFAULT_TIMEOUT)
+                driver.close()
+            driver.switch_to.window(main)
+
+
+def _aircraft_on_line(driver: WebDriver) -> List[Dict[str, str]]:
+    rows = extract_rows(driver, FLIGHT_STATS_XPATH, AIRCRAFT_LINK_FIELDS)
+    if rows is not None and complete_rows(rows):
+        # @href is the raw attribute, it can be relative
+        return [{**row, "link": urljoin(urls.tycoon("/"), row["link"])} for row in rows]
+
+    return [
+        {
+            "seat_config": aircraft.find_element(
+                By.XPATH, FLIGHT_STATS_FIELDS["seat_config"]
+            ).text.strip(),
+            "link": aircraft.find_element(
+                By.LINK_TEXT, "Aircraft details"
+            ).get_attribute("href"),
+        }
+        for aircraft in driver.find_elements(By.XPATH, FLIGHT_STATS_XPATH)
+    ]
 
 
 @retry(delay=2, tries=5)
@@ -216,79 +358,71 @@ def reconfigure_flight_seats(
     hub: str,
     destination: str,
     seat_config: WaveStat,
-):
+    tabs: int = 1,
+) -> int:
+    """Reconfigures the aircraft on the line that don't have seat_config yet,
+    returns how many were changed"""
     _select_route(driver, f"{hub} - {destination}")
-    aircrafts = driver.find_elements(By.XPATH, '//div[@class="aircraftListView"]/div')
-    aircraft_links = []
-    for aircraft in aircrafts:
-        aircraft_links.append(
-            aircraft.find_element(By.LINK_TEXT, "Aircraft details").get_attribute(
-                "href"
-            )
-        )
-
-    for i, aircraft_link in enumerate(aircraft_links):
-        logging.debug(f"Reconfiguring seat on Aircraft {i+1}")
-        driver.get(aircraft_link + "/reconfigure")
-        time.sleep(1)
-        _clear_all_and_enter(
-            [
-                (driver.find_element("id", "ecoManualInput"), seat_config.economy),
-                (driver.find_element("id", "busManualInput"), seat_config.business),
-                (driver.find_element("id", "firstManualInput"), seat_config.first),
-                (driver.find_element("id", "cargoManualInput"), seat_config.cargo),
-                (
-                    driver.find_element("id", "aircraft_name"),
-                    f"{hub}-{destination}-{i}",
-                ),
-            ]
+    jobs = [
+        (aircraft["link"] + "/reconfigure", f"{hub}-{destination}-{i}")
+        for i, aircraft in enumerate(_aircraft_on_line(driver))
+        if not seat_config_matches(aircraft["seat_config"], seat_config)
+    ]
+    logging.debug(f"Reconfiguring {len(jobs)} aircraft on {hub} - {destination}")
+    if tabs > 1 and len(jobs) > 1:
+        _reconfigure_in_tabs(driver, jobs, seat_config, tabs)
+        return len(jobs)
+
+    for link, name in jobs:
+        driver.get(link)
+        wait.page_reloaded(
+            driver, _enter_seat_config(driver, seat_config, name), wait.DEFAULT_TIMEOUT
         )
-        driver.find_element(
-            By.XPATH, '//input[@value="Confirm the reconfiguration"]'
-        ).submit()
-        time.sleep(1)
+    return len(jobs)
 
 
 def buy_route(driver: WebDriver, hub: str, destination: str, hub_id: int):
     if not hub_id:
         raise Exception("Unknown hub")
 
-    driver.get(
-        f"http://tycoon.airlines-manager.com/network/newlinefinalize/{hub_id}/{destination.lower()}"
-    )
+    driver.get(urls.tycoon(f"/network/newlinefinalize/{hub_id}/{destination.lower()}"))
     driver.find_element(By.XPATH, '//*[@id="linePurchaseForm"]/input').submit()
     logging.info(f"Bought route {hub} -- {destination}")
 
 
-def _assigned_flight_count(driver, hub, destination):
+def assigned_flight_count(driver, hub, destination):
     _select_route(driver, f"{hub} - {destination}")
-    time.sleep(2)
     return int(
-        driver.find_element(
-            By.XPATH, '//div[@id="showLine"]/div[3]/ul[1]/li[2]/strong'
+        wait.element_present(
+            driver, By.XPATH, '//div[@id="showLine"]/div[3]/ul[1]/li[2]/strong'
         ).text
     )
 
 
-def _searchable_aircraft_model(raw: str):
+def searchable_aircraft_model(raw: str):
     return raw.replace("Ił-", "")
 
 
+def _filter_hub(driver: WebDriver, hub_id: int):
+    hub_filter = f"//span[@data-hubid='{hub_id}']"
+    js_click(driver, wait.element_present(driver, By.XPATH, hub_filter))
+    wait.ajax_idle(driver)
+    js_click(driver, wait.element_present(driver, By.XPATH, hub_filter))
+    wait.ajax_idle(driver)
+
+
 def _select_flight(
     driver: WebDriver,
     hub_id: int,
     aircraft_model: str,
     sort_by="utilizationPercentageAsc",
 ):
-    time.sleep(1)
-    js_click(driver, driver.find_element(By.XPATH, f"//span[@data-hubid='{hub_id}']"))
-    time.sleep(1)
-    js_click(driver, driver.find_element(By.XPATH, f"//span[@data-hubid='{hub_id}']"))
-    time.sleep(1)
-    el = driver.find_element("id", "aircraftNameFilter")
+    _filter_hub(driver, hub_id)
+    el = wait.element_present(driver, "id", "aircraftNameFilter")
     el.clear()
-    el.send_keys(_searchable_aircraft_model(aircraft_model))
-    time.sleep(1)
+    el.send_keys(searchable_aircraft_model(aircraft_model))
+    wait.input_value(driver, el, searchable_aircraft_model(aircraft_model))
+    wait.ajax_idle(driver)
     js_click(
         driver,
         driver.find_element(By.CSS_SELECTOR, f"input[type='radio'][value='{sort_by}']"),
@@ -296,7 +430,7 @@ def _select_flight(
 
 
 def _check_for_free_aircraft(driver: WebDriver, hub, aircraft_model):
-    time.sleep(1)
+    wait.ajax_idle(driver)
     try:
         use = driver.find_element(
             By.XPATH, "//*[@class='aircraftsBox']/div[1]/div[2]/span[1]/b"
@@ -339,22 +473,214 @@ def _schedule_a_flight(driver: WebDriver, hub_id, hub, destination, aircraft_mod
     logging.debug("Scheduling a flight... success")
 
 
-def assign_flights(
+AIRCRAFT_BOX_XPATH = "//*[@class='aircraftsBox']/div"
+AIRCRAFT_BOX_FIELDS = {"name": "div[1]", "use": "div[2]/span[1]/b"}
+
+
+def _free_aircraft(driver: WebDriver) -> List[str]:
+    wait.ajax_idle(driver)
+    rows = extract_rows(driver, AIRCRAFT_BOX_XPATH, AIRCRAFT_BOX_FIELDS) or []
+    return [row["name"] for row in rows if row["use"] == "0%"]
+
+
+def _is_filtered(
+    driver: WebDriver, aircraft_model: str, sort_by="utilizationPercentageAsc"
+) -> bool:
+    name_filter = driver.find_elements("id", "aircraftNameFilter")
+    sort = driver.find_elements(
+        By.CSS_SELECTOR, f"input[type='radio'][value='{sort_by}']"
+    )
+    return (
+        len(name_filter) > 0
+        and name_filter[0].get_attribute("value")
+        == searchable_aircraft_model(aircraft_model)
+        and len(sort) > 0
+        and sort[0].is_selected()
+    )
+
+
+def _schedule_first_free(
+    driver: WebDriver, hub: str, destination: str, aircraft_model: str
+) -> str:
+    _check_for_free_aircraft(driver, hub, aircraft_model)
+    aircraft = driver.find_element(By.XPATH, f"{AIRCRAFT_BOX_XPATH}[1]/div[1]").text
+    _select_route_for_aircraft(driver, hub, destination)
+    js_click(
+        driver,
+        driver.find_element(
+            By.XPATH, '//table[@class="planningArea"]/tbody/tr[2]/td[3]'
+        ),
+    )
+    js_click(
+        driver,
+        driver.find_element(
+            By.XPATH, '//div[@id="planning"]/table[1]/tbody/tr[2]/td[1]/img'
+        ),
+    )
+    page = driver.find_element(By.TAG_NAME, "html")
+    js_click(driver, driver.find_element("id", "planningSubmit"))
+    wait.page_reloaded(driver, page)
+    return aircraft
+
+
+@retry(delay=2, tries=5)
+def _schedule_in_session(
+    driver: WebDriver, hub_id: int, hub: str, destination: str, aircraft_model: str
+) -> str:
+    try:
+        if not _is_filtered(driver, aircraft_model):
+            _select_flight(driver, hub_id, aircraft_model)
+        return _schedule_first_free(driver, hub, destination, aircraft_model)
+    except Exception:
+        driver.get(urls.tycoon(PLANNING_PATH))
+        raise
+
+
+def schedule_flights_in_session(
     driver: WebDriver,
     hub_id: int,
     hub: str,
-    destination: str,
-    route_stats: RouteStats,
+    flights: Dict[str, int],
     aircraft_model: str,
-    nth_best_config: 2,
-):
-    best_config = route_stats.wave_stats[
-        list(route_stats.wave_stats.keys())[-nth_best_config]
+) -> List[ScheduleResult]:
+    """Schedules flights[destination] free aircraft on every destination of
+    the hub. The game saves one aircraft's planning per submit, so every
+    flight is still submitted on its own, but the planning page is loaded
+    and filtered once and the filter is only applied again when a submit
+    lost it. Each flight is retried like _schedule_a_flight."""
+    driver.get(urls.tycoon(PLANNING_PATH))
+    _select_flight(driver, hub_id, aircraft_model)
+    free = _free_aircraft(driver)
+    planned = [dest for dest, count in flights.items() for _ in range(count)]
+    logging.info(
+        f"Scheduling {len(planned)} flights in {hub} on {len(free)} free {aircraft_model}"
+    )
+
+    results = []
+    for i, destination in enumerate(planned):
+        if i >= len(free):
+            results.append(
+                ScheduleResult(destination, error=f"No free {aircraft_model} left")
+            )
+            continue
+
+        try:
+            aircraft = _schedule_in_session(
+                driver, hub_id, hub, destination, aircraft_model
+            )
+            results.append(ScheduleResult(destination, aircraft, True))
+            logging.debug(f"Scheduled {aircraft} on {hub} - {destination}")
+        except Exception as ex:
+            logging.error(f"Scheduling a flight on {hub} - {destination}: {ex}")
+            results.append(ScheduleResult(destination, error=str(ex)))
+    return results
+
+
+# Aircraft boxes of the planning page filtered by one hub, the id is read
+# from the box's aircraft details link like the line pages' links
+AIRCRAFT_ID_REGX = r"/aircraft/show/(\d+)"
+FLEET_FIELDS = {
+    "link": ".//a[contains(@href, '/aircraft/show/')]/@href",
+    "model": "div[2]/span[2]",
+    **AIRCRAFT_BOX_FIELDS,
+}
+
+
+def _use(text: str) -> int:
+    return int(non_decimal.sub("", text) or 0)
+
+
+def _hub_fleet(driver: WebDriver, hub_id: int) -> List[FleetAircraft]:
+    driver.get(urls.tycoon(PLANNING_PATH))
+    _filter_hub(driver, hub_id)
+    rows = extract_rows(driver, AIRCRAFT_BOX_XPATH, FLEET_FIELDS)
+    if rows is None or not complete_rows(rows):
+        raise Exception(f"Can't read the fleet of HUB {hub_id} from the planning page")
+
+    return [
+        FleetAircraft(
+            id=int(re.search(AIRCRAFT_ID_REGX, row["link"]).group(1)),
+            name=row["name"],
+            model=row["model"],
+            hub_id=hub_id,
+            use=_use(row["use"]),
+        )
+        for row in rows
     ]
+
+
+def fleet(driver: WebDriver) -> List[FleetAircraft]:
+    """Every aircraft of the airline, a planning page filtered by each hub"""
+    driver.get(urls.tycoon(PLANNING_PATH))
+    wait.element_present(driver, By.XPATH, "//span[@data-hubid]")
+    hub_ids = [
+        int(el.get_attribute("data-hubid"))
+        for el in driver.find_elements(By.XPATH, "//span[@data-hubid]")
+    ]
+    return [aircraft for hub_id in hub_ids for aircraft in _hub_fleet(driver, hub_id)]
+
+
+def _aircraft_box(driver: WebDriver, aircraft_id: int):
+    # The trailing / keeps /aircraft/show/1 from matching /aircraft/show/12
+    link = f"/aircraft/show/{aircraft_id}/"
+    xpath = f"{AIRCRAFT_BOX_XPATH}[.//a[contains(concat(@href, '/'), '{link}')]]"
+    if not driver.find_elements(By.XPATH, xpath):
+        driver.get(urls.tycoon(PLANNING_PATH))
+    return wait.element_present(driver, By.XPATH, xpath)
+
+
+def _aircraft_use(driver: WebDriver, aircraft_id: int) -> int:
+    box = _aircraft_box(driver, aircraft_id)
+    return _use(box.find_element(By.XPATH, AIRCRAFT_BOX_FIELDS["use"]).text)
+
+
+def plan_aircraft(
+    driver: WebDriver, aircraft_id: int, hub: str, destination: str
+) -> int:
+    """Plans the aircraft on the line, returns its utilization after"""
+    js_click(driver, _aircraft_box(driver, aircraft_id))
+    _select_route_for_aircraft(driver, hub, destination)
+    js_click(
+        driver,
+        driver.find_element(
+            By.XPATH, '//table[@class="planningArea"]/tbody/tr[2]/td[3]'
+        ),
+    )
+    js_click(
+        driver,
+        driver.find_element(
+            By.XPATH, '//div[@id="planning"]/table[1]/tbody/tr[2]/td[1]/img'
+        ),
+    )
+    page = driver.find_element(By.TAG_NAME, "html")
+    js_click(driver, driver.find_element("id", "planningSubmit"))
+    wait.page_reloaded(driver, page)
+    return _aircraft_use(driver, aircraft_id)
+
+
+def clear_aircraft(driver: WebDriver, aircraft_id: int) -> int:
+    """Clears the aircraft's planning, returns its utilization after"""
+    js_click(driver, _aircraft_box(driver, aircraft_id))
+    js_click(driver, driver.find_element("id", "tableButtonClearSchedule"))
+    wait.ajax_idle(driver)
+    page = driver.find_element(By.TAG_NAME, "html")
+    js_click(driver, driver.find_element("id", "planningSubmit"))
+    wait.page_reloaded(driver, page)
+    return _aircraft_use(driver, aircraft_id)
+
+
+def flights_to_schedule(
+    driver: WebDriver,
+    hub: str,
+    destination: str,
+    route_stats: RouteStats,
+    best_config: WaveStat,
+) -> int:
+    """Flights the line still needs for the picked wave config"""
     logging.debug(
         f"Configuring route {hub} - {destination} with best config:\n\t{best_config}"
     )
-    assigned_aircrafts = _assigned_flight_count(driver, hub, destination)
+    assigned_aircrafts = assigned_flight_count(driver, hub, destination)
     if assigned_aircrafts > 0 and assigned_aircrafts != len(
         route_stats.scheduled_flights
     ):
@@ -365,10 +691,36 @@ def assign_flights(
     logging.debug(
         f"Excluding already configured {assigned_aircrafts}, scheduing {best_config.no - assigned_aircrafts} flights"
     )
-    for i in range(0, best_config.no - assigned_aircrafts):
+    return best_config.no - assigned_aircrafts
+
+
+def assign_flights(
+    driver: WebDriver,
+    hub_id: int,
+    hub: str,
+    destination: str,
+    route_stats: RouteStats,
+    aircraft_model: str,
+    best_config: WaveStat,
+    bulk: bool = False,
+) -> List[ScheduleResult]:
+    missing = flights_to_schedule(driver, hub, destination, route_stats, best_config)
+    if bulk:
+        return schedule_flights_in_session(
+            driver,
+            hub_id,
+            hub,
+            {destination: missing},
+            aircraft_model,
+        )
+
+    results = []
+    for i in range(0, missing):
         logging.debug(f"Scheduling flight {i+1}...")
-        driver.get("http://tycoon.airlines-manager.com/network/planning")
+        driver.get(urls.tycoon(PLANNING_PATH))
         _schedule_a_flight(driver, hub_id, hub, destination, aircraft_model)
+        results.append(ScheduleResult(destination, scheduled=True))
+    return results
 
 
 def remove_wrong_flights(
@@ -381,14 +733,14 @@ def remove_wrong_flights(
 ):
     name_prefix = f"{hub}-{destination}"
     while True:
-        assigned_aircrafts = _assigned_flight_count(driver, hub, destination)
+        assigned_aircrafts = assigned_flight_count(driver, hub, destination)
         if assigned_aircrafts <= config.no:
             break
 
         logging.error(
             f"The route has {assigned_aircrafts-config.no} more flights than required"
         )
-        driver.get("http://tycoon.airlines-manager.com/network/planning")
+        driver.get(urls.tycoon(PLANNING_PATH))
         _remove_a_flight(driver, hub_id, name_prefix, hub, aircraft_model)
 
 
@@ -402,12 +754,13 @@ def _remove_a_flight(
 ):
     logging.debug("Try removing a flight...")
     _select_flight(driver, hub_id, name_prefix, sort_by="utilizationPercentageDesc")
-    time.sleep(1)
+    wait.ajax_idle(driver)
     _check_assigned_flight(driver, hub, aircraft_model, name_prefix)
     js_click(driver, driver.find_element("id", "tableButtonClearSchedule"))
-    time.sleep(1)
+    wait.ajax_idle(driver)
+    page = driver.find_element(By.TAG_NAME, "html")
     js_click(driver, driver.find_element("id", "planningSubmit"))
-    time.sleep(1)
+    wait.page_reloaded(driver, page)
     logging.debug("Removing a flight... success")
 
 
@@ -436,11 +789,10 @@ def buy_aircraft(
     seat_config: WaveStat = None,
 ):
     logging.info(f"Buying {number} of {aircraft_make} - {aircraft_model} to HUB {hub}")
-    driver.get(
-        f"https://tycoon.airlines-manager.com/aircraft/buy/new/{aircraft_make.lower()}"
+    driver.get(urls.tycoon(f"/aircraft/buy/new/{aircraft_make.lower()}"))
+    aircraft_list = wait.element_count(
+        driver, By.XPATH, '//div[@class="aircraftList"]/div', 1
     )
-    time.sleep(5)
-    aircraft_list = driver.find_elements(By.XPATH, '//div[@class="aircraftList"]/div')
     for aircraft in aircraft_list:
         if aircraft.get_attribute("id") == "noAircraftFound":
             continue
@@ -458,13 +810,12 @@ def buy_aircraft(
             el.clear()
             el.send_keys(str(number))
             el.send_keys(Keys.ENTER)
-            time.sleep(2)
-            aircraft_hub = Select(driver.find_element("id", "aircraft_hub"))
+            aircraft_hub = Select(wait.element_present(driver, "id", "aircraft_hub"))
             for option in aircraft_hub.options:
                 if hub.lower() in option.text.lower():
                     option.click()
 
-            time.sleep(2)
+            wait.ajax_idle(driver)
             driver.find_element(
                 By.XPATH,
                 '//*[@id="buyAircraft_bucket"]/form/div[1]/div[1]/div[2]/span[1]/img',
@@ -475,6 +826,7 @@ def buy_aircraft(
             )
             if seat_config:
                 _clear_all_and_enter(
+                    driver,
                     [
                         (
                             driver.find_element(By.CSS_SELECTOR, ".ecoManualInput"),
@@ -498,12 +850,13 @@ def buy_aircraft(
                             ).find_element(By.XPATH, "div/input"),
                             f"{hub}-{destination}",
                         ),
-                    ]
+                    ],
                 )
             el.clear()
             el.send_keys(Keys.BACKSPACE * 1)
             el.send_keys(number)
             el.send_keys(Keys.ENTER)
+            page = driver.find_element(By.TAG_NAME, "html")
             js_click(
                 driver,
                 driver.find_element(
@@ -511,9 +864,9 @@ def buy_aircraft(
                     '//*[@id="resumeBoxForJs"]/div[2]/form/div[2]/input',
                 ),
             )
-            time.sleep(5)
+            wait.page_reloaded(driver, page)
             logging.info(f"Bought {number} of {aircraft_model} to HUB {hub}")
-            rc = driver.find_element(By.XPATH, '//*[@id="ressource3"]').text
+            rc = wait.element_present(driver, By.XPATH, '//*[@id="ressource3"]').text
             logging.info(f"Remaining cash == ${rc}")
             return
 
@@ -1,5 +1,36 @@
+from typing import Any
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.chrome.service import Service as ChromiumService
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.remote.webdriver import WebDriver
+from webdriver_manager.chrome import ChromeDriverManager
+from tycoon.utils import ratelimit
+
+
+def new_driver(options: Any) -> WebDriver:
+    if options.firefox:
+        browser_options = FirefoxOptions()
+        browser_options.add_argument("--window-size=1920x1080")
+        browser_options.add_argument("--log-level=4")
+        if not options.no_headless:
+            browser_options.add_argument("--headless")
+        return ratelimit.instrument(webdriver.Firefox(options=browser_options))
+
+    manager = ChromeDriverManager(version="112.0.5615.28").install()
+    browser_options = ChromeOptions()
+    browser_options.add_argument("--window-size=1920x1080")
+    browser_options.add_argument("--log-level=4")
+    if not options.no_headless:
+        browser_options.add_argument("--headless")
+    return ratelimit.instrument(
+        webdriver.Chrome(
+            service=ChromiumService(manager),
+            options=browser_options,
+        )
+    )
 
 
 def js_click(driver: WebDriver, element: WebElement):
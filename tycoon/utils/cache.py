@@ -0,0 +1,168 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+
+def make_key(*parts: Any) -> str:
+    """Content address of the parts, stable across runs"""
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """A persistent key/value cache in SQLite with a TTL per entry and least
+    recently used eviction once it holds more than max_entries.
+
+    Args:
+        ttl (float): seconds an entry stays valid, None never expires
+    """
+
+    def __init__(
+        self,
+        path: str,
+        name: str,
+        ttl: Optional[float] = None,
+        max_entries: int = 10_000,
+    ):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"""CREATE TABLE IF NOT EXISTS {name} (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {name}_accessed ON {name} (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created_at FROM {self.name} WHERE key = ?", (key,)
+            ).fetchone()
+            if row and self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute(f"DELETE FROM {self.name} WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                f"UPDATE {self.name} SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key: str, value: Any):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.name} VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            self._conn.execute(
+                f"""DELETE FROM {self.name} WHERE key IN (
+                    SELECT key FROM {self.name} ORDER BY accessed_at DESC
+                    LIMIT -1 OFFSET ?
+                )""",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.name} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.name}").fetchone()[0]
+
+    def log_stats(self):
+        total = self.hits + self.misses
+        if total == 0:
+            return
+        logging.info(
+            f"Cache {self.name}: {self.hits} hits, {self.misses} misses ({self.hits / total:.0%} hit rate), {len(self)} entries"
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+CACHE_FILE = "cache.sqlite"
+
+
+def add_options(parser):
+    parser.add_argument(
+        "--seat_cache_ttl",
+        type=float,
+        help="Hours a cached noway seat config stays valid, 0 disables the cache (Default: 24)",
+        default=24,
+    )
+    parser.add_argument(
+        "--seat_cache_size",
+        type=int,
+        help="Max no. of cached noway seat configs (Default: 5000)",
+        default=5000,
+    )
+    parser.add_argument(
+        "--route_cache_ttl",
+        type=float,
+        help="Minutes cached route prices & demand stay valid, 0 disables the cache (Default: 60)",
+        default=60,
+    )
+
+
+def seat_config_cache(options: Any) -> Optional[DiskCache]:
+    if not options.seat_cache_ttl:
+        return None
+    return DiskCache(
+        os.path.join(options.tmp_folder, CACHE_FILE),
+        "seat_configs",
+        ttl=options.seat_cache_ttl * 3600,
+        max_entries=options.seat_cache_size,
+    )
+
+
+class RouteCache:
+    """Tiered cache for route_stats, static route metadata is kept forever,
+    prices and demand for ttl seconds and scheduled flights never.
+    """
+
+    def __init__(self, path: str, prices_ttl: float):
+        self.static = DiskCache(path, "route_static")
+        self.prices = DiskCache(path, "route_prices", ttl=prices_ttl)
+
+    def log_stats(self):
+        self.static.log_stats()
+        self.prices.log_stats()
+
+
+def route_cache(options: Any) -> Optional[RouteCache]:
+    if not options.route_cache_ttl:
+        return None
+    return RouteCache(
+        os.path.join(options.tmp_folder, CACHE_FILE),
+        prices_ttl=options.route_cache_ttl * 60,
+    )
@@ -0,0 +1,100 @@
+import logging
+from typing import List
+
+import numpy as np
+from tycoon.utils.aircraft_specs import AircraftSpec
+from tycoon.utils.data import CircuitInfo, CircuitRow
+from tycoon.utils.route_finder import AirportIndex, flight_hours, format_duration
+
+SLOTS_PER_HOUR = 4
+
+
+def _pack(slots: np.ndarray, quality: np.ndarray, capacity: int) -> List[int]:
+    """0/1 knapsack filling as many slots as possible, best quality on ties
+
+    Returns positions of the picked items.
+    """
+    best = np.full(capacity + 1, -np.inf)
+    best[0] = 0.0
+    picked = np.zeros((len(slots), capacity + 1), dtype=bool)
+    for i, (size, value) in enumerate(zip(slots, quality)):
+        if size > capacity:
+            continue
+        candidate = np.full(capacity + 1, -np.inf)
+        candidate[size:] = best[: capacity + 1 - size] + value
+        better = candidate > best
+        picked[i] = better
+        best = np.where(better, candidate, best)
+
+    filled = int(np.max(np.nonzero(np.isfinite(best))[0]))
+    items = []
+    for i in range(len(slots) - 1, -1, -1):
+        if filled == 0:
+            break
+        if picked[i, filled]:
+            items.append(i)
+            filled -= slots[i]
+    return items[::-1]
+
+
+def find_circuits(
+    index: AirportIndex,
+    hub: str,
+    spec: AircraftSpec,
+    hours: int,
+    exclude: List[str],
+    next_id: int,
+    count: int = 1,
+    new_circuit_status: int = 3,
+) -> List[CircuitInfo]:
+    """Finds up to count circuits from the hub not sharing any destination,
+    ranked by how much of the hours budget they fill.
+    """
+    logging.info(
+        f"Finding {count} circuits locally from {hub} with {spec.make} {spec.model} for {hours} hours"
+    )
+    positions, distances = index.within(hub, 0, spec.range_km)
+    keep = ~np.isin(index.iata[positions], list(exclude))
+    positions, distances = positions[keep], distances[keep]
+    durations = flight_hours(distances, spec)
+    slots = np.ceil(2 * durations * SLOTS_PER_HOUR).astype(int)
+    airports = index.airports.iloc[positions]
+    quality = airports["cat"].to_numpy(dtype=float) * 10 + airports["stars"].to_numpy(
+        dtype=float
+    )
+
+    capacity = hours * SLOTS_PER_HOUR
+    available = np.ones(len(positions), dtype=bool)
+    circuits = []
+    for _ in range(count):
+        candidates = np.nonzero(available)[0]
+        if len(candidates) == 0:
+            break
+        items = candidates[_pack(slots[candidates], quality[candidates], capacity)]
+        if len(items) == 0:
+            break
+        available[items] = False
+        circuits.append(
+            (
+                int(slots[items].sum()),
+                float(quality[items].sum()),
+                [
+                    CircuitRow(
+                        no=no + 1,
+                        destination=index.iata[positions[i]],
+                        country=airports.iloc[i]["country"],
+                        cat=int(airports.iloc[i]["cat"]),
+                        stars=int(airports.iloc[i]["stars"]),
+                        distance=str(int(round(distances[i]))),
+                        time=format_duration(durations[i]),
+                    )
+                    for no, i in enumerate(items)
+                ],
+            )
+        )
+
+    circuits.sort(key=lambda c: (c[0], c[1]), reverse=True)
+    return [
+        CircuitInfo(id=next_id + i, rows=rows, status=new_circuit_status)
+        for i, (_, _, rows) in enumerate(circuits)
+    ]
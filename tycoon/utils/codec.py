@@ -0,0 +1,286 @@
+"""Encoders for the tycoon.utils.data dataclasses without dataclass_json's
+per call type inspection. dumps / loads read and write the same JSON as
+to_json / from_json, pack / unpack store the positional tuples in binary."""
+import json
+import marshal
+from typing import Any, Callable, Dict, Type, TypeVar
+
+from tycoon.utils.data import (
+    CircuitInfo,
+    CircuitRow,
+    RouteStat,
+    RouteStats,
+    ScheduledAircraftConfig,
+    WaveStat,
+)
+
+T = TypeVar("T")
+
+MAGIC = b"TYC"
+VERSION = 1
+MARSHAL_VERSION = 4
+CLASSES = ("economy", "business", "first", "cargo")
+
+
+# dataclass_json converts values to the annotated type while decoding,
+# scraped fields are stored as strings until then
+def _int(value):
+    return value if value is None or type(value) is int else int(value)
+
+
+def _float(value):
+    return value if value is None or type(value) is float else float(value)
+
+
+def _str(value):
+    return value if value is None or type(value) is str else str(value)
+
+
+def _route_stat_dict(s: RouteStat) -> dict:
+    return {
+        "price": s.price,
+        "demand": s.demand,
+        "remaining_demand": s.remaining_demand,
+    }
+
+
+def _route_stat_from_dict(d: dict) -> RouteStat:
+    return RouteStat(_int(d["price"]), _int(d["demand"]), _int(d["remaining_demand"]))
+
+
+def _flight_dict(s: ScheduledAircraftConfig) -> dict:
+    return {"model": s.model, "seat_config": s.seat_config, "result": s.result}
+
+
+def _flight_from_dict(d: dict) -> ScheduledAircraftConfig:
+    return ScheduledAircraftConfig(
+        _str(d["model"]), _str(d["seat_config"]), _float(d["result"])
+    )
+
+
+def _wave_stat_dict(s: WaveStat) -> dict:
+    return {
+        "no": s.no,
+        "economy": s.economy,
+        "business": s.business,
+        "first": s.first,
+        "cargo": s.cargo,
+        "turnover_per_wave": s.turnover_per_wave,
+        "roi": s.roi,
+        "total_turnover": s.total_turnover,
+        "turnover_days": s.turnover_days,
+        "max_configured": s.max_configured,
+    }
+
+
+def _wave_stat_from_dict(d: dict) -> WaveStat:
+    return WaveStat(
+        _int(d["no"]),
+        _int(d["economy"]),
+        _int(d["business"]),
+        _int(d["first"]),
+        _int(d["cargo"]),
+        _float(d["turnover_per_wave"]),
+        _float(d["roi"]),
+        _float(d["total_turnover"]),
+        _int(d["turnover_days"]),
+        _str(d["max_configured"]),
+    )
+
+
+def _route_stats_dict(s: RouteStats) -> dict:
+    d = {
+        name: None if stat is None else _route_stat_dict(stat)
+        for name, stat in zip(CLASSES, (s.economy, s.business, s.first, s.cargo))
+    }
+    d["category"] = s.category
+    d["distance"] = s.distance
+    d["scheduled_flights"] = [_flight_dict(f) for f in s.scheduled_flights]
+    d["wave_stats"] = {k: _wave_stat_dict(w) for k, w in s.wave_stats.items()}
+    return d
+
+
+def _route_stats_from_dict(d: dict) -> RouteStats:
+    stats = [d.get(name) for name in CLASSES]
+    return RouteStats(
+        *[None if stat is None else _route_stat_from_dict(stat) for stat in stats],
+        category=_int(d.get("category", 0)),
+        distance=_int(d.get("distance", 0)),
+        scheduled_flights=[
+            _flight_from_dict(f) for f in d.get("scheduled_flights") or []
+        ],
+        wave_stats={
+            int(k): _wave_stat_from_dict(w)
+            for k, w in (d.get("wave_stats") or {}).items()
+        },
+    )
+
+
+def _circuit_row_dict(s: CircuitRow) -> dict:
+    return {
+        "no": s.no,
+        "destination": s.destination,
+        "country": s.country,
+        "cat": s.cat,
+        "stars": s.stars,
+        "distance": s.distance,
+        "time": s.time,
+    }
+
+
+def _circuit_row_from_dict(d: dict) -> CircuitRow:
+    return CircuitRow(
+        _int(d["no"]),
+        _str(d["destination"]),
+        _str(d["country"]),
+        _int(d["cat"]),
+        _int(d["stars"]),
+        _str(d["distance"]),
+        _str(d["time"]),
+    )
+
+
+def _circuit_info_dict(s: CircuitInfo) -> dict:
+    return {
+        "id": s.id,
+        "rows": [_circuit_row_dict(r) for r in s.rows],
+        "status": s.status,
+    }
+
+
+def _circuit_info_from_dict(d: dict) -> CircuitInfo:
+    return CircuitInfo(
+        _int(d["id"]),
+        [_circuit_row_from_dict(r) for r in d["rows"]],
+        _int(d["status"]),
+    )
+
+
+def _route_stat_tuple(s: RouteStat) -> tuple:
+    return (s.price, s.demand, s.remaining_demand)
+
+
+def _flight_tuple(s: ScheduledAircraftConfig) -> tuple:
+    return (s.model, s.seat_config, s.result)
+
+
+def _wave_stat_tuple(s: WaveStat) -> tuple:
+    return (
+        s.no,
+        s.economy,
+        s.business,
+        s.first,
+        s.cargo,
+        s.turnover_per_wave,
+        s.roi,
+        s.total_turnover,
+        s.turnover_days,
+        s.max_configured,
+    )
+
+
+def _route_stats_tuple(s: RouteStats) -> tuple:
+    return (
+        *[
+            None if stat is None else _route_stat_tuple(stat)
+            for stat in (s.economy, s.business, s.first, s.cargo)
+        ],
+        s.category,
+        s.distance,
+        tuple(_flight_tuple(f) for f in s.scheduled_flights),
+        tuple((k, _wave_stat_tuple(w)) for k, w in s.wave_stats.items()),
+    )
+
+
+def _route_stats_from_tuple(t: tuple) -> RouteStats:
+    return RouteStats(
+        *[None if stat is None else RouteStat(*stat) for stat in t[:4]],
+        category=t[4],
+        distance=t[5],
+        scheduled_flights=[ScheduledAircraftConfig(*f) for f in t[6]],
+        wave_stats={k: WaveStat(*w) for k, w in t[7]},
+    )
+
+
+def _circuit_row_tuple(r: CircuitRow) -> tuple:
+    return (r.no, r.destination, r.country, r.cat, r.stars, r.distance, r.time)
+
+
+def _circuit_info_tuple(s: CircuitInfo) -> tuple:
+    return (s.id, tuple(_circuit_row_tuple(r) for r in s.rows), s.status)
+
+
+def _circuit_info_from_tuple(t: tuple) -> CircuitInfo:
+    return CircuitInfo(t[0], [CircuitRow(*r) for r in t[1]], t[2])
+
+
+ENCODERS: Dict[Type, Callable[[Any], dict]] = {
+    RouteStat: _route_stat_dict,
+    ScheduledAircraftConfig: _flight_dict,
+    WaveStat: _wave_stat_dict,
+    RouteStats: _route_stats_dict,
+    CircuitRow: _circuit_row_dict,
+    CircuitInfo: _circuit_info_dict,
+}
+DECODERS: Dict[Type, Callable[[dict], Any]] = {
+    RouteStat: _route_stat_from_dict,
+    ScheduledAircraftConfig: _flight_from_dict,
+    WaveStat: _wave_stat_from_dict,
+    RouteStats: _route_stats_from_dict,
+    CircuitRow: _circuit_row_from_dict,
+    CircuitInfo: _circuit_info_from_dict,
+}
+TUPLE_ENCODERS: Dict[Type, Callable[[Any], tuple]] = {
+    RouteStat: _route_stat_tuple,
+    ScheduledAircraftConfig: _flight_tuple,
+    WaveStat: _wave_stat_tuple,
+    RouteStats: _route_stats_tuple,
+    CircuitRow: _circuit_row_tuple,
+    CircuitInfo: _circuit_info_tuple,
+}
+TUPLE_DECODERS: Dict[Type, Callable[[tuple], Any]] = {
+    RouteStat: lambda t: RouteStat(*t),
+    ScheduledAircraftConfig: lambda t: ScheduledAircraftConfig(*t),
+    WaveStat: lambda t: WaveStat(*t),
+    RouteStats: _route_stats_from_tuple,
+    CircuitRow: lambda t: CircuitRow(*t),
+    CircuitInfo: _circuit_info_from_tuple,
+}
+
+
+def to_dict(obj) -> dict:
+    return ENCODERS[type(obj)](obj)
+
+
+def from_dict(cls: Type[T], d: dict) -> T:
+    return DECODERS[cls](d)
+
+
+def dumps(obj) -> str:
+    """Same output as obj.to_json()"""
+    return json.dumps(ENCODERS[type(obj)](obj))
+
+
+def loads(cls: Type[T], raw: str) -> T:
+    """Same result as cls.from_json(raw)"""
+    return DECODERS[cls](json.loads(raw))
+
+
+def to_tuple(obj) -> tuple:
+    return TUPLE_ENCODERS[type(obj)](obj)
+
+
+def from_tuple(cls: Type[T], t: tuple) -> T:
+    return TUPLE_DECODERS[cls](t)
+
+
+def pack(obj) -> bytes:
+    """Binary form of obj, only meant to be read back by unpack on the same
+    major python version"""
+    return MAGIC + bytes([VERSION]) + marshal.dumps(to_tuple(obj), MARSHAL_VERSION)
+
+
+def unpack(cls: Type[T], raw: bytes) -> T:
+    if raw[:3] != MAGIC or raw[3] != VERSION:
+        raise Exception(f"Not a packed {cls.__name__}, version {VERSION}")
+    return TUPLE_DECODERS[cls](marshal.loads(raw[4:]))
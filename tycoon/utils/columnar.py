@@ -0,0 +1,255 @@
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from tycoon.utils import codec
+from tycoon.utils.data import RouteStat, RouteStats, ScheduledAircraftConfig, WaveStat
+
+CLASSES = ["economy", "business", "first", "cargo"]
+KEY = "key"
+
+# column -> dtype of every table, the key column comes first
+SCHEMA = {
+    "routes": {KEY: object, "category": "Int64", "distance": "Int64"},
+    "classes": {
+        KEY: object,
+        "class": object,
+        "price": "Int64",
+        "demand": "Int64",
+        "remaining_demand": "Int64",
+    },
+    "flights": {
+        KEY: object,
+        "position": "Int64",
+        "model": object,
+        "seat_config": object,
+        "result": "float64",
+    },
+    "waves": {
+        KEY: object,
+        "position": "Int64",
+        "wave": "Int64",
+        "no": "Int64",
+        "economy": "Int64",
+        "business": "Int64",
+        "first": "Int64",
+        "cargo": "Int64",
+        "turnover_per_wave": "float64",
+        "roi": "float64",
+        "total_turnover": "float64",
+        "turnover_days": "Int64",
+        "max_configured": object,
+    },
+}
+
+
+def _table(name: str, rows: list) -> pd.DataFrame:
+    columns = SCHEMA[name]
+    df = pd.DataFrame(rows, columns=list(columns))
+    # scraped prices, demands and results are digit strings
+    for column, dtype in columns.items():
+        if dtype is not object:
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+    return df.astype(columns)
+
+
+def _rows(key: Any, rs: RouteStats) -> Dict[str, list]:
+    """Rows of one route in every table of SCHEMA"""
+    rows = {name: [] for name in SCHEMA}
+    rows["routes"].append((key, rs.category, rs.distance))
+    for name in CLASSES:
+        stat: RouteStat = getattr(rs, name)
+        if stat is not None:
+            rows["classes"].append(
+                (key, name, stat.price, stat.demand, stat.remaining_demand)
+            )
+    for position, sf in enumerate(rs.scheduled_flights):
+        rows["flights"].append((key, position, sf.model, sf.seat_config, sf.result))
+    for position, (wave, ws) in enumerate(rs.wave_stats.items()):
+        rows["waves"].append(
+            (
+                key,
+                position,
+                wave,
+                ws.no,
+                ws.economy,
+                ws.business,
+                ws.first,
+                ws.cargo,
+                ws.turnover_per_wave,
+                ws.roi,
+                ws.total_turnover,
+                ws.turnover_days,
+                ws.max_configured,
+            )
+        )
+    return rows
+
+
+def _concat(routes: Iterable[Dict[str, list]]) -> Dict[str, pd.DataFrame]:
+    rows = {name: [] for name in SCHEMA}
+    for route in routes:
+        for name in SCHEMA:
+            rows[name].extend(route[name])
+    return {name: _table(name, rows[name]) for name in SCHEMA}
+
+
+def to_tables(stats: Iterable[Tuple[Any, RouteStats]]) -> Dict[str, pd.DataFrame]:
+    """Split (key, RouteStats) pairs into the typed tables of SCHEMA"""
+    return _concat(_rows(key, rs) for key, rs in stats)
+
+
+def from_frame(
+    df: pd.DataFrame, column: str = "route_stats"
+) -> Dict[str, pd.DataFrame]:
+    """Tables for the JSON encoded RouteStats column of a routes or circuit df,
+    keyed by the df index. Rows without stats are left out."""
+    stats = df[column].dropna()
+    return to_tables(
+        (key, codec.loads(RouteStats, value)) for key, value in stats.items()
+    )
+
+
+def _records(df: pd.DataFrame, key: Any) -> list:
+    if key not in df.index:
+        return []
+    return [
+        {k: None if pd.isna(v) else v for k, v in row.items()}
+        for row in df.loc[[key]].to_dict("records")
+    ]
+
+
+def _value(value: Any) -> Any:
+    return None if pd.isna(value) else value
+
+
+def from_tables(tables: Dict[str, pd.DataFrame]) -> Dict[Any, RouteStats]:
+    """Rebuild the RouteStats of every key from to_tables. Missing figures
+    stay None, scraped digit strings come back as the numbers they hold."""
+    classes = tables["classes"].set_index(KEY)
+    flights = tables["flights"].sort_values([KEY, "position"]).set_index(KEY)
+    waves = tables["waves"].sort_values([KEY, "position"]).set_index(KEY)
+
+    stats = {}
+    for route in tables["routes"].to_dict("records"):
+        key = route[KEY]
+        rs = RouteStats(
+            category=_value(route["category"]), distance=_value(route["distance"])
+        )
+        for row in _records(classes, key):
+            setattr(
+                rs,
+                row["class"],
+                RouteStat(row["price"], row["demand"], row["remaining_demand"]),
+            )
+        rs.scheduled_flights = [
+            ScheduledAircraftConfig(row["model"], row["seat_config"], row["result"])
+            for row in _records(flights, key)
+        ]
+        for row in _records(waves, key):
+            wave = row.pop("wave")
+            row.pop("position")
+            rs.wave_stats[wave] = WaveStat(**row)
+        stats[key] = rs
+    return stats
+
+
+def nth_best(waves: pd.DataFrame, n: int) -> pd.DataFrame:
+    """The nth wave from the end of every key's wave_stats, the first when
+    it has fewer, same pick as seat_optimizer.nth_best, indexed by key"""
+    waves = waves.sort_values([KEY, "position"])
+    groups = waves.groupby(KEY)
+    from_end = groups.cumcount(ascending=False)
+    count = groups[KEY].transform("size")
+    return waves[from_end == np.minimum(n, count) - 1].set_index(KEY)
+
+
+def save(tables: Dict[str, pd.DataFrame], path: str):
+    """Write every table as {path}/{name}.parquet"""
+    os.makedirs(path, exist_ok=True)
+    for name, df in tables.items():
+        df.to_parquet(os.path.join(path, f"{name}.parquet"), index=False)
+    logging.debug(f"Stored route_stats tables in {path}")
+
+
+def load(path: str) -> Dict[str, pd.DataFrame]:
+    return {
+        name: pd.read_parquet(os.path.join(path, f"{name}.parquet")).astype(columns)
+        for name, columns in SCHEMA.items()
+    }
+
+
+class RouteTables:
+    """The tables of a routes or circuit df kept current route by route,
+    only routes whose JSON changed since the last sync are decoded again.
+    Answers each route's wave_stats without decoding it.
+    """
+
+    def __init__(self, column: str = "route_stats"):
+        self._lock = threading.RLock()
+        self.column = column
+        self._raw: Dict[Any, str] = {}
+        self._rows: Dict[Any, Dict[str, list]] = {}
+        self._waves: Dict[Any, Dict[int, WaveStat]] = {}
+        self._tables: Dict[str, pd.DataFrame] = None
+
+    def update(self, key: Any, raw: Optional[str]):
+        """Takes the route's new JSON, None or NaN drops it"""
+        with self._lock:
+            if raw is None or (not isinstance(raw, str) and pd.isna(raw)):
+                if key in self._raw:
+                    for index in (self._raw, self._rows, self._waves):
+                        del index[key]
+                    self._tables = None
+                return
+            if self._raw.get(key) == raw:
+                return
+            rs = codec.loads(RouteStats, raw)
+            self._raw[key] = raw
+            self._rows[key] = _rows(key, rs)
+            self._waves[key] = rs.wave_stats
+            self._tables = None
+
+    def sync(self, df: pd.DataFrame) -> "RouteTables":
+        with self._lock:
+            values = df[self.column]
+            for key in set(self._raw) - set(values.index):
+                self.update(key, None)
+            for key, raw in values.items():
+                self.update(key, raw)
+            return self
+
+    def wave_stats(self, key: Any) -> Dict[int, WaveStat]:
+        with self._lock:
+            return self._waves.get(key, {})
+
+    def tables(self) -> Dict[str, pd.DataFrame]:
+        with self._lock:
+            if self._tables is None:
+                self._tables = _concat(self._rows.values())
+            return self._tables
+
+
+def store(
+    df: pd.DataFrame, csv_path: str, route_tables: RouteTables = None
+) -> Optional[Dict[str, pd.DataFrame]]:
+    """Writes the tables of df next to its CSV, synced into route_tables
+    when given so only changed routes are decoded. The CSV and journal are
+    what runs resume from, so a failure is logged instead of raised."""
+    try:
+        if route_tables is None:
+            tables = from_frame(df)
+        else:
+            tables = route_tables.sync(df).tables()
+        save(tables, tables_path(csv_path))
+        return tables
+    except Exception as ex:
+        logging.error(f"Couldn't store route_stats tables for {csv_path}: {ex}")
+
+
+def tables_path(csv_path: str) -> str:
+    return f"{os.path.splitext(csv_path)[0]}_tables"
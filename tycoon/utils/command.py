@@ -1,5 +1,11 @@
+import threading
 from selenium.webdriver.remote.webdriver import WebDriver
 from typing import Any
+from tycoon.utils.http_reader import new_session
+from tycoon.utils import reads, urls
+from tycoon.utils.data import RouteStats
+from tycoon.utils.fleet import FleetIndex
+from tycoon.utils.network import NetworkIndex
 
 
 class Command:
@@ -47,7 +53,86 @@ class Command:
             """,
             default="./tmp",
         )
+        parser.add_argument(
+            "--http_reads",
+            action="store_true",
+            help="""
+                Read route stats and route lists over plain HTTP using the
+                logged in session, the browser is only used for changes (Default: False)
+            """,
+        )
+        parser.add_argument(
+            "--demand_max_waves",
+            action="store_true",
+            help="""
+                Stop reading noway.info's waves at the ones the aircraft needs
+                to carry the demand, by the offline seat model, instead of
+                every wave noway lists (Default: False)
+            """,
+        )
+        urls.add_options(parser)
+        parser.add_argument(
+            "--max_rps",
+            type=float,
+            help="""
+                Max page loads, clicks and HTTP requests per second to each
+                site, lowered automatically while a site is slow or failing (Default: 2)
+            """,
+            default=2.0,
+        )
+        parser.add_argument(
+            "--max_host_concurrency",
+            type=int,
+            help="Max requests in flight to each site across workers (Default: 4)",
+            default=4,
+        )
+        parser.add_argument(
+            "--rate_stats_interval",
+            type=int,
+            help="Seconds between request stats in the log, 0 only at the end (Default: 60)",
+            default=60,
+        )
 
     def __init__(self, driver: WebDriver, options: Any) -> None:
+        self._local = threading.local()
+        self._reader_lock = threading.Lock()
+        self._session = None
+        self.network = NetworkIndex()
+        self.fleet = FleetIndex()
         self.driver: WebDriver = driver
         self.options = options
+
+    @property
+    def driver(self) -> WebDriver:
+        return getattr(self._local, "driver", None) or self._driver
+
+    @driver.setter
+    def driver(self, driver: WebDriver):
+        self._driver = driver
+
+    @property
+    def reader(self) -> Any:
+        """Backend for read only lookups, see tycoon.utils.reads"""
+        if not getattr(self.options, "http_reads", False):
+            return self.driver
+
+        with self._reader_lock:
+            if self._session is None:
+                self._session = new_session(self.driver, self.options.tmp_folder)
+        return self._session
+
+    def read_route_stats(self, hub: str, route: str, cache=None) -> RouteStats:
+        """reads.route_stats with the line links read once per session, and
+        the browser for lines the HTTP session can't open"""
+        return reads.route_stats(
+            self.reader,
+            hub,
+            route,
+            cache,
+            self.driver,
+            self.network.line_urls(self.reader),
+        )
+
+    def use_driver(self, driver: WebDriver):
+        """Binds a pooled driver to the calling worker thread"""
+        self._local.driver = driver
@@ -5,10 +5,11 @@ from typing import Dict, List
 from dataclasses_json import dataclass_json
 
 non_decimal = re.compile(r"[^-\d.]+")
+AIRCRAFT_SEAT_REGX = r"\((\d+)\/(\d+)\/(\d+)\)"
 
 
 @dataclass_json
-@dataclass
+@dataclass(slots=True)
 class RouteStat:
     price: int
     demand: int
@@ -16,7 +17,7 @@ class RouteStat:
 
 
 @dataclass_json
-@dataclass
+@dataclass(slots=True)
 class ScheduledAircraftConfig:
     model: str
     seat_config: str
@@ -24,7 +25,7 @@ class ScheduledAircraftConfig:
 
 
 @dataclass_json
-@dataclass
+@dataclass(slots=True)
 class WaveStat:
     no: int
     economy: int
@@ -40,7 +41,7 @@ class WaveStat:
 
 
 @dataclass_json
-@dataclass
+@dataclass(slots=True)
 class RouteStats:
     economy: RouteStat = None
     business: RouteStat = None
@@ -52,6 +53,35 @@ class RouteStats:
     wave_stats: Dict[int, WaveStat] = field(default_factory=dict)
 
 
+@dataclass_json
+@dataclass(slots=True)
+class ScheduleResult:
+    destination: str
+    aircraft: str = None
+    scheduled: bool = False
+    error: str = None
+
+
+@dataclass_json
+@dataclass(slots=True)
+class FleetAircraft:
+    id: int
+    name: str
+    model: str
+    hub_id: int
+    use: int
+
+
+def seat_config_matches(seat_config: str, wave_stat: WaveStat) -> bool:
+    """Whether an aircraft's "(economy/business/first)" config is the wave's"""
+    seats = re.search(AIRCRAFT_SEAT_REGX, seat_config or "")
+    return seats is not None and [int(x) for x in seats.groups()] == [
+        int(wave_stat.economy),
+        int(wave_stat.business),
+        int(wave_stat.first),
+    ]
+
+
 def split_destination(input: str, delimiter=",") -> List[str]:
     return input.split(delimiter)
 
@@ -64,7 +94,7 @@ def decode_cost(costStr: str) -> float:
 
 
 @dataclass_json
-@dataclass
+@dataclass(slots=True)
 class CircuitRow:
     no: int
     destination: str
@@ -76,7 +106,7 @@ class CircuitRow:
 
 
 @dataclass_json
-@dataclass
+@dataclass(slots=True)
 class CircuitInfo:
     id: int
     rows: List[CircuitRow]
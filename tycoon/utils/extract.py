@@ -0,0 +1,60 @@
+import logging
+from typing import Dict, List, Optional
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+# Evaluates every field xpath relative to each row in the browser and returns
+# the texts as one JSON payload, instead of a WebDriver round trip per cell.
+ROWS_SCRIPT = """
+const rowXPath = arguments[0], fields = arguments[1];
+const rows = document.evaluate(
+    rowXPath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+);
+const result = [];
+for (let i = 0; i < rows.snapshotLength; i++) {
+    const row = rows.snapshotItem(i);
+    const item = {};
+    for (const [name, xpath] of Object.entries(fields)) {
+        const node = document.evaluate(
+            xpath, row, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+        ).singleNodeValue;
+        if (node === null) {
+            item[name] = null;
+        } else if (node.nodeType === Node.ATTRIBUTE_NODE) {
+            item[name] = node.value;
+        } else {
+            item[name] = node.innerText.trim();
+        }
+    }
+    result.push(item);
+}
+return result;
+"""
+
+
+def by_class(name: str) -> str:
+    return f".//*[contains(concat(' ', normalize-space(@class), ' '), ' {name} ')]"
+
+
+def extract_rows(
+    driver: WebDriver, row_xpath: str, fields: Dict[str, str]
+) -> Optional[List[Dict[str, Optional[str]]]]:
+    """Extracts texts of fields for all rows in one execute_script call
+
+    Returns None when the script can't run, so callers can fall back to
+    element by element scraping.
+    """
+    try:
+        rows = driver.execute_script(ROWS_SCRIPT, row_xpath, fields)
+    except WebDriverException as ex:
+        logging.debug(f"Script extraction failed for {row_xpath}: {ex}")
+        return None
+
+    if not isinstance(rows, list):
+        return None
+    return rows
+
+
+def complete_rows(rows: List[Dict[str, Optional[str]]]) -> bool:
+    return all(v is not None for row in rows for v in row.values())
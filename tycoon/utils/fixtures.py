@@ -0,0 +1,293 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from tycoon.utils import urls
+from tycoon.utils.cache import make_key
+
+SITES = {"tycoon": urls.TYCOON_URL, "noway": urls.NOWAY_URL}
+RECORDINGS_FILE = "recordings.jsonl"
+TIMEOUT = 60
+
+# Hop by hop headers and headers describing the upstream body, which is
+# stored decoded and may be rewritten
+DROP_HEADERS = {
+    "connection",
+    "content-encoding",
+    "content-length",
+    "content-security-policy",
+    "keep-alive",
+    "strict-transport-security",
+    "transfer-encoding",
+}
+FORWARD_HEADERS = {
+    "accept",
+    "accept-language",
+    "content-type",
+    "origin",
+    "referer",
+    "user-agent",
+    "x-requested-with",
+}
+TEXT_TYPES = ("text/", "javascript", "json", "xml")
+
+
+def _keys(method: str, path: str, body: bytes) -> List[str]:
+    """Lookup keys from the most to the least specific, replays fall back to
+    ignoring the body (form tokens) and then the query (cache busters)"""
+    body_hash = hashlib.sha256(body).hexdigest() if body else None
+    return [
+        make_key(method, path, body_hash),
+        make_key(method, path),
+        make_key(method, path.split("?")[0]),
+    ]
+
+
+class Recording:
+    """Responses of one site, in the order they were recorded.
+
+    A request seen several times, like a route list before and after buying
+    a route, replays its responses in the same order and then keeps
+    returning the last one.
+    """
+
+    def __init__(self, folder: str):
+        os.makedirs(folder, exist_ok=True)
+        self.path = os.path.join(folder, RECORDINGS_FILE)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[dict]] = {}
+        self._served: Dict[str, int] = {}
+        self.recorded = 0
+        self.hits = 0
+        self.misses = 0
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                for line in f:
+                    self._index(json.loads(line))
+
+    def __len__(self) -> int:
+        return self.recorded
+
+    def _index(self, entry: dict):
+        self.recorded += 1
+        for key in entry["keys"]:
+            self._entries.setdefault(key, []).append(entry)
+
+    def add(self, keys: List[str], status: int, headers: list, body: bytes):
+        entry = {
+            "keys": keys,
+            "status": status,
+            "headers": headers,
+            "body": base64.b64encode(body).decode("ascii"),
+        }
+        with self._lock:
+            self._index(entry)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def find(self, keys: List[str]) -> Optional[dict]:
+        with self._lock:
+            for key in keys:
+                entries = self._entries.get(key)
+                if entries:
+                    served = self._served.get(key, 0)
+                    self._served[key] = served + 1
+                    self.hits += 1
+                    return entries[min(served, len(entries) - 1)]
+            self.misses += 1
+            return None
+
+
+class FixtureServer:
+    """Local stand in for the game and noway.info, one port per site so root
+    relative links keep working.
+
+    record: forwards every request to the real site and stores the response.
+    replay: serves stored responses only, after latency + up to jitter
+    seconds, unknown requests get a 404.
+
+    Absolute links to the real sites are rewritten to the local ports and
+    cookie names get a site prefix, all sites share the 127.0.0.1 cookie jar.
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        mode: str = "replay",
+        port: int = 8801,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        seed: int = 1,
+        sites: Dict[str, str] = None,
+    ):
+        if mode not in ("record", "replay"):
+            raise Exception(f"Unknown fixture mode {mode}")
+        self.mode = mode
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.sites = sites or SITES
+        self.local = {
+            name: f"http://127.0.0.1:{port + i}" for i, name in enumerate(self.sites)
+        }
+        self.recordings = {
+            name: Recording(os.path.join(folder, name)) for name in self.sites
+        }
+        self._servers = []
+        for name in self.sites:
+            server = ThreadingHTTPServer(
+                ("127.0.0.1", urlparse(self.local[name]).port), _Handler
+            )
+            server.daemon_threads = True
+            server.fixture = self
+            server.site = name
+            self._servers.append(server)
+
+    def start(self):
+        for server in self._servers:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        for name, url in self.local.items():
+            logging.info(f"Serving {name} ({self.mode}) on {url}")
+
+    def stop(self):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+
+    def options(self) -> List[str]:
+        """tycoon-cli arguments that point the commands at this server"""
+        return [f"--{name}_url={url}" for name, url in self.local.items()]
+
+    def log_stats(self):
+        for name, recording in self.recordings.items():
+            logging.info(
+                f"Fixtures {name}: {len(recording)} requests recorded, "
+                f"{recording.hits} served, {recording.misses} missing"
+            )
+
+    def _rewrite(self, text: str) -> str:
+        for name, upstream in self.sites.items():
+            host = urlparse(upstream).netloc
+            local = self.local[name]
+            for prefix in ("https://", "http://"):
+                text = text.replace(prefix + host, local)
+            text = text.replace("//" + host, local.replace("http:", ""))
+        return text
+
+    def _cookies_for_upstream(self, site: str, header: str) -> str:
+        prefix = f"{site}__"
+        jar = SimpleCookie()
+        jar.load(header or "")
+        return "; ".join(
+            f"{name[len(prefix):]}={morsel.value}"
+            for name, morsel in jar.items()
+            if name.startswith(prefix)
+        )
+
+    def _set_cookie(self, site: str, header: str) -> str:
+        name, _, rest = header.partition("=")
+        attributes = [
+            part
+            for part in rest.split(";")
+            if part.strip().split("=")[0].lower()
+            not in ("domain", "secure", "samesite")
+        ]
+        return f"{site}__{name.strip()}=" + ";".join(attributes)
+
+    def _fetch(self, site: str, handler: "_Handler", body: bytes):
+        headers = {
+            k: self._rewrite_upstream(v)
+            for k, v in handler.headers.items()
+            if k.lower() in FORWARD_HEADERS
+        }
+        cookies = self._cookies_for_upstream(site, handler.headers.get("Cookie"))
+        if cookies:
+            headers["Cookie"] = cookies
+        response = requests.request(
+            handler.command,
+            self.sites[site].rstrip("/") + handler.path,
+            headers=headers,
+            data=body or None,
+            allow_redirects=False,
+            timeout=TIMEOUT,
+        )
+        return (
+            response.status_code,
+            [
+                [k, v]
+                for k, v in response.raw.headers.iteritems()
+                if k.lower() not in DROP_HEADERS
+            ],
+            response.content,
+        )
+
+    def _rewrite_upstream(self, value: str) -> str:
+        for name, upstream in self.sites.items():
+            value = value.replace(self.local[name], upstream.rstrip("/"))
+        return value
+
+    def handle(self, handler: "_Handler"):
+        site = handler.server.site
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = handler.rfile.read(length) if length else b""
+        keys = _keys(handler.command, handler.path, body)
+
+        if self.mode == "record":
+            status, headers, content = self._fetch(site, handler, body)
+            self.recordings[site].add(keys, status, headers, content)
+        else:
+            with self._random_lock:
+                delay = self.latency + self._random.uniform(0, self.jitter)
+            time.sleep(delay)
+            entry = self.recordings[site].find(keys)
+            if entry is None:
+                logging.warning(
+                    f"No fixture for {site} {handler.command} {handler.path}"
+                )
+                handler.send_error(404, "No fixture recorded")
+                return
+            status, headers = entry["status"], entry["headers"]
+            content = base64.b64decode(entry["body"])
+
+        content_type = next((v for k, v in headers if k.lower() == "content-type"), "")
+        if any(t in content_type for t in TEXT_TYPES):
+            content = self._rewrite(content.decode("utf-8", "replace")).encode("utf-8")
+
+        handler.send_response(status)
+        for k, v in headers:
+            if k.lower() == "set-cookie":
+                v = self._set_cookie(site, v)
+            elif k.lower() == "location":
+                v = self._rewrite(v)
+            handler.send_header(k, v)
+        handler.send_header("Content-Length", str(len(content)))
+        handler.end_headers()
+        if handler.command != "HEAD":
+            handler.wfile.write(content)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _handle(self):
+        try:
+            self.server.fixture.handle(self)
+        except Exception as ex:
+            logging.error(f"Fixture {self.command} {self.path} failed: {ex}")
+            self.send_error(502, str(ex))
+
+    do_GET = do_POST = do_HEAD = do_PUT = do_DELETE = _handle
+
+    def log_message(self, format, *args):
+        logging.debug(f"{self.server.site}: {format % args}")
@@ -0,0 +1,154 @@
+import logging
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from selenium.webdriver.remote.webdriver import WebDriver
+from tycoon.utils import airline_manager, urls
+from tycoon.utils.data import FleetAircraft, ScheduleResult, WaveStat
+
+
+def _model_key(model: str) -> str:
+    return airline_manager.searchable_aircraft_model(model).strip().lower()
+
+
+class FleetIndex:
+    """Every aircraft of the airline by id, crawled once from the planning
+    page and kept up to date after each schedule or clear, so free aircraft
+    are looked up without filtering the planning page.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._aircraft: Dict[int, FleetAircraft] = None
+        # Free aircraft ids per (hub id, model), dicts keep them in crawl order
+        self._free: Dict[Tuple[int, str], Dict[int, None]] = {}
+
+    def load(self, driver: WebDriver) -> Dict[int, FleetAircraft]:
+        with self._lock:
+            if self._aircraft is None:
+                self._aircraft = {}
+                self._free = {}
+                for aircraft in airline_manager.fleet(driver):
+                    self._aircraft[aircraft.id] = aircraft
+                    self._set_use(aircraft, aircraft.use)
+                logging.info(
+                    f"Indexed {len(self._aircraft)} aircraft, "
+                    f"{sum(len(ids) for ids in self._free.values())} free"
+                )
+            return self._aircraft
+
+    def invalidate(self):
+        with self._lock:
+            self._aircraft = None
+            self._free = {}
+
+    def _set_use(self, aircraft: FleetAircraft, use: int):
+        aircraft.use = use
+        free = self._free.setdefault((aircraft.hub_id, _model_key(aircraft.model)), {})
+        if use == 0:
+            free[aircraft.id] = None
+        else:
+            free.pop(aircraft.id, None)
+
+    def free(
+        self,
+        driver: WebDriver,
+        hub_id: int,
+        aircraft_model: str,
+        exclude: Set[int] = frozenset(),
+    ) -> Optional[FleetAircraft]:
+        with self._lock:
+            self.load(driver)
+            free = self._free.get((hub_id, _model_key(aircraft_model)), {})
+            aircraft_id = next((i for i in free if i not in exclude), None)
+            if aircraft_id is not None:
+                return self._aircraft[aircraft_id]
+
+    def free_count(self, driver: WebDriver, hub_id: int, aircraft_model: str) -> int:
+        with self._lock:
+            self.load(driver)
+            return len(self._free.get((hub_id, _model_key(aircraft_model)), ()))
+
+    def schedule_flights(
+        self,
+        driver: WebDriver,
+        hub_id: int,
+        hub: str,
+        flights: Dict[str, int],
+        aircraft_model: str,
+    ) -> List[ScheduleResult]:
+        """Plans flights[destination] free aircraft on every destination of
+        the hub, picking each aircraft by id from the index"""
+        planned = [dest for dest, count in flights.items() for _ in range(count)]
+        logging.info(
+            f"Scheduling {len(planned)} flights in {hub} on "
+            f"{self.free_count(driver, hub_id, aircraft_model)} free {aircraft_model}"
+        )
+        driver.get(urls.tycoon(airline_manager.PLANNING_PATH))
+
+        results = []
+        failed = set()
+        for destination in planned:
+            with self._lock:
+                aircraft = self.free(driver, hub_id, aircraft_model, failed)
+                if aircraft is None:
+                    results.append(
+                        ScheduleResult(
+                            destination, error=f"No free {aircraft_model} left"
+                        )
+                    )
+                    continue
+
+                try:
+                    use = airline_manager.plan_aircraft(
+                        driver, aircraft.id, hub, destination
+                    )
+                    self._set_use(aircraft, use)
+                    if use == 0:
+                        raise Exception(f"{aircraft.name} is still unplanned")
+                    results.append(ScheduleResult(destination, aircraft.name, True))
+                    logging.debug(f"Scheduled {aircraft.name} on {hub} - {destination}")
+                except Exception as ex:
+                    logging.error(f"Scheduling a flight on {hub} - {destination}: {ex}")
+                    results.append(ScheduleResult(destination, error=str(ex)))
+                    failed.add(aircraft.id)
+                    driver.get(urls.tycoon(airline_manager.PLANNING_PATH))
+        return results
+
+    def remove_flights(
+        self,
+        driver: WebDriver,
+        hub_id: int,
+        hub: str,
+        destination: str,
+        config: WaveStat,
+    ):
+        """Clears the busiest aircraft named after the line until it only
+        has config.no flights"""
+        extra = airline_manager.assigned_flight_count(driver, hub, destination)
+        extra -= config.no
+        if extra <= 0:
+            return
+
+        logging.error(f"The route has {extra} more flights than required")
+        name_prefix = f"{hub}-{destination}"
+        with self._lock:
+            planned = sorted(
+                (
+                    a
+                    for a in self.load(driver).values()
+                    if a.hub_id == hub_id and a.use > 0 and name_prefix in a.name
+                ),
+                key=lambda a: -a.use,
+            )
+            if len(planned) < extra:
+                raise Exception(
+                    f"Only {len(planned)} flights named {name_prefix} in HUB {hub}"
+                )
+
+            driver.get(urls.tycoon(airline_manager.PLANNING_PATH))
+            for aircraft in planned[:extra]:
+                self._set_use(
+                    aircraft, airline_manager.clear_aircraft(driver, aircraft.id)
+                )
+                logging.debug(f"Cleared {aircraft.name} from {hub} - {destination}")
@@ -0,0 +1,229 @@
+import logging
+import os
+import re
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urljoin
+
+import requests
+from lxml import html
+from retry import retry
+from selenium.webdriver.remote.webdriver import WebDriver
+from tycoon.utils import urls
+from tycoon.utils.extract import by_class
+from tycoon.utils.ratelimit import LimitedAdapter
+from tycoon.utils.data import (
+    RouteStat,
+    RouteStats,
+    ScheduledAircraftConfig,
+    non_decimal,
+)
+from tycoon.utils.session import load_cookies
+
+POOL_SIZE = 10
+TIMEOUT = 30
+
+
+class LineNotLinked(Exception):
+    """The line's linePicker option holds no link, only the page's own
+    script can open it"""
+
+
+def new_session(
+    driver: WebDriver = None, tmp_folder: str = None, pool_size: int = POOL_SIZE
+) -> requests.Session:
+    session = requests.Session()
+    adapter = LimitedAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=3
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    if driver is not None:
+        cookies = driver.get_cookies()
+        session.headers["User-Agent"] = driver.execute_script(
+            "return navigator.userAgent"
+        )
+    else:
+        cookies = load_cookies(tmp_folder, os.getenv("TYCOON_EMAIL")) or []
+    for cookie in cookies:
+        session.cookies.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie.get("domain"),
+            path=cookie.get("path", "/"),
+        )
+    return session
+
+
+def _text(element) -> str:
+    return " ".join(element.text_content().split())
+
+
+def _get(session: requests.Session, url: str):
+    response = session.get(urljoin(urls.tycoon("/"), url), timeout=TIMEOUT)
+    response.raise_for_status()
+    page = html.fromstring(response.content, base_url=response.url)
+    if page.xpath('//*[@id="loginSubmit"]'):
+        raise Exception("Not logged in, the saved session has expired")
+    return page
+
+
+def line_urls(session: requests.Session) -> Dict[str, str]:
+    """Value of every linePicker option, by its "HUB - DEST" route text"""
+    page = _get(session, "/network/")
+    return {
+        _text(option): option.get("value") or ""
+        for option in page.xpath('//select[contains(@class, "linePicker")]/option')
+    }
+
+
+def _line_url(
+    session: requests.Session, route_text: str, links: Dict[str, str] = None
+) -> str:
+    """Link of the line page, the value of its linePicker option"""
+    value = (links if links is not None else line_urls(session)).get(route_text)
+    if value is None:
+        raise Exception(f"Can't find route {route_text}")
+    if not (value.startswith("/") or value.startswith("http")):
+        raise LineNotLinked(
+            f"The linePicker option of {route_text} is {value!r}, not a link"
+        )
+    return value
+
+
+def _get_flight_stats(page) -> List[ScheduledAircraftConfig]:
+    flight_stats = []
+    for flight in page.xpath('//div[@class="aircraftListView"]/div'):
+        flight_stats.append(
+            ScheduledAircraftConfig(
+                model=_text(flight.xpath("div[1]/span")[0]).split("/")[0].strip(),
+                seat_config=_text(flight.xpath("div[2]/div/span[4]/b")[0]),
+                result=non_decimal.sub(
+                    "", _text(flight.xpath("div[2]/div/span[6]/b")[0])
+                ),
+            )
+        )
+    return flight_stats
+
+
+def _get_max_category(page) -> int:
+    max_cat = page.xpath('//*[@id="box2"]/li[1]/b/img[3]')
+    if max_cat:
+        return int(non_decimal.sub("", max_cat[0].get("alt")))
+
+
+@retry(delay=5, tries=3)
+def _line_page(session: requests.Session, url: str):
+    return _get(session, url)
+
+
+def line_stats(
+    session: requests.Session,
+    hub: str,
+    route: str,
+    static: Dict[str, Any] = None,
+    links: Dict[str, str] = None,
+) -> Tuple[RouteStats, Dict[str, Any]]:
+    """Like airline_manager.line_stats, links are line_urls read once by the
+    caller, raises LineNotLinked without retrying for lines only the
+    browser can open"""
+    page = _line_page(session, _line_url(session, f"{hub} - {route}", links))
+    if not static:
+        prices = page.xpath('//a[normalize-space(text())="Route prices"]/@href')
+        if not prices:
+            raise Exception(f"No route prices link for {hub} - {route}")
+        static = {
+            "category": _get_max_category(page),
+            "distance": int(
+                non_decimal.sub("", _text(page.xpath('//*[@id="box2"]/li[2]')[0]))
+            ),
+            "prices_url": urljoin(urls.tycoon("/"), prices[0]),
+        }
+    route_stats = RouteStats(
+        category=static["category"],
+        distance=static["distance"],
+        scheduled_flights=_get_flight_stats(page),
+    )
+    return route_stats, static
+
+
+@retry(delay=5, tries=3)
+def route_prices(
+    session: requests.Session, prices_url: str
+) -> List[Tuple[str, RouteStat]]:
+    page = _get(session, prices_url)
+    prices = []
+    for priceList in page.xpath(
+        '//*[@id="marketing_linePricing"]/div[@class="box2"]/div'
+    ):
+        prices.append(
+            (
+                _text(priceList.xpath(by_class("title"))[0])
+                .replace("class", "")
+                .strip()
+                .lower(),
+                RouteStat(
+                    price=non_decimal.sub(
+                        "", _text(priceList.xpath(f"{by_class('price')}//b")[0])
+                    ),
+                    demand=non_decimal.sub(
+                        "", _text(priceList.xpath(by_class("demand"))[0])
+                    ),
+                    remaining_demand=non_decimal.sub(
+                        "", _text(priceList.xpath(by_class("paxLeft"))[0])
+                    ),
+                ),
+            )
+        )
+
+    return prices
+
+
+def route_stats(
+    session: requests.Session, hub: str, route: str, links: Dict[str, str] = None
+) -> RouteStats:
+    route_stats, static = line_stats(session, hub, route, links=links)
+    for name, stat in route_prices(session, static["prices_url"]):
+        route_stats.__setattr__(name, stat)
+
+    return route_stats
+
+
+def hub_ids(session: requests.Session) -> Dict[str, int]:
+    page = _get(session, "/network/")
+    ids = {}
+    for hub_element in page.xpath(
+        '//*[@id="displayRegular"]/div[@class="hubListBox"]/div'
+    ):
+        match = re.search("Owned hub ([A-Z]{3}) -", _text(hub_element))
+        if match:
+            link = hub_element.xpath('.//a[normalize-space(text())="Hub details"]')
+            ids[match.group(1)] = int(link[0].get("href").rstrip("/").split("/")[-1])
+    return ids
+
+
+def find_hub_id(session: requests.Session, hub: str) -> int:
+    return hub_ids(session).get(hub)
+
+
+def _extract_destination(hub: str, route_element) -> str:
+    if "lineListBox" in (route_element.get("class") or ""):
+        title = _text(route_element.xpath(by_class("title"))[0])
+        match = re.search("([A-Z]{3}) \/ ([A-Z]{3})", title)
+        if match and match.group(1) == hub:
+            return match.group(2)
+
+
+def get_all_routes(session: requests.Session, hub: str) -> List[str]:
+    return line_list(session, hub, find_hub_id(session, hub))
+
+
+def line_list(session: requests.Session, hub: str, hub_id: int) -> List[str]:
+    page = _get(session, f"/network/showhub/{hub_id}/linelist")
+    destinations = [
+        _extract_destination(hub, route_element)
+        for route_element in page.xpath('//*[@id="lineList"]/div')
+    ]
+
+    logging.debug(f"Found {len(destinations)} destinations at hub {hub}")
+    return destinations
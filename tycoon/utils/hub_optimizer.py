@@ -0,0 +1,199 @@
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+from tycoon.utils import seat_optimizer
+from tycoon.utils.aircraft_specs import AircraftSpec
+from tycoon.utils.data import RouteStats, WaveStat
+
+# Wave counts and seat splits of every route of a hub picked together, so
+# a limited fleet goes to the waves that earn the most across the hub
+# instead of each route taking its own nth best config.
+
+# Days an aircraft's price is spread over, a wave is only worth flying when
+# it adds more daily turnover than its aircraft costs a day
+AMORTISATION_DAYS = 365
+
+
+@dataclass(slots=True)
+class HubPlan:
+    """configs[i] is the picked wave of the ith route, None when the
+    route is better left unflown"""
+
+    configs: List[Optional[WaveStat]] = field(default_factory=list)
+    aircraft: int = 0
+    turnover: float = 0.0
+    # Daily cost of one aircraft
+    aircraft_cost: float = 0.0
+    # Profit of the LP relaxation, no integer plan can earn more
+    bound: float = 0.0
+
+    @property
+    def profit(self) -> float:
+        return self.turnover - self.aircraft * self.aircraft_cost
+
+    @property
+    def gap(self) -> float:
+        return 1 - self.profit / self.bound if self.bound else 0.0
+
+
+def aircraft_cost(spec: AircraftSpec, days: int = AMORTISATION_DAYS) -> float:
+    """Daily cost of an aircraft, its price spread over days, free when
+    days is 0"""
+    return spec.price / days if days else 0.0
+
+
+def aircraft_limit(spec: AircraftSpec, fleet_size: int = None, budget: float = None):
+    """Aircraft the plan may use, each wave flies one aircraft. None when
+    neither the fleet nor the budget is limited"""
+    if fleet_size is None and budget is None:
+        return None
+    return (fleet_size or 0) + (int(budget // spec.price) if budget else 0)
+
+
+def candidates(
+    route_stats_list: List[RouteStats],
+    spec: AircraftSpec,
+    no_negative: bool = False,
+    remaining: bool = False,
+    cost: float = 0.0,
+) -> Tuple[List[dict], np.ndarray]:
+    """Allocation of every wave count per route, with the total turnover
+    less cost per aircraft of w waves of route r at [r, w], -inf past its
+    profitable waves"""
+    results = [
+        seat_optimizer.allocate(
+            *seat_optimizer.demand_and_prices(rs, remaining), spec, no_negative
+        )
+        for rs in route_stats_list
+    ]
+    turnover = np.full((len(results), seat_optimizer.MAX_WAVES + 1), -np.inf)
+    turnover[:, 0] = 0.0
+    for r, result in enumerate(results):
+        count = seat_optimizer.profitable_waves(result)
+        turnover[r, 1 : count + 1] = (
+            result["total_turnover"][:count] - cost * result["waves"][:count]
+        )
+    return results, turnover
+
+
+def _hull(values: np.ndarray) -> List[int]:
+    """Wave counts on the upper concave hull of one route's turnover, from
+    0 up to its most profitable count"""
+    waves = np.flatnonzero(np.isfinite(values))
+    hull = []
+    for w in waves:
+        while len(hull) >= 2:
+            a, b = hull[-2], hull[-1]
+            # b is under the chord from a to w
+            if (values[b] - values[a]) * (w - a) <= (values[w] - values[a]) * (b - a):
+                hull.pop()
+            else:
+                break
+        hull.append(int(w))
+    top = int(np.argmax(values[hull]))
+    return hull[: top + 1]
+
+
+def _segments(turnover: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """(route, from, to, gain per aircraft) of every hull step, best first"""
+    routes, starts, ends = [], [], []
+    for r, values in enumerate(turnover):
+        hull = _hull(values)
+        routes.extend([r] * (len(hull) - 1))
+        starts.extend(hull[:-1])
+        ends.extend(hull[1:])
+    routes, starts, ends = (np.array(a, dtype=int) for a in (routes, starts, ends))
+    slopes = (turnover[routes, ends] - turnover[routes, starts]) / (ends - starts)
+    order = np.argsort(-slopes, kind="stable")
+    return routes[order], starts[order], ends[order], slopes[order]
+
+
+def _lp_bound(turnover: np.ndarray, aircraft: int) -> float:
+    """Turnover of the LP relaxation: hull steps by gain per aircraft, the
+    first one that doesn't fit taken in part"""
+    left, bound = aircraft, 0.0
+    _, starts, ends, slopes = _segments(turnover)
+    for size, slope in zip(ends - starts, slopes):
+        step = min(size, left)
+        bound += slope * step
+        left -= step
+        if not left:
+            break
+    return bound
+
+
+def _knapsack(turnover: np.ndarray, aircraft: int) -> np.ndarray:
+    """Waves per route of the most turnover on at most aircraft aircraft,
+    exact dynamic programming over the aircraft used"""
+    # best[a] is the most turnover of the routes so far on exactly a aircraft
+    best = np.full(aircraft + 1, -np.inf)
+    best[0] = 0.0
+    choice = np.zeros((len(turnover), aircraft + 1), dtype=np.int8)
+    for r, values in enumerate(turnover):
+        total = best.copy()
+        for w in np.flatnonzero(np.isfinite(values[: aircraft + 1]))[1:]:
+            with_w = best[:-w] + values[w]
+            better = with_w > total[w:]
+            np.copyto(total[w:], with_w, where=better)
+            choice[r, w:][better] = w
+        best = total
+
+    waves = np.zeros(len(turnover), dtype=int)
+    used = int(np.argmax(best))
+    for r in reversed(range(len(turnover))):
+        waves[r] = choice[r, used]
+        used -= waves[r]
+    return waves
+
+
+def optimize(
+    route_stats_list: List[RouteStats],
+    spec: AircraftSpec,
+    aircraft: int = None,
+    no_negative: bool = False,
+    remaining: bool = False,
+    cost: float = 0.0,
+) -> HubPlan:
+    """Picks the wave count of every route, and so its seat split, that
+    maximise the hub's total turnover less the cost of its aircraft on at
+    most aircraft aircraft. Without a cost every wave that earns anything
+    is worth an aircraft, so the whole fleet gets spent.
+
+    A multiple choice knapsack, solved exactly by dynamic programming over
+    the aircraft used when the fleet can't fly every route at its best.
+    Its LP relaxation, every route's turnover replaced by its concave hull,
+    bounds what any plan could earn.
+
+    Args:
+        aircraft (int): aircraft the routes may use, unlimited by default
+        remaining (bool): plan on the remaining demand instead of the demand
+        cost (float): daily cost of an aircraft, see aircraft_cost
+    """
+    results, profit = candidates(route_stats_list, spec, no_negative, remaining, cost)
+    waves = np.argmax(profit, axis=1)
+    if aircraft is not None and waves.sum() > aircraft:
+        waves = _knapsack(profit, aircraft)
+        bound = _lp_bound(profit, aircraft)
+    else:
+        bound = None
+
+    routes = np.arange(len(results))
+    plan = HubPlan(
+        configs=[
+            seat_optimizer.wave_stat(results[r], waves[r] - 1) if waves[r] else None
+            for r in routes
+        ],
+        aircraft=int(waves.sum()),
+        turnover=float(profit[routes, waves].sum() + cost * waves.sum()),
+        aircraft_cost=cost,
+    )
+    plan.bound = plan.profit if bound is None else max(bound, plan.profit)
+    logging.info(
+        f"Hub plan flies {plan.aircraft} aircraft on "
+        f"{np.count_nonzero(waves)} of {len(results)} routes, turnover "
+        f"{plan.turnover:,.0f}, profit {plan.profit:,.0f} within {plan.gap:.2%} "
+        f"of the LP bound"
+    )
+    return plan
@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def _to_python(value):
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if value is pd.NaT:
+        return None
+    return value
+
+
+class Journal:
+    """Row level store for a command's DataFrame in SQLite (WAL mode).
+
+    Each state transition upserts only the changed rows, the full frame is
+    written on checkpoints, which also compacts the write ahead log.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS rows (
+                idx TEXT PRIMARY KEY,
+                position INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self._conn.commit()
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def exists(self) -> bool:
+        with self._lock:
+            return self._meta("columns") is not None
+
+    def load(self) -> Optional[pd.DataFrame]:
+        with self._lock:
+            columns = self._meta("columns")
+            if columns is None:
+                return None
+            index_name = self._meta("index_name")
+            rows = self._conn.execute(
+                "SELECT idx, data FROM rows ORDER BY position"
+            ).fetchall()
+
+        df = pd.DataFrame.from_records(
+            [json.loads(data) for _, data in rows],
+            index=[json.loads(idx) for idx, _ in rows],
+            columns=columns,
+        )
+        df.index.name = index_name
+        logging.debug(f"Loaded {len(df)} rows from {self.path}")
+        return df
+
+    def _upsert(self, df: pd.DataFrame, idxs: Iterable):
+        now = time.time()
+        positions = {idx: i for i, idx in enumerate(df.index)}
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO rows VALUES (?, ?, ?, ?)",
+            [
+                (
+                    json.dumps(_to_python(idx)),
+                    positions[idx],
+                    json.dumps(
+                        [_to_python(v) for v in df.loc[idx].tolist()], default=str
+                    ),
+                    now,
+                )
+                for idx in idxs
+            ],
+        )
+
+    def write_rows(self, df: pd.DataFrame, idxs: Iterable):
+        with self._lock:
+            if self._meta("columns") != list(df.columns):
+                self._write_all(df)
+            else:
+                self._upsert(df, idxs)
+            self._conn.commit()
+
+    def _write_all(self, df: pd.DataFrame):
+        self._conn.execute("DELETE FROM rows")
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+            [
+                ("columns", json.dumps(list(df.columns))),
+                ("index_name", json.dumps(df.index.name)),
+            ],
+        )
+        self._upsert(df, df.index)
+
+    def write_all(self, df: pd.DataFrame):
+        with self._lock:
+            self._write_all(df)
+            self._conn.commit()
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def journal_path(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + ".sqlite"
+
+
+def load_or_import(
+    journal: Journal, csv_path: str, **read_csv
+) -> Optional[pd.DataFrame]:
+    """Loads the journal, importing an existing CSV store on first use"""
+    df = journal.load()
+    if df is None and os.path.exists(csv_path):
+        logging.info(f"Importing {csv_path} into {journal.path}")
+        df = pd.read_csv(csv_path, **read_csv)
+        journal.write_all(df)
+    return df
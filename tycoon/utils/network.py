@@ -0,0 +1,58 @@
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from selenium.webdriver.remote.webdriver import WebDriver
+from tycoon.utils import airline_manager, reads
+
+
+class NetworkIndex:
+    """Hub ids, each hub's line list and the line links, loaded once per
+    session and answered from memory until a route is bought.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._hub_ids: Dict[str, int] = None
+        self._routes: Dict[str, List[str]] = {}
+        self._line_urls: Dict[str, str] = None
+
+    def hub_ids(self, reader: Any) -> Dict[str, int]:
+        with self._lock:
+            if self._hub_ids is None:
+                self._hub_ids = reads.hub_ids(reader)
+                logging.debug(f"Indexed {len(self._hub_ids)} hubs")
+            return self._hub_ids
+
+    def hub_id(self, reader: Any, hub: str) -> int:
+        return self.hub_ids(reader).get(hub)
+
+    def routes(self, reader: Any, hub: str) -> List[str]:
+        with self._lock:
+            if hub not in self._routes:
+                hub_id = self.hub_id(reader, hub)
+                self._routes[hub] = reads.line_list(reader, hub, hub_id)
+                logging.debug(
+                    f"Found {len(self._routes[hub])} destinations at hub {hub}"
+                )
+            return list(self._routes[hub])
+
+    def line_urls(self, reader: Any) -> Optional[Dict[str, str]]:
+        """See reads.line_urls"""
+        with self._lock:
+            if self._line_urls is None:
+                self._line_urls = reads.line_urls(reader)
+            return self._line_urls
+
+    def invalidate(self, hub: str = None):
+        with self._lock:
+            self._line_urls = None
+            if hub is None:
+                self._hub_ids = None
+                self._routes = {}
+            else:
+                self._routes.pop(hub, None)
+
+    def buy_route(self, driver: WebDriver, hub: str, destination: str, hub_id: int):
+        airline_manager.buy_route(driver, hub, destination, hub_id)
+        self.invalidate(hub)
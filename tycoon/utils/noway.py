@@ -1,16 +1,21 @@
 import logging
-import time
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from retry import retry
+import numpy as np
 import pandas as pd
 from selenium.common.exceptions import (
     ElementClickInterceptedException,
     NoSuchElementException,
+    WebDriverException,
 )
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import Select
+from tycoon.utils import codec, seat_optimizer, urls, wait
+from tycoon.utils.aircraft_specs import AIRCRAFT_SPECS
 from tycoon.utils.browser import js_click
+from tycoon.utils.cache import DiskCache, make_key
+from tycoon.utils.extract import complete_rows, extract_rows
 from tycoon.utils.data import (
     CircuitInfo,
     CircuitRow,
@@ -81,6 +86,28 @@ def _calculate_seat_config(driver, no_negative=False):
     js_click(driver, driver.find_element("id", "calculate_button"))
 
 
+def _wait_for_circuit_rows(driver, count: int):
+    wait.element_count(
+        driver,
+        By.XPATH,
+        '//*[@id="nwy_seatconfigurator_circuitinfo"]/table/tbody/tr/td[10]/input',
+        count,
+        timeout=wait.SETTLE_TIMEOUT,
+        required=False,
+    )
+    wait.ajax_idle(driver)
+
+
+def _wait_for_wave_stats(driver):
+    wait.element_present(
+        driver,
+        "id",
+        "nwy_seatconfigurator_wave_1_stats",
+        wait.SETTLE_TIMEOUT,
+        required=False,
+    )
+
+
 def _select_wave(driver, wave: int):
     try:
         wave_selector = Select(
@@ -92,6 +119,23 @@ def _select_wave(driver, wave: int):
         logging.debug(f"No config for wave: {wave}, mush have reached max waves")
 
 
+def _wave_stat(
+    wave: int, seats: List[str], totals: List[str], max_configured: str
+) -> WaveStat:
+    return WaveStat(
+        no=wave,
+        economy=int(seats[1]),
+        business=int(seats[2]),
+        first=int(seats[3]),
+        cargo=int(seats[4]),
+        turnover_per_wave=decode_cost(seats[5]),
+        roi=float(non_decimal.sub("", seats[6])),
+        total_turnover=decode_cost(totals[5]),
+        turnover_days=int(non_decimal.sub("", totals[6])),
+        max_configured=max_configured,
+    )
+
+
 @retry(NoSuchElementException, delay=5, tries=6, logger=None)
 def _extract_wave_config(driver, wave: int) -> WaveStat:
     wave_stat_el = driver.find_element("id", f"nwy_seatconfigurator_wave_{wave}_stats")
@@ -104,25 +148,95 @@ def _extract_wave_config(driver, wave: int) -> WaveStat:
         "table[1]/tbody/tr[4]/td",
     )
 
-    return WaveStat(
-        no=wave,
-        economy=int(seat_config_el[1].text),
-        business=int(seat_config_el[2].text),
-        first=int(seat_config_el[3].text),
-        cargo=int(seat_config_el[4].text),
-        turnover_per_wave=decode_cost(seat_config_el[5].text),
-        roi=float(non_decimal.sub("", seat_config_el[6].text)),
-        total_turnover=decode_cost(total_seat_config_el[5].text),
-        turnover_days=int(non_decimal.sub("", total_seat_config_el[6].text)),
-        max_configured=wave_stat_el.find_element(
-            By.XPATH, "table[2]/tbody/tr[3]/td[9]"
-        ).text,
+    return _wave_stat(
+        wave,
+        [el.text for el in seat_config_el],
+        [el.text for el in total_seat_config_el],
+        wave_stat_el.find_element(By.XPATH, "table[2]/tbody/tr[3]/td[9]").text,
     )
 
 
-def _scan_seat_configs(driver, maxWave=50) -> Dict[int, WaveStat]:
+# Selects waves first to last in the calculator's own dropdowns and reads
+# each stats table as soon as it renders, in one async script call. Leaves
+# the wave after last selected for the next call. end is true at max_waves
+# or when there is no selector for the next wave, complete is false when a
+# table didn't render within the timeout.
+WAVES_SCRIPT = """
+const first = arguments[0], last = arguments[1], maxWaves = arguments[2];
+const timeout = arguments[3];
+const done = arguments[arguments.length - 1];
+const waves = [];
+const texts = (root, xpath) => {
+    const nodes = document.evaluate(
+        xpath, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+    );
+    const result = [];
+    for (let i = 0; i < nodes.snapshotLength; i++) {
+        result.push(nodes.snapshotItem(i).innerText.trim());
+    }
+    return result;
+};
+const read = wave => {
+    const stats = document.getElementById(`nwy_seatconfigurator_wave_${wave}_stats`);
+    if (stats === null) return null;
+    const seats = texts(stats, "table[1]/tbody/tr[3]/td");
+    const totals = texts(stats, "table[1]/tbody/tr[4]/td");
+    const max = texts(stats, "table[2]/tbody/tr[3]/td[9]");
+    if (seats.length < 7 || totals.length < 7 || max.length < 1) return null;
+    return {no: wave, seats: seats, totals: totals, max_configured: max[0]};
+};
+const scan = (wave, started) => {
+    const stat = read(wave);
+    if (stat === null) {
+        if (Date.now() - started > timeout) {
+            return done({waves: waves, complete: false, end: false});
+        }
+        return setTimeout(() => scan(wave, started), 50);
+    }
+    waves.push(stat);
+    const selector = document.getElementsByName(
+        `nwy_seatconfigurator_wave_${wave}_selector`
+    )[0];
+    const next = selector && Array.from(selector.options).find(
+        option => option.text.trim() === String(wave + 1)
+    );
+    if (wave >= maxWaves || !next) {
+        return done({waves: waves, complete: true, end: true});
+    }
+    selector.value = next.value;
+    selector.dispatchEvent(new Event("change", {bubbles: true}));
+    if (wave >= last) return done({waves: waves, complete: true, end: false});
+    scan(wave + 1, Date.now());
+};
+scan(first, Date.now());
+"""
+WAVE_TIMEOUT_MS = 10_000
+# Waves read per script call, each call may wait WAVE_TIMEOUT_MS on every
+# wave so its script timeout is set to cover them, and a call that fails
+# only loses its own waves
+WAVES_PER_SCRIPT = 5
+SCRIPT_MARGIN = 5
+
+
+def _max_waves(
+    aircraft_make: str, aircraft_model: str, route_stats_list: List[RouteStats]
+) -> Optional[int]:
+    """Waves the aircraft needs to carry the busiest route's demand by
+    seat_optimizer's model, None when the aircraft isn't bundled"""
+    spec = AIRCRAFT_SPECS.get((aircraft_make.lower(), aircraft_model.lower()))
+    if spec is None:
+        return None
+    demand = np.max(
+        [seat_optimizer.demand_and_prices(rs)[0] for rs in route_stats_list], axis=0
+    )
+    return seat_optimizer.max_waves_for(demand, spec)
+
+
+def _scan_seat_configs_by_element(
+    driver, first_wave: int = 1, max_waves: int = seat_optimizer.MAX_WAVES
+) -> Dict[int, WaveStat]:
     wave_stats = {}
-    for wave in range(1, maxWave):
+    for wave in range(first_wave, max_waves + 1):
         if wave != 1:
             if not _select_wave(driver, wave):
                 break
@@ -132,6 +246,48 @@ def _scan_seat_configs(driver, maxWave=50) -> Dict[int, WaveStat]:
     return wave_stats
 
 
+def _scan_seat_configs(
+    driver, max_waves: int = seat_optimizer.MAX_WAVES
+) -> Dict[int, WaveStat]:
+    wave_stats = {}
+    first = 1
+    try:
+        while first <= max_waves:
+            last = min(first + WAVES_PER_SCRIPT - 1, max_waves)
+            driver.set_script_timeout(
+                (last - first + 1) * WAVE_TIMEOUT_MS / 1000 + SCRIPT_MARGIN
+            )
+            result = driver.execute_async_script(
+                WAVES_SCRIPT, first, last, max_waves, WAVE_TIMEOUT_MS
+            )
+            for row in result["waves"]:
+                wave_stats[row["no"]] = _wave_stat(
+                    row["no"], row["seats"], row["totals"], row["max_configured"]
+                )
+            if not result["complete"]:
+                break
+            if result["end"]:
+                return wave_stats
+            first = last + 1
+        else:
+            return wave_stats
+    except (WebDriverException, TypeError, KeyError, ValueError, IndexError) as ex:
+        logging.debug(f"Scanning waves {first} on in a script failed: {ex}")
+
+    logging.debug(f"Scanning waves from {len(wave_stats) + 1} one by one")
+    wave_stats.update(
+        _scan_seat_configs_by_element(driver, len(wave_stats) + 1, max_waves)
+    )
+    return wave_stats
+
+
+def _read_wave_stats(
+    driver, max_waves: int = seat_optimizer.MAX_WAVES
+) -> Dict[int, WaveStat]:
+    _wait_for_wave_stats(driver)
+    return _scan_seat_configs(driver, max_waves)
+
+
 def _select_option(driver, id: str, value: Any):
     ele = Select(driver.find_element("id", id))
     for option in ele.options:
@@ -157,6 +313,48 @@ def _select_aircraft(
             option.click()
 
 
+def _seat_config_key(
+    source: str,
+    destinations: List[str],
+    aircraft_make: str,
+    aircraft_model: str,
+    route_stats_list: List[RouteStats],
+    no_negative: bool,
+    max_waves: int = None,
+) -> str:
+    return make_key(
+        "seat_config",
+        source,
+        destinations,
+        aircraft_make.lower(),
+        aircraft_model.lower(),
+        no_negative,
+        [
+            [
+                (str(stat.price), str(stat.demand)) if stat else None
+                for stat in [rs.economy, rs.business, rs.first, rs.cargo]
+            ]
+            for rs in route_stats_list
+        ],
+        # Cut off lists are kept apart, full scans keep their old keys
+        *([max_waves] if max_waves else []),
+    )
+
+
+def _cached_wave_stats(cache: DiskCache, key: str) -> Dict[int, WaveStat]:
+    cached = cache.get(key)
+    if cached:
+        return {int(k): codec.from_dict(WaveStat, v) for k, v in cached.items()}
+
+
+def _cache_wave_stats(cache: DiskCache, key: str, wave_stats: Dict[int, WaveStat]):
+    # An empty scrape is a failed one, the next run tries noway.info again
+    if not wave_stats:
+        logging.warning(f"No seat configs read, not caching {key}")
+        return
+    cache.set(key, {k: codec.to_dict(v) for k, v in wave_stats.items()})
+
+
 def find_seat_config(
     driver,
     source: str,
@@ -165,20 +363,53 @@ def find_seat_config(
     aircraft_model: str,
     route_stats: RouteStats,
     no_negative=False,
+    cache: DiskCache = None,
+    demand_max_waves=False,
 ) -> RouteStats:
+    """Every wave noway.info's seat configurator lists for the route
+
+    Args:
+        demand_max_waves (bool): stop at the waves seat_optimizer needs to
+            carry the demand instead
+    """
+    max_waves = (
+        _max_waves(aircraft_make, aircraft_model, [route_stats])
+        if demand_max_waves
+        else None
+    )
+    if cache:
+        key = _seat_config_key(
+            source,
+            [destination],
+            aircraft_make,
+            aircraft_model,
+            [route_stats],
+            no_negative,
+            max_waves,
+        )
+        wave_stats = _cached_wave_stats(cache, key)
+        if wave_stats is not None:
+            logging.info(f"Using cached seat configs for {source} to {destination}")
+            route_stats.wave_stats = wave_stats
+            return route_stats
+
     logging.info(
         f"Finding seat configs for {source} to {destination} with {aircraft_make} {aircraft_model}"
     )
-    driver.get("https://destinations.noway.info/en/seatconfigurator/index.html")
+    driver.get(urls.noway("/en/seatconfigurator/index.html"))
     _clear_previous_configs(driver)
     _select_aircraft(driver, aircraft_make, aircraft_model)
 
     _change_to_airport_codes(driver)
     _fillin_route_stats(driver, source, destination, route_stats)
 
-    time.sleep(5)
+    _wait_for_circuit_rows(driver, 1)
     _calculate_seat_config(driver, no_negative)
-    route_stats.wave_stats = _scan_seat_configs(driver)
+    route_stats.wave_stats = _read_wave_stats(
+        driver, max_waves or seat_optimizer.MAX_WAVES
+    )
+    if cache:
+        _cache_wave_stats(cache, key, route_stats.wave_stats)
     return route_stats
 
 
@@ -190,11 +421,33 @@ def find_seat_config_for_multiple_routes(
     aircraft_model: str,
     route_stats_list: List[RouteStats],
     no_negative=False,
+    cache: DiskCache = None,
+    demand_max_waves=False,
 ) -> Dict[int, WaveStat]:
+    max_waves = (
+        _max_waves(aircraft_make, aircraft_model, route_stats_list)
+        if demand_max_waves
+        else None
+    )
+    if cache:
+        key = _seat_config_key(
+            source,
+            destinations,
+            aircraft_make,
+            aircraft_model,
+            route_stats_list,
+            no_negative,
+            max_waves,
+        )
+        wave_stats = _cached_wave_stats(cache, key)
+        if wave_stats is not None:
+            logging.info(f"Using cached seat configs for {source} to {destinations}")
+            return wave_stats
+
     logging.info(
         f"Finding seat configs for {source} to {destinations} with {aircraft_make} {aircraft_model}"
     )
-    driver.get("https://destinations.noway.info/en/seatconfigurator/index.html")
+    driver.get(urls.noway("/en/seatconfigurator/index.html"))
     _clear_previous_configs(driver)
     _select_option(driver, "cf_aircraftmake", aircraft_make)
     _select_option(driver, "cf_aircraftmodel", aircraft_model)
@@ -203,12 +456,38 @@ def find_seat_config_for_multiple_routes(
     for idx, route_stats in enumerate(route_stats_list):
         _fillin_route_stats(driver, source, destinations[idx], route_stats)
 
-    time.sleep(5)
+    _wait_for_circuit_rows(driver, len(route_stats_list))
     _calculate_seat_config(driver, no_negative)
-    return _scan_seat_configs(driver)
+    wave_stats = _read_wave_stats(driver, max_waves or seat_optimizer.MAX_WAVES)
+    if cache:
+        _cache_wave_stats(cache, key, wave_stats)
+    return wave_stats
+
+
+ROUTE_DETAILS_XPATH = '//*[@id="routefinderresults"]/tbody/tr'
+ROUTE_DETAILS_FIELDS = {f"td{i}": f"td[{i}]" for i in range(1, 7)}
+CIRCUIT_ROWS_XPATH = (
+    '//*[@id="nwy_circuitfinder_circuit_content"]/table/tbody/tr/td/table[1]/tbody/tr'
+)
+CIRCUIT_ROW_FIELDS = {f"td{i}": f"td[{i}]" for i in range(1, 8)}
+# The circuit finder used to get a fixed 10s before its results were read
+CIRCUIT_TIMEOUT = 10
 
 
 def _scrape_route_details(driver) -> List[List[str]]:
+    rows = extract_rows(driver, ROUTE_DETAILS_XPATH, ROUTE_DETAILS_FIELDS)
+    if rows is None or not complete_rows(rows):
+        return _scrape_route_details_by_element(driver)
+
+    routes = [["id", "country", "IATA", "cat", "stars", "duration", "distance"]]
+    for idx, row in enumerate(rows):
+        routes.append([idx] + [row[f"td{i}"] for i in range(1, 7)])
+    logging.info(f"Found {len(routes)-1} routes with given config")
+    logging.debug(f"Found routes:\n{routes}")
+    return routes
+
+
+def _scrape_route_details_by_element(driver) -> List[List[str]]:
     routes_table = driver.find_element("id", "routefinderresults")
     routes = [["id", "country", "IATA", "cat", "stars", "duration", "distance"]]
     for idx, row in enumerate(routes_table.find_elements(By.XPATH, "tbody/tr")):
@@ -239,7 +518,7 @@ def find_routes_from(
     logging.info(
         f"Finding routes from {hub} with {aircraft_make} {aircraft_model} and duration between {min_duration} <> {max_duration} hours"
     )
-    driver.get("https://destinations.noway.info/en/routefinder/index.html")
+    driver.get(urls.noway("/en/routefinder/index.html"))
     _change_to_airport_codes(driver)
     cf_hub_src = driver.find_element("id", "cf_hub_src")
     cf_hub_src.send_keys(hub)
@@ -249,7 +528,14 @@ def find_routes_from(
     _select_option(driver, "route_duration_from_hh", min_duration)
     _select_option(driver, "route_duration_to_hh", max_duration)
     js_click(driver, driver.find_element("id", "df_search"))
-    time.sleep(5)
+    wait.element_present(
+        driver,
+        By.XPATH,
+        '//*[@id="routefinderresults"]/tbody/tr',
+        wait.SETTLE_TIMEOUT,
+        required=False,
+    )
+    wait.ajax_idle(driver)
     return _scrape_route_details(driver)
 
 
@@ -262,14 +548,39 @@ def _fillin_circuit_info(driver, source: str, excluded_dest: str, hours: int):
     circut.select_by_visible_text(f"{hours} hours")
 
 
+def _circuit_row(row: Dict[str, str]) -> CircuitRow:
+    return CircuitRow(
+        no=int(row["td1"]),
+        destination=row["td2"],
+        country=row["td3"],
+        cat=int(row["td4"]),
+        stars=int(row["td5"]),
+        distance=row["td6"],
+        time=row["td7"],
+    )
+
+
 def _get_circuit_info(driver, next_id: int, new_circuit_status: int) -> CircuitInfo:
+    rows = extract_rows(driver, CIRCUIT_ROWS_XPATH, CIRCUIT_ROW_FIELDS)
+    if rows is None:
+        return _get_circuit_info_by_element(driver, next_id, new_circuit_status)
+
     circuit_rows = []
-    for idx, element in enumerate(
-        driver.find_elements(
-            By.XPATH,
-            '//*[@id="nwy_circuitfinder_circuit_content"]/table/tbody/tr/td/table[1]/tbody/tr',
-        )
-    ):
+    # Skip headers
+    for row in rows[2:]:
+        try:
+            circuit_rows.append(_circuit_row(row))
+        except Exception:
+            break
+
+    return CircuitInfo(id=next_id, rows=circuit_rows, status=new_circuit_status)
+
+
+def _get_circuit_info_by_element(
+    driver, next_id: int, new_circuit_status: int
+) -> CircuitInfo:
+    circuit_rows = []
+    for idx, element in enumerate(driver.find_elements(By.XPATH, CIRCUIT_ROWS_XPATH)):
         if idx < 2:
             # Skip headers
             continue
@@ -303,12 +614,19 @@ def find_circuit(
     next_id: int,
     new_circuit_status=3,
 ) -> CircuitInfo:
-    driver.get("https://destinations.noway.info/en/circuitfinder/index.html")
+    driver.get(urls.noway("/en/circuitfinder/index.html"))
     _select_aircraft(driver, aircraft_make, aircraft_model)
     _change_to_airport_codes(driver)
     _fillin_circuit_info(driver, source, exclude_routes, hours)
     js_click(driver, driver.find_element("id", "cf_search"))
-    time.sleep(10)
+    wait.element_count(
+        driver,
+        By.XPATH,
+        CIRCUIT_ROWS_XPATH,
+        3,
+        timeout=CIRCUIT_TIMEOUT,
+        required=False,
+    )
     return _get_circuit_info(driver, next_id, new_circuit_status)
 
 
@@ -0,0 +1,151 @@
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class Site:
+    """The sessions one server may be used through at the same time, a stage
+    worker holds one of them for a whole step.
+
+    Sites without a browser, like local calculations, use None sessions.
+    """
+
+    def __init__(self, name: str, drivers: List[Any]):
+        self.name = name
+        self.size = len(drivers)
+        self._drivers = queue.Queue()
+        for driver in drivers:
+            self._drivers.put(driver)
+
+    @contextmanager
+    def session(self):
+        driver = self._drivers.get()
+        try:
+            yield driver
+        finally:
+            self._drivers.put(driver)
+
+
+@dataclass
+class Stage:
+    name: str
+    site: Site
+    fn: Callable[[Any, Any], Any]
+    workers: int = 0
+
+    def __post_init__(self):
+        self.workers = self.workers or self.site.size
+        self.processed = 0
+        self.busy = 0.0
+        self.waited = 0.0
+
+
+class Pipeline:
+    """Moves items through stages, each with its own worker threads and queue.
+
+    next_stage(item) names the stage an item goes to after it is admitted and
+    after every step, None when it is done. At most max_in_flight items are
+    admitted at once, which also bounds every queue, so a worker handing an
+    item to the next stage never blocks on a full queue.
+    """
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        next_stage: Callable[[Any], Optional[str]],
+        max_in_flight: int = 8,
+    ):
+        self.stages: Dict[str, Stage] = {stage.name: stage for stage in stages}
+        self.next_stage = next_stage
+        self.max_in_flight = max(max_in_flight, 1)
+
+    def run(self, items: Iterable[Any]):
+        queues = {name: queue.Queue(self.max_in_flight) for name in self.stages}
+        admitted = threading.BoundedSemaphore(self.max_in_flight)
+        stop = threading.Event()
+        done = threading.Event()
+        state = {"pending": 0, "fed": False}
+        state_lock = threading.Lock()
+        errors = []
+
+        def _fail(item: Any, ex: Exception):
+            logging.error(f"Pipeline failed processing {item}: {ex}")
+            errors.append(ex)
+            stop.set()
+
+        def _route(item: Any):
+            name = self.next_stage(item)
+            if name is not None:
+                queues[name].put(item)
+                return
+
+            admitted.release()
+            with state_lock:
+                state["pending"] -= 1
+                if state["fed"] and state["pending"] == 0:
+                    done.set()
+
+        def _feeder():
+            try:
+                for item in items:
+                    while not admitted.acquire(timeout=0.1):
+                        if stop.is_set():
+                            return
+                    with state_lock:
+                        state["pending"] += 1
+                    _route(item)
+            except Exception as ex:
+                _fail("feeder", ex)
+            finally:
+                with state_lock:
+                    state["fed"] = True
+                    if state["pending"] == 0:
+                        done.set()
+
+        def _worker(stage: Stage):
+            work = queues[stage.name]
+            while not (stop.is_set() or done.is_set()):
+                try:
+                    item = work.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                try:
+                    started = time.perf_counter()
+                    with stage.site.session() as driver:
+                        acquired = time.perf_counter()
+                        stage.fn(driver, item)
+                    finished = time.perf_counter()
+                    with state_lock:
+                        stage.processed += 1
+                        stage.waited += acquired - started
+                        stage.busy += finished - acquired
+                    _route(item)
+                except Exception as ex:
+                    _fail(item, ex)
+
+        threads = [threading.Thread(target=_feeder, daemon=True)]
+        for stage in self.stages.values():
+            threads.extend(
+                threading.Thread(target=_worker, args=(stage,), daemon=True)
+                for _ in range(stage.workers)
+            )
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.log_stats()
+        if errors:
+            raise errors[0]
+
+    def log_stats(self):
+        for stage in self.stages.values():
+            logging.info(
+                f"Stage {stage.name} ({stage.site.name} x{stage.workers}): "
+                f"{stage.processed} steps, {stage.busy:.1f}s busy, "
+                f"{stage.waited:.1f}s waiting for a session"
+            )
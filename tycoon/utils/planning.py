@@ -0,0 +1,115 @@
+import bisect
+import logging
+import math
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import pandas as pd
+from tycoon.utils.circuit_finder import SLOTS_PER_HOUR
+from tycoon.utils.route_finder import format_duration, parse_duration
+
+DAYS_PER_WEEK = 7
+DAY_SLOTS = 24 * SLOTS_PER_HOUR
+WEEK_SLOTS = DAYS_PER_WEEK * DAY_SLOTS
+
+
+def round_trip_slots(duration: str) -> int:
+    """Planning slots of a round trip with the given one way duration"""
+    return math.ceil(2 * parse_duration(duration) * SLOTS_PER_HOUR)
+
+
+def weekly_round_trips(waves: int, duration: str) -> int:
+    """Round trips of a line's waves in a week, each wave is one aircraft
+    flying the line back to back like the schedulers plan it, so a long
+    haul wave flies fewer than one a day"""
+    return int(waves) * max(1, WEEK_SLOTS // round_trip_slots(duration))
+
+
+@dataclass(slots=True)
+class PlannedTrip:
+    aircraft: int
+    destination: str
+    start: int
+    slots: int
+
+
+@dataclass(slots=True)
+class SlotPlan:
+    """Round trips laid out back to back on each aircraft's week, aircraft
+    are numbered from 0 in the order they were opened"""
+
+    trips: List[PlannedTrip] = field(default_factory=list)
+    used: List[int] = field(default_factory=list)
+    unplaced: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def aircraft(self) -> int:
+        return len(self.used)
+
+    @property
+    def utilization(self) -> float:
+        if not self.used:
+            return 0.0
+        return sum(self.used) / (len(self.used) * WEEK_SLOTS)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            [
+                [
+                    trip.aircraft,
+                    trip.destination,
+                    trip.start // DAY_SLOTS + 1,
+                    format_duration((trip.start % DAY_SLOTS) / SLOTS_PER_HOUR),
+                    format_duration(trip.slots / SLOTS_PER_HOUR),
+                ]
+                for trip in self.trips
+            ],
+            columns=["aircraft", "destination", "day", "start", "duration"],
+        )
+
+
+def pack(
+    demand: Dict[str, int], durations: Dict[str, str], aircraft: int = None
+) -> SlotPlan:
+    """Packs demand[destination] weekly round trips onto as few aircraft
+    weeks as possible, best fit decreasing: longest trips first, each on
+    the aircraft with the least time left that still fits it.
+
+    Args:
+        durations (Dict[str, str]): one way "HH:MM" duration per destination
+        aircraft (int): max aircraft to open, unlimited by default
+    """
+    trips = sorted(
+        (
+            (round_trip_slots(durations[destination]), destination)
+            for destination, count in demand.items()
+            for _ in range(int(count))
+        ),
+        reverse=True,
+    )
+    plan = SlotPlan()
+    unplaced = Counter()
+    # (slots left, aircraft) of every opened aircraft, kept sorted
+    left = []
+    for slots, destination in trips:
+        i = bisect.bisect_left(left, (slots, -1))
+        if i < len(left):
+            _, number = left.pop(i)
+        elif slots <= WEEK_SLOTS and (aircraft is None or plan.aircraft < aircraft):
+            number = plan.aircraft
+            plan.used.append(0)
+        else:
+            unplaced[destination] += 1
+            continue
+
+        plan.trips.append(PlannedTrip(number, destination, plan.used[number], slots))
+        plan.used[number] += slots
+        bisect.insort(left, (WEEK_SLOTS - plan.used[number], number))
+
+    plan.unplaced = dict(unplaced)
+    logging.debug(
+        f"Packed {len(plan.trips)} round trips on {plan.aircraft} aircraft, "
+        f"{plan.utilization:.1%} utilization, {sum(unplaced.values())} unplaced"
+    )
+    return plan
@@ -0,0 +1,71 @@
+import logging
+import queue
+import threading
+from typing import Any, Callable, Iterable, List, Optional
+
+from selenium.webdriver.remote.webdriver import WebDriver
+from tycoon.utils.browser import new_driver
+
+
+class DriverPool:
+    """A fixed set of WebDriver sessions sharing one work queue.
+
+    The first session is the one the command was started with, the rest are
+    created from the same command line options and quit by `close`. Without
+    a driver every session is created by the pool.
+    """
+
+    def __init__(self, driver: Optional[WebDriver], options: Any, size: int):
+        self.drivers: List[WebDriver] = [driver] if driver else []
+        for _ in range(len(self.drivers), max(size, 1)):
+            self.drivers.append(new_driver(options))
+        self._owned = self.drivers[1:] if driver else list(self.drivers)
+
+    def __len__(self) -> int:
+        return len(self.drivers)
+
+    def setup(self, fn: Callable[[WebDriver], Any]):
+        for driver in self._owned:
+            fn(driver)
+
+    def run(self, items: Iterable[Any], fn: Callable[[WebDriver, Any], Any]):
+        work = queue.Queue()
+        for item in items:
+            work.put(item)
+
+        stop = threading.Event()
+        errors = []
+
+        def _worker(driver: WebDriver):
+            while not stop.is_set():
+                try:
+                    item = work.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    fn(driver, item)
+                except Exception as ex:
+                    logging.error(f"Worker failed processing {item}: {ex}")
+                    errors.append(ex)
+                    stop.set()
+
+        threads = [
+            threading.Thread(target=_worker, args=(driver,), daemon=True)
+            for driver in self.drivers
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+
+    def close(self):
+        for driver in self._owned:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self.drivers = [d for d in self.drivers if d not in self._owned]
+        self._owned = []
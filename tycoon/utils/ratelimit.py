@@ -0,0 +1,225 @@
+import functools
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict
+from urllib.parse import urlparse
+
+from requests.adapters import HTTPAdapter
+from selenium.webdriver.remote.command import Command as DriverCommand
+from selenium.webdriver.remote.webdriver import WebDriver
+
+DEFAULT_RATE = 2.0
+DEFAULT_CONCURRENCY = 4
+LATENCY_TARGET = 5.0
+
+# Driver commands that make the browser talk to the server, reads of the
+# already loaded page are not limited
+NAVIGATING_COMMANDS = {
+    DriverCommand.GET,
+    DriverCommand.REFRESH,
+    DriverCommand.CLICK_ELEMENT,
+}
+NAVIGATING_SCRIPT = re.compile(r"\.click\(\)|\.submit\(\)|window\.open\(")
+
+
+class HostLimiter:
+    """Token bucket of rate requests per second plus a concurrency limit for
+    one host, both adjusted AIMD style: halved when a call fails or takes
+    longer than latency_target, grown back step by step while calls are
+    healthy.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        rate: float = DEFAULT_RATE,
+        max_concurrency: int = DEFAULT_CONCURRENCY,
+        latency_target: float = LATENCY_TARGET,
+    ):
+        self.host = host
+        self.max_rate = rate
+        self.min_rate = rate / 16
+        self.rate = rate
+        self.max_concurrency = max(max_concurrency, 1)
+        self.limit = float(self.max_concurrency)
+        self.latency_target = latency_target
+        self.tokens = max(rate, 1.0)
+        self.in_flight = 0
+
+        self.requests = 0
+        self.errors = 0
+        self.slow = 0
+        self.decreases = 0
+        self.waited = 0.0
+        self.latency = 0.0
+        self._refilled_at = time.monotonic()
+        self._decreased_at = 0.0
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float):
+        self.tokens = min(
+            max(self.rate, 1.0), self.tokens + (now - self._refilled_at) * self.rate
+        )
+        self._refilled_at = now
+
+    def acquire(self):
+        started = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self.in_flight < int(self.limit) and self.tokens >= 1:
+                    break
+                timeout = (1 - self.tokens) / self.rate if self.tokens < 1 else 1.0
+                self._cond.wait(timeout)
+            self.tokens -= 1
+            self.in_flight += 1
+            self.waited += time.monotonic() - started
+
+    def release(self, latency: float, ok: bool):
+        now = time.monotonic()
+        with self._cond:
+            self.in_flight -= 1
+            self.requests += 1
+            self.errors += 0 if ok else 1
+            self.latency = (
+                latency if self.requests == 1 else 0.8 * self.latency + 0.2 * latency
+            )
+            slow = latency > self.latency_target
+            self.slow += 1 if slow else 0
+            if not ok or slow:
+                # at most one decrease per latency_target, a burst of failures
+                # from the same overload only counts once
+                if now - self._decreased_at > self.latency_target:
+                    self._decreased_at = now
+                    self.decreases += 1
+                    self.limit = max(1.0, self.limit / 2)
+                    self.rate = max(self.min_rate, self.rate / 2)
+                    logging.debug(
+                        f"Backing off {self.host}: {self.rate:.2f} req/s, {int(self.limit)} at once"
+                    )
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+            self._cond.notify_all()
+
+    def call(self, fn, *args, **kwargs):
+        self.acquire()
+        started = time.monotonic()
+        ok = False
+        try:
+            result = fn(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            self.release(time.monotonic() - started, ok)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "slow": self.slow,
+                "in_flight": self.in_flight,
+                "rate": round(self.rate, 2),
+                "concurrency": int(self.limit),
+                "latency": round(self.latency, 3),
+                "waited": round(self.waited, 1),
+                "backoffs": self.decreases,
+            }
+
+
+_limiters: Dict[str, HostLimiter] = {}
+_lock = threading.Lock()
+_settings = {
+    "rate": DEFAULT_RATE,
+    "max_concurrency": DEFAULT_CONCURRENCY,
+    "latency_target": LATENCY_TARGET,
+}
+
+
+def configure(options: Any):
+    _settings["rate"] = getattr(options, "max_rps", DEFAULT_RATE)
+    _settings["max_concurrency"] = getattr(
+        options, "max_host_concurrency", DEFAULT_CONCURRENCY
+    )
+    interval = getattr(options, "rate_stats_interval", 0)
+    if interval:
+        threading.Thread(target=_report, args=(interval,), daemon=True).start()
+
+
+def limiter(url: str) -> HostLimiter:
+    host = urlparse(url).hostname or url
+    with _lock:
+        if host not in _limiters:
+            _limiters[host] = HostLimiter(host, **_settings)
+        return _limiters[host]
+
+
+def metrics() -> Dict[str, Dict[str, Any]]:
+    """Live counters of every host, safe to call from any thread"""
+    with _lock:
+        limiters = list(_limiters.values())
+    return {limiter.host: limiter.metrics() for limiter in limiters}
+
+
+def log_stats():
+    for host, stats in metrics().items():
+        logging.info(
+            f"Requests to {host}: {stats['requests']} ({stats['errors']} failed, "
+            f"{stats['slow']} slow), {stats['latency']}s avg latency, "
+            f"{stats['waited']}s throttled, {stats['backoffs']} backoffs, "
+            f"now {stats['rate']} req/s with {stats['concurrency']} at once"
+        )
+
+
+def _report(interval: float):
+    while True:
+        time.sleep(interval)
+        log_stats()
+
+
+def _limited_execute(execute, state: dict, command, params=None):
+    if command == DriverCommand.GET:
+        state["host"] = params["url"]
+    elif command == DriverCommand.W3C_EXECUTE_SCRIPT and "window.open(" in (
+        params or {}
+    ).get("script", ""):
+        state["host"] = next(
+            (a for a in params.get("args", []) if isinstance(a, str)), state["host"]
+        )
+
+    navigates = command in NAVIGATING_COMMANDS or (
+        command == DriverCommand.W3C_EXECUTE_SCRIPT
+        and NAVIGATING_SCRIPT.search((params or {}).get("script", ""))
+    )
+    if not navigates or not state["host"]:
+        return execute(command, params)
+    return limiter(state["host"]).call(execute, command, params)
+
+
+def instrument(driver: WebDriver) -> WebDriver:
+    """Routes the driver's page loads, clicks and submits through the limiter
+    of the host the browser is on"""
+    state = {"host": None}
+    driver.execute = functools.partial(_limited_execute, driver.execute, state)
+    return driver
+
+
+class LimitedAdapter(HTTPAdapter):
+    """HTTPAdapter that sends through the limiter of the request's host,
+    429 and 5xx responses count as failures"""
+
+    def send(self, request, **kwargs):
+        host = limiter(request.url)
+        host.acquire()
+        started = time.monotonic()
+        ok = False
+        try:
+            response = super().send(request, **kwargs)
+            ok = response.status_code != 429 and response.status_code < 500
+            return response
+        finally:
+            host.release(time.monotonic() - started, ok)
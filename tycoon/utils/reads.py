@@ -0,0 +1,103 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+import requests
+from selenium.webdriver.remote.webdriver import WebDriver
+from tycoon.utils import airline_manager, codec, http_reader
+from tycoon.utils.cache import RouteCache, make_key
+from tycoon.utils.data import RouteStat, RouteStats
+
+# Read only lookups that work with either a logged in WebDriver or a
+# requests.Session created by http_reader.new_session
+
+
+def _backend(reader: Any):
+    if isinstance(reader, requests.Session):
+        return http_reader
+    return airline_manager
+
+
+def line_urls(reader: Any) -> Optional[Dict[str, str]]:
+    """Line links for http_reader, None for the browser which follows the
+    line picker itself"""
+    if _backend(reader) is http_reader:
+        return http_reader.line_urls(reader)
+
+
+def _line_stats(
+    reader: Any,
+    hub: str,
+    route: str,
+    static: Dict[str, Any],
+    driver: WebDriver,
+    links: Dict[str, str],
+):
+    if _backend(reader) is airline_manager:
+        return airline_manager.line_stats(reader, hub, route, static)
+    try:
+        return http_reader.line_stats(reader, hub, route, static, links)
+    except http_reader.LineNotLinked as ex:
+        if driver is None:
+            raise
+        logging.debug(f"{ex}, reading it with the browser")
+        return airline_manager.line_stats(driver, hub, route, static)
+
+
+def route_stats(
+    reader: Any,
+    hub: str,
+    route: str,
+    cache: RouteCache = None,
+    driver: WebDriver = None,
+    links: Dict[str, str] = None,
+) -> RouteStats:
+    """Route stats, with the line's static metadata and prices from the
+    cache when given
+
+    Args:
+        driver (WebDriver): reads the lines an http_reader session can't open
+        links (Dict[str, str]): line_urls of the session, read once by the caller
+    """
+    backend = _backend(reader)
+    key = make_key(hub, route)
+    static = cache.static.get(key) if cache else None
+    route_stats, fetched = _line_stats(reader, hub, route, static, driver, links)
+    if cache is None:
+        for name, stat in backend.route_prices(reader, fetched["prices_url"]):
+            route_stats.__setattr__(name, stat)
+        return route_stats
+
+    if static is None:
+        cache.static.set(key, fetched)
+
+    prices = cache.prices.get(key)
+    if prices is None:
+        try:
+            prices = {
+                name: codec.to_dict(stat)
+                for name, stat in backend.route_prices(reader, fetched["prices_url"])
+            }
+        except Exception:
+            cache.static.delete(key)
+            raise
+        cache.prices.set(key, prices)
+
+    for name, stat in prices.items():
+        route_stats.__setattr__(name, codec.from_dict(RouteStat, stat))
+    return route_stats
+
+
+def hub_ids(reader: Any) -> Dict[str, int]:
+    return _backend(reader).hub_ids(reader)
+
+
+def line_list(reader: Any, hub: str, hub_id: int) -> List[str]:
+    return _backend(reader).line_list(reader, hub, hub_id)
+
+
+def find_hub_id(reader: Any, hub: str) -> int:
+    return _backend(reader).find_hub_id(reader, hub)
+
+
+def get_all_routes(reader: Any, hub: str) -> List[str]:
+    return _backend(reader).get_all_routes(reader, hub)
@@ -0,0 +1,143 @@
+import logging
+import os
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+from tycoon.utils.aircraft_specs import AircraftSpec
+
+AIRPORTS_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "airports.csv"
+)
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = np.pi * EARTH_RADIUS_KM / 180
+# Taxi, climb and descent on top of the time spent at cruise speed
+TURNAROUND_HOURS = 1.0
+ROUTE_COLUMNS = ["id", "country", "IATA", "cat", "stars", "duration", "distance"]
+
+
+def format_duration(hours: float) -> str:
+    minutes = int(round(hours * 60))
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def parse_duration(duration: str) -> float:
+    hours, minutes = str(duration).split(":")[:2]
+    return int(hours) + int(minutes) / 60
+
+
+def flight_hours(distance_km: np.ndarray, spec: AircraftSpec) -> np.ndarray:
+    return distance_km / spec.speed_kmh + TURNAROUND_HOURS
+
+
+class AirportIndex:
+    """Airports sorted by latitude, so a distance band around a hub only
+    has to look at the latitude slice that can possibly be in range.
+    """
+
+    def __init__(self, airports: pd.DataFrame):
+        self.airports = airports.sort_values("lat").reset_index(drop=True)
+        self.iata = self.airports["IATA"].to_numpy()
+        self.lat = np.radians(self.airports["lat"].to_numpy(dtype=float))
+        self.lon = np.radians(self.airports["lon"].to_numpy(dtype=float))
+        self.lat_deg = self.airports["lat"].to_numpy(dtype=float)
+        self._positions = {iata: i for i, iata in enumerate(self.iata)}
+
+    @classmethod
+    def load(cls, path: str = None) -> "AirportIndex":
+        path = path or AIRPORTS_FILE
+        logging.debug(f"Loading airports from {path}")
+        return cls(pd.read_csv(path, keep_default_na=False))
+
+    def position(self, iata: str) -> int:
+        if iata not in self._positions:
+            raise Exception(f"Unknown airport {iata}")
+        return self._positions[iata]
+
+    def _candidates(self, hub_pos: int, max_km: float) -> np.ndarray:
+        span = max_km / KM_PER_DEGREE_LAT
+        lo = np.searchsorted(self.lat_deg, self.lat_deg[hub_pos] - span, "left")
+        hi = np.searchsorted(self.lat_deg, self.lat_deg[hub_pos] + span, "right")
+        return np.arange(lo, hi)
+
+    def distances(self, hub_pos: int, candidates: np.ndarray) -> np.ndarray:
+        dlat = self.lat[candidates] - self.lat[hub_pos]
+        dlon = self.lon[candidates] - self.lon[hub_pos]
+        a = (
+            np.sin(dlat / 2) ** 2
+            + np.cos(self.lat[hub_pos])
+            * np.cos(self.lat[candidates])
+            * np.sin(dlon / 2) ** 2
+        )
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+    def within(
+        self, hub: str, min_km: float, max_km: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        hub_pos = self.position(hub)
+        candidates = self._candidates(hub_pos, max_km)
+        distances = self.distances(hub_pos, candidates)
+        mask = (distances >= min_km) & (distances <= max_km)
+        mask &= candidates != hub_pos
+        return candidates[mask], distances[mask]
+
+    def find_routes(
+        self,
+        hub: str,
+        spec: AircraftSpec,
+        min_duration: float,
+        max_duration: float,
+    ) -> pd.DataFrame:
+        reach = float(flight_hours(spec.range_km, spec))
+        if min_duration >= reach:
+            raise Exception(
+                f"No {spec.model} flight lasts {min_duration}-{max_duration} hours, "
+                f"its {spec.range_km}km range is {reach:.1f} hours at "
+                f"{spec.speed_kmh}km/h, ask for a shorter --min_duration"
+            )
+        min_km = max(0.0, (min_duration - TURNAROUND_HOURS) * spec.speed_kmh)
+        max_km = min(spec.range_km, (max_duration - TURNAROUND_HOURS) * spec.speed_kmh)
+        positions, distances = self.within(hub, min_km, max_km)
+        order = np.argsort(distances, kind="stable")
+        positions, distances = positions[order], distances[order]
+        routes = self.airports.iloc[positions][["country", "IATA", "cat", "stars"]]
+        routes = routes.reset_index(drop=True)
+        routes.insert(0, "id", np.arange(len(routes)))
+        routes["duration"] = [format_duration(h) for h in flight_hours(distances, spec)]
+        routes["distance"] = np.round(distances).astype(int).astype(str)
+        return routes[ROUTE_COLUMNS]
+
+    def find_routes_many(
+        self,
+        hubs: List[str],
+        spec: AircraftSpec,
+        windows: List[Tuple[float, float]],
+    ) -> pd.DataFrame:
+        frames = []
+        for hub in hubs:
+            for min_duration, max_duration in windows:
+                df = self.find_routes(hub, spec, min_duration, max_duration)
+                df.insert(0, "hub", hub)
+                df.insert(1, "min_duration", min_duration)
+                df.insert(2, "max_duration", max_duration)
+                frames.append(df)
+        if not frames:
+            return pd.DataFrame(
+                columns=["hub", "min_duration", "max_duration"] + ROUTE_COLUMNS
+            )
+        return pd.concat(frames, ignore_index=True)
+
+
+def find_routes_from(
+    index: AirportIndex,
+    hub: str,
+    spec: AircraftSpec,
+    min_duration: int,
+    max_duration: int,
+) -> List[List[str]]:
+    logging.info(
+        f"Finding routes locally from {hub} with {spec.make} {spec.model} and duration between {min_duration} <> {max_duration} hours"
+    )
+    df = index.find_routes(hub, spec, min_duration, max_duration)
+    logging.info(f"Found {len(df)} routes with given config")
+    return [ROUTE_COLUMNS] + df.values.tolist()
@@ -0,0 +1,179 @@
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+from tycoon.utils.aircraft_specs import AircraftSpec
+from tycoon.utils.data import RouteStat, RouteStats, WaveStat
+
+CLASSES = ["economy", "business", "first", "cargo"]
+# Economy seat equivalents taken by one seat of each passenger class
+SEAT_SPACE = np.array([1.0, 1.8, 4.2])
+# Flights flown per wave and day, one each way
+FLIGHTS_PER_WAVE = 2
+MAX_WAVES = 49
+
+
+def _as_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def demand_and_prices(route_stats: RouteStats, remaining: bool = False):
+    """Daily demand and price per class, remaining demand is what no
+    airline serves yet"""
+    stats: List[RouteStat] = [getattr(route_stats, c) for c in CLASSES]
+    demand = np.array(
+        [
+            _as_float(s.remaining_demand if remaining else s.demand) if s else 0.0
+            for s in stats
+        ]
+    )
+    prices = np.array([_as_float(s.price) if s else 0.0 for s in stats])
+    return demand, prices
+
+
+def max_waves_for(
+    demand: np.ndarray, spec: AircraftSpec, max_waves: int = MAX_WAVES
+) -> int:
+    """Waves the aircraft needs to carry the whole daily demand, like
+    noway.info's list ends. More waves only spread the same passengers
+    thinner over more aircraft."""
+    flights = [demand[:3] @ SEAT_SPACE / spec.seats]
+    if spec.cargo:
+        flights.append(demand[3] / spec.cargo)
+    return int(max(1, min(max_waves, np.ceil(max(flights) / FLIGHTS_PER_WAVE))))
+
+
+def allocate(
+    demand: np.ndarray,
+    prices: np.ndarray,
+    spec: AircraftSpec,
+    no_negative: bool = False,
+    max_waves: int = MAX_WAVES,
+) -> Dict[str, np.ndarray]:
+    """Seat allocation for every wave count at once
+
+    Args:
+        demand (np.ndarray): daily demand per class, shape (4,) or (routes, 4)
+        prices (np.ndarray): ticket price per class, same shape as demand
+
+    Returns arrays with one row per wave count, 1..max_waves.
+    """
+    demand = np.atleast_2d(demand)
+    prices = np.atleast_2d(prices)
+    # Every leg of a circuit is flown with the same config, so it has to
+    # fit the weakest leg while earning on all of them.
+    weakest = demand.min(axis=0)
+    waves = np.arange(1, max_waves_for(weakest, spec, max_waves) + 1)
+    wanted = np.floor(weakest[None, :] / (FLIGHTS_PER_WAVE * waves[:, None]))
+    price = prices.sum(axis=0)
+
+    seats = np.zeros((len(waves), 4))
+    space_left = np.full(len(waves), float(spec.seats))
+    for c in np.argsort(-price[:3] / SEAT_SPACE, kind="stable"):
+        seats[:, c] = np.minimum(wanted[:, c], np.floor(space_left / SEAT_SPACE[c]))
+        space_left -= seats[:, c] * SEAT_SPACE[c]
+    if not no_negative:
+        seats[:, 0] += np.floor(space_left)
+        space_left -= np.floor(space_left)
+    seats[:, 3] = np.minimum(wanted[:, 3], spec.cargo)
+
+    # Seats beyond the demand fly empty
+    turnover_per_wave = FLIGHTS_PER_WAVE * np.minimum(seats, wanted) @ price
+    return {
+        "waves": waves,
+        "seats": seats.astype(int),
+        "turnover_per_wave": turnover_per_wave,
+        "total_turnover": turnover_per_wave * waves,
+        "roi": np.round(turnover_per_wave / spec.price * 100, 2),
+        "turnover_days": np.ceil(spec.price / np.maximum(turnover_per_wave, 1)).astype(
+            int
+        ),
+        "configured": (spec.seats - space_left) / spec.seats * 100,
+    }
+
+
+def wave_stat(result: Dict[str, np.ndarray], i: int) -> WaveStat:
+    """WaveStat of the ith wave count of an allocate result"""
+    economy, business, first, cargo = result["seats"][i]
+    return WaveStat(
+        no=int(result["waves"][i]),
+        economy=int(economy),
+        business=int(business),
+        first=int(first),
+        cargo=int(cargo),
+        turnover_per_wave=float(result["turnover_per_wave"][i]),
+        roi=float(result["roi"][i]),
+        total_turnover=float(result["total_turnover"][i]),
+        turnover_days=int(result["turnover_days"][i]),
+        max_configured=f"{result['configured'][i]:.2f}%",
+    )
+
+
+def profitable_waves(result: Dict[str, np.ndarray]) -> int:
+    """Wave counts of an allocate result before the first that earns nothing"""
+    idle = np.flatnonzero(result["turnover_per_wave"] <= 0)
+    return int(idle[0]) if len(idle) else len(result["waves"])
+
+
+def solve(
+    demand: np.ndarray,
+    prices: np.ndarray,
+    spec: AircraftSpec,
+    no_negative: bool = False,
+    max_waves: int = MAX_WAVES,
+) -> Dict[int, WaveStat]:
+    result = allocate(demand, prices, spec, no_negative, max_waves)
+    return {
+        int(result["waves"][i]): wave_stat(result, i)
+        for i in range(profitable_waves(result))
+    }
+
+
+def nth_best(wave_stats: Dict[int, WaveStat], n: int) -> Optional[WaveStat]:
+    """The nth wave from the end, the first one when there are fewer, None
+    when the route has no waves"""
+    if not wave_stats:
+        return None
+    keys = list(wave_stats.keys())
+    return wave_stats[keys[-min(n, len(keys))]]
+
+
+def _check_range(route_stats: RouteStats, spec: AircraftSpec):
+    if route_stats.distance and route_stats.distance > spec.range_km:
+        raise Exception(
+            f"Route distance {route_stats.distance}km is out of range for {spec.model} ({spec.range_km}km)"
+        )
+
+
+def find_seat_config(
+    source: str,
+    destination: str,
+    spec: AircraftSpec,
+    route_stats: RouteStats,
+    no_negative=False,
+) -> RouteStats:
+    logging.info(
+        f"Calculating seat configs for {source} to {destination} with {spec.make} {spec.model}"
+    )
+    _check_range(route_stats, spec)
+    route_stats.wave_stats = solve(*demand_and_prices(route_stats), spec, no_negative)
+    return route_stats
+
+
+def find_seat_config_for_multiple_routes(
+    source: str,
+    destinations: List[str],
+    spec: AircraftSpec,
+    route_stats_list: List[RouteStats],
+    no_negative=False,
+) -> Dict[int, WaveStat]:
+    logging.info(
+        f"Calculating seat configs for {source} to {destinations} with {spec.make} {spec.model}"
+    )
+    for route_stats in route_stats_list:
+        _check_range(route_stats, spec)
+    demands, prices = zip(*[demand_and_prices(rs) for rs in route_stats_list])
+    return solve(np.array(demands), np.array(prices), spec, no_negative)
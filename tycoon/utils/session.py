@@ -0,0 +1,61 @@
+import json
+import logging
+import os
+from typing import Optional
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+SESSION_FILE = "session.json"
+
+
+def _session_path(tmp_folder: str) -> str:
+    return os.path.join(tmp_folder, SESSION_FILE)
+
+
+def save_session(driver: WebDriver, tmp_folder: str, email: str):
+    os.makedirs(tmp_folder, exist_ok=True)
+    path = _session_path(tmp_folder)
+    with open(path + ".tmp", "w") as f:
+        json.dump({"email": email, "cookies": driver.get_cookies()}, f)
+    os.replace(path + ".tmp", path)
+    logging.debug(f"Saved session cookies to {path}")
+
+
+def load_cookies(tmp_folder: str, email: str) -> Optional[list]:
+    path = _session_path(tmp_folder)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "r") as f:
+            session = json.load(f)
+    except ValueError:
+        logging.debug(f"Ignoring unreadable session file {path}")
+        return None
+
+    if session.get("email") != email:
+        return None
+    return session.get("cookies") or None
+
+
+def restore_session(driver: WebDriver, tmp_folder: str, email: str, url: str) -> bool:
+    cookies = load_cookies(tmp_folder, email)
+    if not cookies:
+        return False
+
+    # Cookies can only be added for the domain currently loaded
+    driver.get(url)
+    for cookie in cookies:
+        if "expiry" in cookie:
+            cookie["expiry"] = int(cookie["expiry"])
+        try:
+            driver.add_cookie(cookie)
+        except Exception as ex:
+            logging.debug(f"Skipping cookie {cookie.get('name')}: {ex}")
+    return True
+
+
+def clear_session(tmp_folder: str):
+    path = _session_path(tmp_folder)
+    if os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,815 @@
+import html
+import itertools
+import json
+import logging
+import random
+import re
+import string
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+from tycoon.utils.aircraft_specs import AIRCRAFT_SPECS, AircraftSpec
+from tycoon.utils.route_finder import AirportIndex, flight_hours
+
+HUB_POSITIONS = {"CDG": (49.0097, 2.5479)}
+CLASSES = ["economy", "business", "first", "cargo"]
+CLASS_TITLES = {
+    "economy": "Economy class",
+    "business": "Business class",
+    "first": "First class",
+    "cargo": "Cargo",
+}
+HOURS_PER_WEEK = 7 * 24
+SESSION_COOKIE = "sim_session"
+
+
+def generate_airports(hubs: List[str], count: int, seed: int = 1) -> pd.DataFrame:
+    """Hubs plus count synthetic airports spread evenly over the globe, in
+    the format of tycoon/data/airports.csv"""
+    rng = random.Random(seed)
+    codes = ["".join(c) for c in itertools.product(string.ascii_uppercase, repeat=3)]
+    codes = [code for code in codes if code not in hubs]
+    if count > len(codes):
+        raise Exception(f"At most {len(codes)} synthetic airports")
+
+    rows = []
+    for hub in hubs:
+        lat, lon = HUB_POSITIONS.get(
+            hub, (rng.uniform(-60, 60), rng.uniform(-180, 180))
+        )
+        rows.append([hub, "Simland", lat, lon, 10, 5])
+    for code in sorted(rng.sample(codes, count)):
+        rows.append(
+            [
+                code,
+                "Simland",
+                round(float(np.degrees(np.arcsin(rng.uniform(-1, 1)))), 4),
+                round(rng.uniform(-180, 180), 4),
+                rng.randint(1, 10),
+                rng.randint(1, 5),
+            ]
+        )
+    return pd.DataFrame(rows, columns=["IATA", "country", "lat", "lon", "cat", "stars"])
+
+
+@dataclass(slots=True)
+class SimHub:
+    id: int
+    iata: str
+
+
+@dataclass(slots=True)
+class SimLine:
+    id: int
+    hub_id: int
+    destination: str
+    distance: int
+    category: int
+    prices: Dict[str, int]
+    demand: Dict[str, int]
+
+
+@dataclass(slots=True)
+class SimAircraft:
+    id: int
+    name: str
+    make: str
+    model: str
+    hub_id: int
+    seats: Dict[str, int]
+    line_id: Optional[int] = None
+    rotations: int = 0
+    use: int = 0
+
+
+@dataclass(slots=True)
+class GameState:
+    """Hubs, lines, fleet and cash of one simulated airline.
+
+    Every aircraft flies as many weekly rotations as fit in its planning
+    slots on the line it is assigned to, the rotations use up the line's
+    demand class by class.
+    """
+
+    airports: AirportIndex
+    seed: int = 1
+    cash: float = 50_000_000_000
+    hubs: Dict[int, SimHub] = field(default_factory=dict)
+    lines: Dict[int, SimLine] = field(default_factory=dict)
+    aircraft: Dict[int, SimAircraft] = field(default_factory=dict)
+    lock: threading.RLock = field(default_factory=threading.RLock)
+
+    @classmethod
+    def generate(
+        cls,
+        airports: pd.DataFrame,
+        hubs: List[str],
+        aircraft: int,
+        lines: int = 0,
+        make: str = "Airbus",
+        model: str = "A380-800",
+        seed: int = 1,
+    ) -> "GameState":
+        state = cls(AirportIndex(airports), seed)
+        for i, iata in enumerate(hubs):
+            state.hubs[i + 1] = SimHub(i + 1, iata)
+        for hub_id, hub in state.hubs.items():
+            others = [a for a in airports["IATA"] if a not in hubs]
+            for destination in random.Random(seed).sample(
+                others, min(lines, len(others))
+            ):
+                state.buy_line(hub_id, destination, charge=False)
+        spec = state.spec(make, model)
+        for _ in range(aircraft):
+            state.add_aircraft(
+                1, make, model, {"economy": spec.seats, "cargo": spec.cargo}
+            )
+        return state
+
+    def spec(self, make: str, model: str) -> AircraftSpec:
+        spec = AIRCRAFT_SPECS.get((make.lower(), model.lower()))
+        if spec is None:
+            raise Exception(f"Unknown aircraft {make} {model}")
+        return spec
+
+    def hub(self, iata: str) -> SimHub:
+        return next((h for h in self.hubs.values() if h.iata == iata), None)
+
+    def line_for(self, hub_id: int, destination: str) -> Optional[SimLine]:
+        return next(
+            (
+                line
+                for line in self.lines.values()
+                if line.hub_id == hub_id and line.destination == destination
+            ),
+            None,
+        )
+
+    def line_aircraft(self, line_id: int) -> List[SimAircraft]:
+        return [a for a in self.aircraft.values() if a.line_id == line_id]
+
+    def buy_line(self, hub_id: int, destination: str, charge=True) -> SimLine:
+        with self.lock:
+            hub = self.hubs.get(hub_id)
+            if hub is None:
+                raise Exception(f"Unknown hub {hub_id}")
+            if self.line_for(hub_id, destination):
+                raise Exception(f"Line {hub.iata} - {destination} already bought")
+
+            hub_pos = self.airports.position(hub.iata)
+            pos = self.airports.position(destination)
+            distance = int(self.airports.distances(hub_pos, np.array([pos]))[0])
+            category = int(self.airports.airports["cat"].iloc[pos])
+            rng = random.Random(f"{self.seed}-{hub.iata}-{destination}")
+            economy = int(rng.randint(200, 4000) * (1 + category / 10))
+            line = SimLine(
+                id=1000 + len(self.lines) + 1,
+                hub_id=hub_id,
+                destination=destination,
+                distance=distance,
+                category=category,
+                prices={
+                    "economy": int(distance * 0.09 + 50),
+                    "business": int(distance * 0.25 + 150),
+                    "first": int(distance * 0.55 + 300),
+                    "cargo": int(distance * 0.04 + 20),
+                },
+                demand={
+                    "economy": economy,
+                    "business": int(economy * rng.uniform(0.1, 0.3)),
+                    "first": int(economy * rng.uniform(0.02, 0.08)),
+                    "cargo": int(economy * rng.uniform(0.1, 0.5)),
+                },
+            )
+            cost = distance * 1_000
+            if charge:
+                self._pay(cost)
+            self.lines[line.id] = line
+            return line
+
+    def _pay(self, amount: float):
+        if amount > self.cash:
+            raise Exception(f"Not enough cash, {amount:,.0f} needed")
+        self.cash -= amount
+
+    def add_aircraft(
+        self,
+        hub_id: int,
+        make: str,
+        model: str,
+        seats: Dict[str, int],
+        name: str = None,
+    ) -> SimAircraft:
+        with self.lock:
+            aircraft_id = len(self.aircraft) + 1
+            aircraft = SimAircraft(
+                id=aircraft_id,
+                name=name or f"{model}-{aircraft_id:05d}",
+                make=make,
+                model=model,
+                hub_id=hub_id,
+                seats={c: int(seats.get(c) or 0) for c in CLASSES},
+            )
+            self.aircraft[aircraft_id] = aircraft
+            return aircraft
+
+    def buy_aircraft(
+        self,
+        hub_id: int,
+        make: str,
+        model: str,
+        count: int,
+        seats: Dict[str, int],
+        name: str = None,
+    ) -> List[SimAircraft]:
+        with self.lock:
+            if hub_id not in self.hubs:
+                raise Exception(f"Unknown hub {hub_id}")
+            spec = self.spec(make, model)
+            self._check_seats(spec, seats)
+            self._pay(spec.price * count)
+            return [
+                self.add_aircraft(hub_id, spec.make, spec.model, seats, name)
+                for _ in range(count)
+            ]
+
+    def _check_seats(self, spec: AircraftSpec, seats: Dict[str, int]):
+        used = seats.get("economy", 0) + 2 * seats.get("business", 0)
+        used += 4 * seats.get("first", 0)
+        if used > spec.seats or seats.get("cargo", 0) > spec.cargo:
+            raise Exception(f"Seat config {seats} doesn't fit in {spec.model}")
+
+    def reconfigure(self, aircraft_id: int, seats: Dict[str, int], name: str = None):
+        with self.lock:
+            aircraft = self.aircraft[aircraft_id]
+            self._check_seats(self.spec(aircraft.make, aircraft.model), seats)
+            aircraft.seats = {c: int(seats.get(c) or 0) for c in CLASSES}
+            if name:
+                aircraft.name = name
+
+    def assign(self, aircraft_id: int, line_id: Optional[int]):
+        """Plans the aircraft on the line for the whole week, None clears
+        its planning"""
+        with self.lock:
+            aircraft = self.aircraft[aircraft_id]
+            if line_id is None:
+                aircraft.line_id, aircraft.rotations, aircraft.use = None, 0, 0
+                return
+
+            line = self.lines[line_id]
+            if line.hub_id != aircraft.hub_id:
+                raise Exception(f"{aircraft.name} isn't based at the line's hub")
+            spec = self.spec(aircraft.make, aircraft.model)
+            if line.distance > spec.range_km:
+                raise Exception(f"{line.destination} is out of range of {spec.model}")
+            hours = 2 * float(flight_hours(np.array([line.distance]), spec)[0])
+            aircraft.line_id = line_id
+            aircraft.rotations = int(HOURS_PER_WEEK // hours)
+            aircraft.use = max(
+                1, round(100 * aircraft.rotations * hours / HOURS_PER_WEEK)
+            )
+
+    def capacity(self, line_id: int) -> Dict[str, int]:
+        capacity = dict.fromkeys(CLASSES, 0)
+        for aircraft in self.line_aircraft(line_id):
+            for c in CLASSES:
+                capacity[c] += aircraft.seats[c] * aircraft.rotations
+        return capacity
+
+    def remaining_demand(self, line: SimLine) -> Dict[str, int]:
+        capacity = self.capacity(line.id)
+        return {c: max(0, line.demand[c] - capacity[c]) for c in CLASSES}
+
+    def result(self, aircraft: SimAircraft) -> int:
+        line = self.lines[aircraft.line_id]
+        capacity = self.capacity(line.id)
+        revenue = 0.0
+        for c in CLASSES:
+            offered = aircraft.seats[c] * aircraft.rotations
+            if offered:
+                fill = min(1.0, line.demand[c] / capacity[c])
+                revenue += offered * fill * line.prices[c]
+        return int(revenue - 2 * line.distance * aircraft.rotations * 10)
+
+
+PAGE = """<!DOCTYPE html>
+<html><head><title>{title}</title></head>
+<body>
+<div id="header">Cash: $ <span id="ressource3">{cash:,.0f}</span></div>
+{body}
+</body></html>
+"""
+
+LOGIN_BODY = """
+<form method="post" action="/login">
+<input type="text" id="username" name="username">
+<input type="password" id="password" name="password">
+<input type="submit" id="loginSubmit" value="Login">
+</form>
+"""
+
+# Loads the picked line into the page before the change event returns, so
+# reads right after Select.select_by_visible_text see the line
+LINE_PICKER_SCRIPT = """
+<script>
+function pickLine(select) {
+    if (!select.value) return;
+    const request = new XMLHttpRequest();
+    request.open("GET", select.value, false);
+    request.send();
+    const page = new DOMParser().parseFromString(request.responseText, "text/html");
+    document.getElementById("lineDetails").innerHTML =
+        page.getElementById("lineContent").innerHTML;
+}
+</script>
+"""
+
+# Filters and sorts the fleet client side, non matching aircraft are
+# removed from the box like the game does
+PLANNING_SCRIPT = """
+<script>
+const hubs = new Set();
+let line = null, slot = false, confirmed = false, clear = false, selected = null;
+function visible() {
+    const name = document.getElementById("aircraftNameFilter").value.toLowerCase();
+    const sort = document.querySelector("input[name='sort']:checked");
+    const rows = AIRCRAFT.filter(a =>
+        (hubs.size === 0 || hubs.has(a.hub))
+        && (a.name + " " + a.model).toLowerCase().includes(name));
+    if (sort) {
+        const sign = sort.value.endsWith("Desc") ? -1 : 1;
+        rows.sort((a, b) => sign * (a.use - b.use) || a.id - b.id);
+    }
+    return rows;
+}
+function render() {
+    document.querySelector(".aircraftsBox").innerHTML = visible().map(a =>
+        `<div onclick="selectAircraft(${a.id})"><div>${a.name}</div>`
+        + `<div><span>Use <b>${a.use}%</b></span> <span>${a.model}</span></div>`
+        + `<a href="/aircraft/show/${a.id}">Aircraft details</a></div>`
+    ).join("");
+}
+function selectAircraft(id) { selected = id; }
+function showHub(span) {
+    hubs.clear();
+    hubs.add(Number(span.dataset.hubid));
+    render();
+}
+function pickLine(span) { line = span.dataset.line; }
+function pickSlot() { slot = true; }
+function confirmSlot() { confirmed = slot; }
+function clearSchedule() { clear = true; }
+function submitPlanning() {
+    const rows = visible();
+    const aircraft = rows.find(a => a.id === selected) || rows[0];
+    if (!aircraft) return;
+    const form = document.getElementById("planningForm");
+    const fields = form.elements;
+    fields["aircraft"].value = aircraft.id;
+    if (clear) {
+        fields["clear"].value = "1";
+    } else {
+        if (!line || !confirmed) return;
+        fields["line"].value = line;
+    }
+    form.submit();
+}
+</script>
+"""
+
+BUY_SCRIPT = """
+<script>
+let picked = null;
+function pickAircraft(model) { picked = model; }
+function buy(form) {
+    if (picked === null) return;
+    const bucket = document.getElementById("buyAircraft_bucket");
+    const value = selector => bucket.querySelector(selector).value;
+    const fields = form.elements;
+    fields["model"].value = picked;
+    fields["count"].value = value("#bucketCount");
+    fields["hub"].value = value("#aircraft_hub");
+    fields["economy"].value = value(".ecoManualInput");
+    fields["business"].value = value(".busManualInput");
+    fields["first"].value = value(".firstManualInput");
+    fields["cargo"].value = value(".cargoManualInput");
+    fields["name"].value = value(".aircraftName input");
+    form.submit();
+}
+</script>
+"""
+
+
+def _e(value) -> str:
+    return html.escape(str(value))
+
+
+class _Redirect(Exception):
+    def __init__(self, location: str):
+        super().__init__(location)
+        self.location = location
+
+
+class SimServer:
+    """Serves a GameState with the page structure tycoon.utils.airline_manager
+    and tycoon.utils.http_reader expect, so whole commands can run against
+    thousands of routes and aircraft without the real game.
+
+    Every response waits latency + up to jitter seconds, page counters show
+    which pages a run leans on.
+    """
+
+    def __init__(
+        self,
+        state: GameState,
+        port: int = 8811,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        seed: int = 1,
+    ):
+        self.state = state
+        self.url = f"http://127.0.0.1:{port}"
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])
+        self._session = f"{random.Random(seed).getrandbits(64):x}"
+        self._routes = [
+            ("GET", r"/favicon\.ico", self._favicon),
+            ("POST", r"/login", self._login),
+            ("GET", r"/network/?", self._network),
+            ("GET", r"/network/showhub/(\d+)/linelist", self._line_list),
+            ("GET", r"/network/showline/(\d+)", self._show_line),
+            ("GET", r"/marketing/pricing/(\d+)", self._pricing),
+            ("GET", r"/network/newlinefinalize/(\d+)/(\w+)", self._new_line),
+            ("POST", r"/network/newlinefinalize/(\d+)/(\w+)", self._buy_line),
+            ("GET", r"/network/planning", self._planning),
+            ("POST", r"/network/planning", self._plan),
+            ("GET", r"/aircraft/show/(\d+)", self._aircraft),
+            ("GET", r"/aircraft/show/(\d+)/reconfigure", self._reconfigure_form),
+            ("POST", r"/aircraft/show/(\d+)/reconfigure", self._reconfigure),
+            ("GET", r"/aircraft/buy/new/(\w+)", self._buy_form),
+            ("POST", r"/aircraft/buy/new/(\w+)", self._buy_aircraft),
+        ]
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self._server.daemon_threads = True
+        self._server.sim = self
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logging.info(
+            f"Serving the simulated game on {self.url}, {len(self.state.lines)} lines "
+            f"and {len(self.state.aircraft)} aircraft"
+        )
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def options(self) -> List[str]:
+        """tycoon-cli arguments that point the commands at this server"""
+        return [f"--tycoon_url={self.url}"]
+
+    def log_stats(self):
+        with self._stats_lock:
+            stats = sorted(self.stats.items(), key=lambda s: -s[1][1])
+        for page, (count, seconds) in stats:
+            logging.info(
+                f"Sim {page}: {count} requests, {seconds:.1f}s, "
+                f"{1000 * seconds / count:.1f}ms avg"
+            )
+        with self.state.lock:
+            planned = sum(1 for a in self.state.aircraft.values() if a.line_id)
+            logging.info(
+                f"Sim state: {len(self.state.lines)} lines, {planned} of "
+                f"{len(self.state.aircraft)} aircraft planned, "
+                f"$ {self.state.cash:,.0f} cash"
+            )
+
+    def handle(self, handler: "_Handler"):
+        started = time.monotonic()
+        with self._stats_lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+        time.sleep(delay)
+
+        path = urlparse(handler.path).path
+        length = int(handler.headers.get("Content-Length") or 0)
+        form = parse_qs(handler.rfile.read(length).decode()) if length else {}
+        form = {k: v[-1] for k, v in form.items()}
+        cookies = SimpleCookie(handler.headers.get("Cookie") or "")
+        logged_in = (
+            SESSION_COOKIE in cookies and cookies[SESSION_COOKIE].value == self._session
+        )
+        base = f"http://{handler.headers.get('Host') or urlparse(self.url).netloc}"
+
+        page, status, headers = "unknown", 200, []
+        for method, pattern, fn in self._routes:
+            match = re.fullmatch(pattern, path)
+            if method == handler.command and match:
+                page = f"{method} {pattern}"
+                break
+        else:
+            fn = None
+
+        try:
+            if fn is None:
+                status, body = 404, PAGE.format(
+                    title="Not found", cash=self.state.cash, body="Not found"
+                )
+            elif fn in (self._favicon, self._login) or logged_in:
+                body = fn(base, form, *match.groups())
+            else:
+                body = self._page("Login", LOGIN_BODY)
+        except _Redirect as redirect:
+            status, body = 302, ""
+            headers.append(("Location", base + redirect.location))
+        except Exception as ex:
+            logging.debug(f"Sim {handler.command} {path} failed: {ex}")
+            status, body = 400, self._page(
+                "Error", f'<div class="error">{_e(ex)}</div>'
+            )
+
+        if fn == self._login and status == 302:
+            headers.append(("Set-Cookie", f"{SESSION_COOKIE}={self._session}; Path=/"))
+        content = body.encode("utf-8")
+        handler.send_response(status)
+        for k, v in headers:
+            handler.send_header(k, v)
+        handler.send_header("Content-Type", "text/html; charset=utf-8")
+        handler.send_header("Content-Length", str(len(content)))
+        handler.end_headers()
+        handler.wfile.write(content)
+
+        with self._stats_lock:
+            self.stats[page][0] += 1
+            self.stats[page][1] += time.monotonic() - started
+
+    def _page(self, title: str, body: str) -> str:
+        return PAGE.format(title=_e(title), cash=self.state.cash, body=body)
+
+    def _favicon(self, base: str, form: dict) -> str:
+        return ""
+
+    def _login(self, base: str, form: dict) -> str:
+        if not form.get("username") or not form.get("password"):
+            raise Exception("Missing username or password")
+        raise _Redirect("/network/")
+
+    def _line_title(self, line: SimLine, delimiter: str) -> str:
+        return f"{self.state.hubs[line.hub_id].iata}{delimiter}{line.destination}"
+
+    def _network(self, base: str, form: dict) -> str:
+        with self.state.lock:
+            hubs = "".join(
+                f"<div>Owned hub {hub.iata} - Simulated "
+                f'<a href="{base}/network/showhub/{hub.id}">Hub details</a></div>'
+                for hub in self.state.hubs.values()
+            )
+            options = "".join(
+                f'<option value="/network/showline/{line.id}">'
+                f"{self._line_title(line, ' - ')}</option>"
+                for line in self.state.lines.values()
+            )
+        return self._page(
+            "Network",
+            f'<div id="displayRegular"><div class="hubListBox">{hubs}</div></div>'
+            f'<select class="linePicker" onchange="pickLine(this)">'
+            f'<option value="">Pick a line</option>{options}</select>'
+            f'<div id="lineDetails"></div>{LINE_PICKER_SCRIPT}',
+        )
+
+    def _line_list(self, base: str, form: dict, hub_id: str) -> str:
+        with self.state.lock:
+            lines = "".join(
+                f'<div class="lineListBox"><span class="title">'
+                f"{self._line_title(line, ' / ')}</span></div>"
+                for line in self.state.lines.values()
+                if line.hub_id == int(hub_id)
+            )
+        return self._page("Lines", f'<div id="lineList">{lines}</div>')
+
+    def _line(self, line_id: str) -> SimLine:
+        line = self.state.lines.get(int(line_id))
+        if line is None:
+            raise Exception(f"Unknown line {line_id}")
+        return line
+
+    def _show_line(self, base: str, form: dict, line_id: str) -> str:
+        with self.state.lock:
+            line = self._line(line_id)
+            aircraft = self.state.line_aircraft(line.id)
+            flights = "".join(
+                f"<div><div><span>{_e(a.model)} / {_e(a.make)}</span></div>"
+                f"<div><div><span>{_e(a.name)}</span><span>{a.rotations} rotations</span>"
+                f"<span>{a.use}%</span><span>Seats <b>({a.seats['economy']}/"
+                f"{a.seats['business']}/{a.seats['first']})</b></span>"
+                f"<span>{a.seats['cargo']}</span>"
+                f"<span>Result <b>$ {self.state.result(a):,}</b></span></div></div>"
+                f'<a href="{base}/aircraft/show/{a.id}">Aircraft details</a></div>'
+                for a in aircraft
+            )
+        stars = '<img alt="*">' * 2
+        return self._page(
+            self._line_title(line, " - "),
+            f'<div id="lineContent"><ul id="box2">'
+            f'<li>Category <b>{stars}<img alt="Category {line.category}"></b></li>'
+            f"<li>Distance: {line.distance:,} km</li></ul>"
+            f'<a href="{base}/marketing/pricing/{line.id}">Route prices</a>'
+            f'<div id="showLine"><div>{self._line_title(line, " / ")}</div><div></div>'
+            f"<div><ul><li>Rotations: {sum(a.rotations for a in aircraft)}</li>"
+            f"<li>Aircraft: <strong>{len(aircraft)}</strong></li></ul></div></div>"
+            f'<div class="aircraftListView">{flights}</div></div>',
+        )
+
+    def _pricing(self, base: str, form: dict, line_id: str) -> str:
+        with self.state.lock:
+            line = self._line(line_id)
+            remaining = self.state.remaining_demand(line)
+        classes = "".join(
+            f'<div><span class="title">{CLASS_TITLES[c]}</span>'
+            f'<span class="price">Price <b>$ {line.prices[c]:,}</b></span>'
+            f'<span class="demand">Demand {line.demand[c]:,}</span>'
+            f'<span class="paxLeft">Remaining {remaining[c]:,}</span></div>'
+            for c in CLASSES
+        )
+        return self._page(
+            "Route prices",
+            f'<div id="marketing_linePricing"><div class="box2">{classes}</div></div>',
+        )
+
+    def _new_line(self, base: str, form: dict, hub_id: str, destination: str) -> str:
+        return self._page(
+            "New line",
+            f'<form id="linePurchaseForm" method="post">'
+            f'<input type="hidden" name="destination" value="{_e(destination)}">'
+            f'<input type="submit" value="Buy the line"></form>',
+        )
+
+    def _buy_line(self, base: str, form: dict, hub_id: str, destination: str) -> str:
+        line = self.state.buy_line(int(hub_id), destination.upper())
+        raise _Redirect(f"/network/showline/{line.id}")
+
+    def _planning(self, base: str, form: dict) -> str:
+        with self.state.lock:
+            fleet = json.dumps(
+                [
+                    {
+                        "id": a.id,
+                        "name": html.escape(a.name),
+                        "model": html.escape(a.model),
+                        "hub": a.hub_id,
+                        "use": a.use,
+                    }
+                    for a in self.state.aircraft.values()
+                ]
+            )
+            hubs = "".join(
+                f'<span data-hubid="{hub.id}" onclick="showHub(this)">{hub.iata}</span>'
+                for hub in self.state.hubs.values()
+            )
+            lines = "".join(
+                f'<span data-line="{line.id}" onclick="pickLine(this)">'
+                f"{self._line_title(line, ' / ')}</span>"
+                for line in self.state.lines.values()
+            )
+        sorts = "".join(
+            f'<input type="radio" name="sort" value="utilizationPercentage{order}" '
+            f'onclick="render()">'
+            for order in ("Asc", "Desc")
+        )
+        return self._page(
+            "Planning",
+            f'<div id="filters">{hubs}<input type="text" id="aircraftNameFilter" '
+            f'oninput="render()">{sorts}</div>'
+            f'<div class="aircraftsBox"></div><div id="lines">{lines}</div>'
+            f'<div id="planning"><table><tbody><tr><td></td></tr>'
+            f'<tr><td><img alt="Confirm" onclick="confirmSlot()"></td></tr>'
+            f"</tbody></table></div>"
+            f'<table class="planningArea"><tbody><tr><td></td></tr>'
+            f'<tr><td></td><td></td><td onclick="pickSlot()"></td></tr></tbody></table>'
+            f'<form id="planningForm" method="post"><input type="hidden" name="aircraft">'
+            f'<input type="hidden" name="line"><input type="hidden" name="clear"></form>'
+            f'<input type="button" id="tableButtonClearSchedule" value="Clear" '
+            f'onclick="clearSchedule()">'
+            f'<input type="button" id="planningSubmit" value="Save" '
+            f'onclick="submitPlanning()">'
+            f"<script>const AIRCRAFT = {fleet};</script>{PLANNING_SCRIPT}"
+            f"<script>render();</script>",
+        )
+
+    def _plan(self, base: str, form: dict) -> str:
+        aircraft_id = int(form["aircraft"])
+        if form.get("clear"):
+            self.state.assign(aircraft_id, None)
+        else:
+            self.state.assign(aircraft_id, int(form["line"]))
+        raise _Redirect("/network/planning")
+
+    def _aircraft(self, base: str, form: dict, aircraft_id: str) -> str:
+        a = self.state.aircraft[int(aircraft_id)]
+        return self._page(
+            a.name,
+            f'<div id="aircraft"><h1>{_e(a.name)}</h1><span>{_e(a.model)}</span>'
+            f'<a href="{base}/aircraft/show/{a.id}/reconfigure">Reconfigure</a></div>',
+        )
+
+    def _seat_inputs(self, seats: Dict[str, int], by: str) -> str:
+        return "".join(
+            f'<input type="text" {by}="{prefix}ManualInput" name="{c}" value="{seats[c]}">'
+            for c, prefix in zip(CLASSES, ["eco", "bus", "first", "cargo"])
+        )
+
+    def _reconfigure_form(self, base: str, form: dict, aircraft_id: str) -> str:
+        a = self.state.aircraft[int(aircraft_id)]
+        return self._page(
+            "Reconfigure",
+            f'<form method="post">{self._seat_inputs(a.seats, "id")}'
+            f'<input type="text" id="aircraft_name" name="name" value="{_e(a.name)}">'
+            f'<input type="submit" value="Confirm the reconfiguration"></form>',
+        )
+
+    def _seats(self, form: dict) -> Dict[str, int]:
+        return {c: int(form.get(c) or 0) for c in CLASSES}
+
+    def _reconfigure(self, base: str, form: dict, aircraft_id: str) -> str:
+        self.state.reconfigure(int(aircraft_id), self._seats(form), form.get("name"))
+        raise _Redirect(f"/aircraft/show/{aircraft_id}")
+
+    def _buy_form(self, base: str, form: dict, make: str) -> str:
+        specs = [s for s in AIRCRAFT_SPECS.values() if s.make.lower() == make.lower()]
+        aircraft = (
+            "".join(
+                f'<div id="aircraft_{i}"><form onsubmit="pickAircraft({i}); return false">'
+                f'<div><div class="title">{_e(s.model)} / {_e(s.make)}</div>'
+                f"<div>$ {s.price:,.0f}</div><div><div>"
+                f'<span><img alt="Buy" onclick="pickAircraft({i})"></span>'
+                f'<span><input type="text" value="1"></span>'
+                f"</div></div></div></form></div>"
+                for i, s in enumerate(specs)
+            )
+            or '<div id="noAircraftFound">No aircraft found</div>'
+        )
+        with self.state.lock:
+            hubs = "".join(
+                f'<option value="{hub.id}">{hub.iata} - Simulated</option>'
+                for hub in self.state.hubs.values()
+            )
+        empty = dict.fromkeys(CLASSES, 0)
+        fields = "".join(
+            f'<input type="hidden" name="{name}">'
+            for name in ["model", "count", "hub"] + CLASSES + ["name"]
+        )
+        return self._page(
+            "Buy aircraft",
+            f'<div class="aircraftList">{aircraft}</div>'
+            f'<div id="buyAircraft_bucket"><form onsubmit="return false">'
+            f"<div><div><div>Quantity</div><div>"
+            f'<span><img alt="Quantity"></span>'
+            f'<span><input type="text" id="bucketCount" value="1"></span>'
+            f"</div></div></div>"
+            f'<select id="aircraft_hub">{hubs}</select>'
+            f'{self._seat_inputs(empty, "class")}'
+            f'<div class="aircraftName"><div><input type="text" value=""></div></div>'
+            f"</form></div>"
+            f'<div id="resumeBoxForJs"><div>Total</div><div><form method="post">'
+            f"<div>{fields}</div><div>"
+            f'<input type="button" value="Buy" onclick="buy(this.form)">'
+            f"</div></form></div></div>{BUY_SCRIPT}",
+        )
+
+    def _buy_aircraft(self, base: str, form: dict, make: str) -> str:
+        specs = [s for s in AIRCRAFT_SPECS.values() if s.make.lower() == make.lower()]
+        spec = specs[int(form["model"])]
+        seats = self._seats(form)
+        if not any(seats.values()):
+            seats = {"economy": spec.seats, "cargo": spec.cargo}
+        self.state.buy_aircraft(
+            int(form["hub"]),
+            spec.make,
+            spec.model,
+            int(form.get("count") or 1),
+            seats,
+            form.get("name") or None,
+        )
+        raise _Redirect(f"/aircraft/buy/new/{make}")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _handle(self):
+        self.server.sim.handle(self)
+
+    do_GET = do_POST = _handle
+
+    def log_message(self, format, *args):
+        logging.debug(f"sim: {format % args}")
@@ -0,0 +1,36 @@
+from typing import Any
+
+# Where the game and noway.info are reached, overridden with --tycoon_url and
+# --noway_url to run against a local fixture server, see tycoon-fixtures
+TYCOON_URL = "https://tycoon.airlines-manager.com"
+NOWAY_URL = "https://destinations.noway.info"
+
+_bases = {"tycoon": TYCOON_URL, "noway": NOWAY_URL}
+
+
+def add_options(parser):
+    parser.add_argument(
+        "--tycoon_url",
+        type=str,
+        help=f"Base URL of the game (Default: {TYCOON_URL})",
+        default=TYCOON_URL,
+    )
+    parser.add_argument(
+        "--noway_url",
+        type=str,
+        help=f"Base URL of noway.info (Default: {NOWAY_URL})",
+        default=NOWAY_URL,
+    )
+
+
+def configure(options: Any):
+    _bases["tycoon"] = getattr(options, "tycoon_url", None) or TYCOON_URL
+    _bases["noway"] = getattr(options, "noway_url", None) or NOWAY_URL
+
+
+def tycoon(path: str = "") -> str:
+    return _bases["tycoon"].rstrip("/") + path
+
+
+def noway(path: str = "") -> str:
+    return _bases["noway"].rstrip("/") + path
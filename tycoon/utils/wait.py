@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List
+
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+DEFAULT_TIMEOUT = 30
+# Waits that carry on when they time out give up as soon as the fixed
+# sleeps they replaced did, so a page that never changes costs no more
+SETTLE_TIMEOUT = 5
+POLL_FREQUENCY = 0.1
+
+AJAX_IDLE_SCRIPT = """
+return document.readyState === "complete"
+    && (typeof window.jQuery === "undefined" || window.jQuery.active === 0);
+"""
+
+_lock = threading.Lock()
+WAIT_STATS: Dict[str, List[float]] = defaultdict(list)
+
+
+def _record(name: str, seconds: float):
+    with _lock:
+        WAIT_STATS[name].append(seconds)
+    logging.debug(f"Waited {seconds:.3f}s for {name}")
+
+
+def until(
+    driver: WebDriver,
+    condition: Callable[[WebDriver], Any],
+    name: str,
+    timeout: float = DEFAULT_TIMEOUT,
+    required: bool = True,
+) -> Any:
+    """Polls the condition until it returns a truthy value
+
+    Args:
+        name (str): label the wait time is recorded against
+        required (bool): raise on timeout, otherwise log and return None
+    """
+    start = time.monotonic()
+    try:
+        return WebDriverWait(
+            driver,
+            timeout,
+            poll_frequency=POLL_FREQUENCY,
+            ignored_exceptions=(
+                NoSuchElementException,
+                StaleElementReferenceException,
+            ),
+        ).until(condition)
+    except TimeoutException:
+        if required:
+            raise
+        logging.debug(f"Timed out after {timeout}s waiting for {name}, continuing")
+    finally:
+        _record(name, time.monotonic() - start)
+
+
+def element_present(
+    driver: WebDriver, by: str, value: str, timeout=DEFAULT_TIMEOUT, required=True
+) -> WebElement:
+    return until(
+        driver,
+        EC.presence_of_element_located((by, value)),
+        f"element {value}",
+        timeout,
+        required,
+    )
+
+
+def element_clickable(
+    driver: WebDriver, by: str, value: str, timeout=DEFAULT_TIMEOUT, required=True
+) -> WebElement:
+    return until(
+        driver,
+        EC.element_to_be_clickable((by, value)),
+        f"clickable {value}",
+        timeout,
+        required,
+    )
+
+
+def element_count(
+    driver: WebDriver,
+    by: str,
+    value: str,
+    count: int,
+    timeout=DEFAULT_TIMEOUT,
+    required=True,
+) -> List[WebElement]:
+    def _condition(d):
+        elements = d.find_elements(by, value)
+        return elements if len(elements) >= count else False
+
+    return until(driver, _condition, f"{count}x {value}", timeout, required)
+
+
+def ajax_idle(driver: WebDriver, timeout=SETTLE_TIMEOUT, required=False) -> bool:
+    return until(
+        driver,
+        lambda d: d.execute_script(AJAX_IDLE_SCRIPT),
+        "ajax idle",
+        timeout,
+        required,
+    )
+
+
+def value_changed(
+    driver: WebDriver,
+    read: Callable[[WebDriver], Any],
+    previous: Any,
+    name: str,
+    timeout=DEFAULT_TIMEOUT,
+    required=True,
+) -> Any:
+    def _condition(d):
+        value = read(d)
+        return value if value != previous else False
+
+    return until(driver, _condition, name, timeout, required)
+
+
+def input_value(
+    driver: WebDriver, element: WebElement, value: Any, timeout=SETTLE_TIMEOUT
+) -> bool:
+    return until(
+        driver,
+        lambda _: element.get_attribute("value") == str(value),
+        "input value",
+        timeout,
+        required=False,
+    )
+
+
+def page_reloaded(driver: WebDriver, old_page: WebElement, timeout=SETTLE_TIMEOUT):
+    until(driver, EC.staleness_of(old_page), "page reload", timeout, required=False)
+    ajax_idle(driver, timeout)
+
+
+def log_stats():
+    with _lock:
+        stats = {k: list(v) for k, v in WAIT_STATS.items()}
+    if not stats:
+        return
+
+    logging.info("***** Wait stats *****")
+    for name, waits in sorted(stats.items(), key=lambda x: -sum(x[1])):
+        logging.info(
+            f"{name}: {len(waits)} waits, total {sum(waits):.2f}s, max {max(waits):.2f}s"
+        )
+    logging.info("**********")